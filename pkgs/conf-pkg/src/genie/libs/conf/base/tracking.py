@@ -0,0 +1,249 @@
+'''Track the attributes of Conf objects changed since their last build.
+
+A feature built with build_config(delta=True) only builds the attributes set
+since its previous build, through the partial configuration attributes, so
+the unchanged submodes are neither walked nor sent to the devices:
+
+    >>> bgp.build_config()
+    >>> bgp.device_attr[dev].vrf_attr[vrf].neighbor_attr[nbr].nbr_remote_as = 200
+    >>> bgp.build_config(delta=True)
+    router bgp 100
+     vrf vrf1
+      neighbor 10.2.0.2
+       remote-as 200
+
+An attribute set back to None is unconfigured with its previous value. An
+attribute set on a parent object is built on all the objects below it, as
+they inherit its value. Objects created since the last build (new neighbor,
+new vrf, ...) are built entirely.
+
+Only the builds applied on the devices are recorded: a configuration built
+with apply=False is not known to be configured, and is built again.
+
+Attributes modified in place (set.add, list.append, ...) are not seen;
+Use mark_changed for them. Removed sub-objects are not unconfigured either.
+'''
+
+__all__ = (
+    'ChangeTracking',
+    'changed_attributes',
+    'mark_changed',
+    'mark_built',
+    'mark_unbuilt',
+    'build_delta',
+)
+
+import contextlib
+
+from genie.conf.base.config import CliConfig
+from genie.conf.base.attributes import SubAttributesDict
+
+# Attribute holding the {name: previous value} changed since the last build;
+# Missing when the object was never built.
+_CHANGES = '_changed_attributes'
+
+
+class ChangeTracking(object):
+    '''Mixin recording the attributes set on a Conf object since its last
+    build. Must come first in the bases.'''
+
+    def __setattr__(self, name, value):
+        changes = self.__dict__.get(_CHANGES)
+        if changes is not None and not name.startswith('_') \
+                and name not in changes:
+            changes[name] = getattr(self, name, None)
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        changes = self.__dict__.get(_CHANGES)
+        if changes is not None and not name.startswith('_') \
+                and name not in changes:
+            changes[name] = getattr(self, name, None)
+        super().__delattr__(name)
+
+
+def _sub_attributes(obj):
+    '''(name, SubAttributesDict) of obj, only those already created'''
+    for name, value in list(vars(obj).items()):
+        if isinstance(value, SubAttributesDict):
+            yield name.lstrip('_'), value
+
+
+def mark_changed(obj, *names):
+    '''Record attributes of obj as changed, when modified in place'''
+    changes = obj.__dict__.get(_CHANGES)
+    if changes is not None:
+        for name in names:
+            changes.setdefault(name, None)
+
+
+def mark_built(obj, devices=None):
+    '''Record obj and all the objects below it as built
+
+    Args:
+        obj (`obj`): Conf object
+        devices (`list`): Only mark the device_attr of these devices; The
+                          attributes of obj itself stay changed in the
+                          device_attr of the others
+    '''
+    if devices is not None:
+        devices = set(devices)
+        device_attr = getattr(obj, 'device_attr', None)
+        if device_attr is None:
+            return
+        changes = obj.__dict__.get(_CHANGES) \
+            if isinstance(obj, ChangeTracking) else None
+        for key in getattr(obj, 'devices', None) or ():
+            if key in devices:
+                continue
+            sub = device_attr[key]
+            if changes is None:
+                # obj never built, neither are the other devices
+                mark_unbuilt(sub)
+            elif isinstance(sub, ChangeTracking) \
+                    and sub.__dict__.get(_CHANGES) is not None:
+                # Inherited from obj
+                sub_changes = sub.__dict__[_CHANGES]
+                for name, previous in changes.items():
+                    sub_changes.setdefault(name, previous)
+        for key, sub in device_attr.items():
+            if key in devices:
+                mark_built(sub)
+        if isinstance(obj, ChangeTracking):
+            obj.__dict__[_CHANGES] = {}
+        return
+    if isinstance(obj, ChangeTracking):
+        obj.__dict__[_CHANGES] = {}
+    for name, sub_attributes in _sub_attributes(obj):
+        for sub in sub_attributes.values():
+            mark_built(sub)
+
+
+def mark_unbuilt(obj, devices=None):
+    '''Record obj and all the objects below it as never built
+
+    Args:
+        obj (`obj`): Conf object
+        devices (`list`): Only mark the device_attr of these devices
+    '''
+    if devices is not None:
+        devices = set(devices)
+        for key, sub in getattr(obj, 'device_attr', {}).items():
+            if key in devices:
+                mark_unbuilt(sub)
+        return
+    obj.__dict__.pop(_CHANGES, None)
+    for name, sub_attributes in _sub_attributes(obj):
+        for sub in sub_attributes.values():
+            mark_unbuilt(sub)
+
+
+def changed_attributes(obj, _inherited_config=(), _inherited_unconfig=(),
+                       _previous=None):
+    '''Return the partial attributes to configure and to unconfigure obj
+    from its last build.
+
+    Returns:
+        (configure, unconfigure, previous): configure is None when obj was
+        never built; previous is a list of (object, name, previous value)
+        of the attributes to unconfigure.
+    '''
+    if _previous is None:
+        _previous = []
+    changes = obj.__dict__.get(_CHANGES) \
+        if isinstance(obj, ChangeTracking) else None
+    if changes is None:
+        return None, {}, _previous
+
+    config = {name: None for name in _inherited_config}
+    unconfig = {name: None for name in _inherited_unconfig}
+    for name, previous in changes.items():
+        current = getattr(obj, name, None)
+        if current is None:
+            if previous is not None:
+                unconfig[name] = None
+                _previous.append((obj, name, previous))
+        elif current != previous:
+            config[name] = None
+
+    # Attributes of obj are inherited by the objects below it
+    inherited_config = tuple(config)
+    inherited_unconfig = tuple(unconfig)
+    for name, sub_attributes in _sub_attributes(obj):
+        sub_config = {}
+        sub_unconfig = {}
+        for key, sub in sub_attributes.items():
+            c, u, _ = changed_attributes(sub, inherited_config,
+                                         inherited_unconfig, _previous)
+            if c is None:
+                sub_config[key] = None
+            elif c:
+                sub_config[key] = c
+            if u:
+                sub_unconfig[key] = u
+        if sub_config:
+            config[name] = sub_config
+        if sub_unconfig:
+            unconfig[name] = sub_unconfig
+    return config, unconfig, _previous
+
+
+@contextlib.contextmanager
+def _previous_values(previous):
+    '''Set the attributes back to their previous values'''
+    restore = []
+    for obj, name, value in previous:
+        restore.append((obj, name, name in obj.__dict__,
+                        getattr(obj, name, None)))
+        super(ChangeTracking, obj).__setattr__(name, value)
+    try:
+        yield
+    finally:
+        for obj, name, was_set, value in reversed(restore):
+            if was_set:
+                super(ChangeTracking, obj).__setattr__(name, value)
+            else:
+                super(ChangeTracking, obj).__delattr__(name)
+
+
+def build_delta(feature, devices=None, apply=True, **kwargs):
+    '''Build the configuration of the attributes of a feature changed since
+    its last build.
+
+    Args:
+        feature (`obj`): Feature object, with ChangeTracking
+        devices (`list`): Devices to build, all the feature devices if None
+        apply (`bool`): Apply the configuration on the devices
+        kwargs: Arguments to the feature build_config/build_unconfig
+
+    Returns:
+        Same as the feature build_config; Only the changed attributes are in
+        the configurations. The feature is recorded as built only when the
+        configuration is applied.
+    '''
+    config, unconfig, previous = changed_attributes(feature)
+    if config is None:
+        # Never built, everything is new
+        cfgs = feature.build_config(devices=devices, apply=False, **kwargs)
+    else:
+        cfgs = {}
+        if unconfig:
+            with _previous_values(previous):
+                cfgs = feature.build_unconfig(devices=devices, apply=False,
+                                              attributes=unconfig, **kwargs)
+        if config:
+            built = feature.build_config(devices=devices, apply=False,
+                                         attributes=config, **kwargs)
+            for key, cfg in built.items():
+                if key in cfgs and str(cfgs[key]):
+                    cfg = CliConfig(device=cfg.device, fail_invalid=True,
+                                    cli_config='\n'.join((str(cfgs[key]),
+                                                          str(cfg))))
+                cfgs[key] = cfg
+
+    if apply:
+        if cfgs:
+            feature.testbed.config_on_devices(cfgs, fail_invalid=True)
+        mark_built(feature, devices=devices)
+    else:
+        return cfgs
@@ -24,6 +24,8 @@ from genie.libs.conf.base import Redistribution
 from genie.libs.conf.base import Routing, IPNeighbor
 from genie.libs.conf.base import RouteDistinguisher, RouteTarget
 from genie.libs.conf.base.neighbor import IPNeighborSubAttributes
+from genie.libs.conf.base.tracking import ChangeTracking, build_delta, \
+                                           mark_built, mark_unbuilt
 from genie.libs.conf.address_family import AddressFamily,\
                                            AddressFamilySubAttributes
 from genie.libs.conf.vrf import Vrf, VrfSubAttributes
@@ -33,7 +35,7 @@ from genie.ops.base import Base as ops_Base
 from genie.ops.base import Context
 
 
-class Bgp(Routing, DeviceFeature):
+class Bgp(ChangeTracking, Routing, DeviceFeature):
 
     bgp_id = managedattribute(
         name='bgp_id',
@@ -1097,7 +1099,8 @@ class Bgp(Routing, DeviceFeature):
         fdef=list,
         type=managedattribute.test_list_of(Redistribution))
 
-    class DeviceAttributes(genie.conf.base.attributes.DeviceSubAttributes):
+    class DeviceAttributes(ChangeTracking,
+                           genie.conf.base.attributes.DeviceSubAttributes):
 
         update_source = managedattribute(
             name='update_source',
@@ -1125,7 +1128,7 @@ class Bgp(Routing, DeviceFeature):
         def router_id(self, value):
             self.vrf_attr[None].router_id = value
 
-        class PeerSessionAttributes(KeyedSubAttributes):
+        class PeerSessionAttributes(ChangeTracking, KeyedSubAttributes):
             def __init__(self, parent, key):
                 self.ps_name = key
                 super().__init__(parent)
@@ -1139,7 +1142,7 @@ class Bgp(Routing, DeviceFeature):
         def peer_session_attr(self):
             return SubAttributesDict(self.PeerSessionAttributes, parent=self)
 
-        class PeerPolicyAttributes(KeyedSubAttributes):
+        class PeerPolicyAttributes(ChangeTracking, KeyedSubAttributes):
             def __init__(self, parent, key):
                 self.pp_name = key
                 super().__init__(parent)
@@ -1153,7 +1156,7 @@ class Bgp(Routing, DeviceFeature):
         def peer_policy_attr(self):
             return SubAttributesDict(self.PeerPolicyAttributes, parent=self)
 
-        class VrfAttributes(VrfSubAttributes):
+        class VrfAttributes(ChangeTracking, VrfSubAttributes):
 
             rd = Vrf.rd.copy()
 
@@ -1171,7 +1174,8 @@ class Bgp(Routing, DeviceFeature):
             def address_families(self):
                 return self.parent.address_families.copy()
 
-            class AddressFamilyAttributes(AddressFamilySubAttributes):
+            class AddressFamilyAttributes(ChangeTracking,
+                                          AddressFamilySubAttributes):
             	pass
 
             address_family_attr = managedattribute(
@@ -1184,7 +1188,7 @@ class Bgp(Routing, DeviceFeature):
                 return SubAttributesDict(self.AddressFamilyAttributes,
                                          parent=self)
 
-            class NeighborAttributes(IPNeighborSubAttributes):
+            class NeighborAttributes(ChangeTracking, IPNeighborSubAttributes):
 
                 address_families = managedattribute(
                     name='address_families',
@@ -1195,7 +1199,8 @@ class Bgp(Routing, DeviceFeature):
                 def address_families(self):
                     return self.parent.address_families.copy()
 
-                class AddressFamilyAttributes(AddressFamilySubAttributes):
+                class AddressFamilyAttributes(ChangeTracking,
+                                              AddressFamilySubAttributes):
                 	pass
 
                 address_family_attr = managedattribute(
@@ -1295,9 +1300,23 @@ class Bgp(Routing, DeviceFeature):
         super().__init__(*args, **kwargs)
 
     def build_config(self, devices=None, apply=True, attributes=None,
-                     **kwargs):
+                     delta=False, **kwargs):
+        '''Build the configuration of the Bgp object
+
+        Args:
+            devices (`list`): Devices to build, all the devices if None
+            apply (`bool`): Apply the configuration on the devices
+            attributes: Partial configuration attributes
+            delta (`bool`): Only build the attributes changed since the last
+                            build (see genie.libs.conf.base.tracking)
+        '''
+        if delta:
+            assert attributes is None, 'attributes and delta are exclusive'
+            return build_delta(self, devices=devices, apply=apply, **kwargs)
         cfgs = {}
         assert not kwargs, kwargs
+        full = attributes is None
+        built_devices = devices
         attributes = AttributesHelper(self, attributes)
 
         if devices is None:
@@ -1311,6 +1330,8 @@ class Bgp(Routing, DeviceFeature):
 
         if apply:
             self.testbed.config_on_devices(cfgs, fail_invalid=True)
+            if full:
+                mark_built(self, devices=built_devices)
         else:
             return cfgs
 
@@ -1318,6 +1339,8 @@ class Bgp(Routing, DeviceFeature):
                        **kwargs):
         cfgs = {}
         assert not kwargs, kwargs
+        full = attributes is None
+        unbuilt_devices = devices
         attributes = AttributesHelper(self, attributes)
 
         if devices is None:
@@ -1331,6 +1354,9 @@ class Bgp(Routing, DeviceFeature):
 
         if apply:
             self.testbed.config_on_devices(cfgs, fail_invalid=True)
+            if full:
+                # Built entirely by the next delta build
+                mark_unbuilt(self, devices=unbuilt_devices)
         else:
             return cfgs
 
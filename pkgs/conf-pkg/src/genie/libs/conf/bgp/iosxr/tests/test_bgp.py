@@ -788,6 +788,192 @@ class test_bgp(TestCase):
                 ' exit',
                 ]))
 
+    def test_bgp_delta(self):
+        # For failures
+        self.maxDiff = None
+
+        # shorten the line
+        dev1 = self.dev1
+        dev2 = self.dev2
+
+        # Only the applied builds are recorded
+        config_on_devices = dev1.testbed.config_on_devices = Mock()
+
+        def build_delta():
+            config_on_devices.reset_mock()
+            bgp.build_config(delta=True)
+            if not config_on_devices.called:
+                return {}
+            cfgs, = config_on_devices.call_args[0]
+            return cfgs
+
+        # Bgp object
+        bgp = Bgp(bgp_id=100)
+        dev1.add_feature(bgp)
+        nei = '10.1.1.1'
+        bgp.device_attr[dev1].add_vrf(self.vrf1)
+        bgp.device_attr[dev1].vrf_attr[self.vrf1].add_neighbor(nei)
+        nbr = bgp.device_attr[dev1].vrf_attr[self.vrf1].neighbor_attr[nei]
+        nbr.nbr_remote_as = 500
+        nbr.nbr_fall_over_bfd = True
+
+        full_cfg = '\n'.\
+            join([
+                'router bgp 100',
+                ' vrf vrf1',
+                '  neighbor 10.1.1.1',
+                '   bfd fast-detect',
+                '   remote-as 500',
+                '   exit',
+                '  exit',
+                ' exit',
+                ])
+
+        # Not applied, not recorded as built
+        cfgs = bgp.build_config(apply=False, delta=True)
+        self.assertMultiLineEqual(str(cfgs[dev1.name]), full_cfg)
+        cfgs = bgp.build_config(apply=False)
+        self.assertMultiLineEqual(str(cfgs[dev1.name]), full_cfg)
+        config_on_devices.assert_not_called()
+
+        # Never built, everything is built
+        cfgs = build_delta()
+        self.assertMultiLineEqual(str(cfgs[dev1.name]), full_cfg)
+
+        # Nothing changed
+        cfgs = build_delta()
+        self.assertEqual(cfgs, {})
+
+        # Only the changed attribute
+        nbr.nbr_remote_as = 600
+        cfgs = bgp.build_config(apply=False, delta=True)
+        self.assertMultiLineEqual(str(cfgs[dev1.name]), '\n'.\
+            join([
+                'router bgp 100',
+                ' vrf vrf1',
+                '  neighbor 10.1.1.1',
+                '   remote-as 600',
+                '   exit',
+                '  exit',
+                ' exit',
+                ]))
+        # Still changed until applied
+        cfgs = build_delta()
+        self.assertIn('   remote-as 600', str(cfgs[dev1.name]))
+        cfgs = build_delta()
+        self.assertEqual(cfgs, {})
+
+        # Set back to the same value
+        nbr.nbr_remote_as = 700
+        nbr.nbr_remote_as = 600
+        cfgs = build_delta()
+        self.assertEqual(cfgs, {})
+
+        # Cleared, unconfigured with the previous value
+        nbr.nbr_remote_as = None
+        cfgs = build_delta()
+        self.assertMultiLineEqual(str(cfgs[dev1.name]), '\n'.\
+            join([
+                'router bgp 100',
+                ' vrf vrf1',
+                '  neighbor 10.1.1.1',
+                '   no remote-as 600',
+                '   exit',
+                '  exit',
+                ' exit',
+                ]))
+        self.assertIsNone(nbr.nbr_remote_as)
+
+        # Unconfiguration not applied, nothing to build again
+        bgp.build_unconfig(apply=False)
+        cfgs = build_delta()
+        self.assertEqual(cfgs, {})
+
+        # Unconfigured entirely, built entirely again
+        bgp.build_unconfig()
+        cfgs = build_delta()
+        self.assertIn('   bfd fast-detect', str(cfgs[dev1.name]))
+
+        # Unconfigured on one device, only built again on that device
+        dev2.add_feature(bgp)
+        bgp.device_attr[dev2].add_vrf(self.vrf1)
+        cfgs = build_delta()
+        self.assertEqual(set(cfgs), {dev2.name})
+        bgp.build_unconfig(devices=[dev2])
+        cfgs = build_delta()
+        self.assertEqual(set(cfgs), {dev2.name})
+
+    def test_bgp_delta_devices(self):
+        # For failures
+        self.maxDiff = None
+
+        # shorten the line
+        dev1 = self.dev1
+        dev2 = self.dev2
+
+        config_on_devices = dev1.testbed.config_on_devices = Mock()
+
+        def build_delta():
+            config_on_devices.reset_mock()
+            bgp.build_config(delta=True)
+            if not config_on_devices.called:
+                return {}
+            cfgs, = config_on_devices.call_args[0]
+            return cfgs
+
+        # Bgp object
+        bgp = Bgp(bgp_id=100)
+        nei = '10.1.1.1'
+        for dev in (dev1, dev2):
+            dev.add_feature(bgp)
+            bgp.device_attr[dev].add_vrf(self.vrf1)
+            bgp.device_attr[dev].vrf_attr[self.vrf1].add_neighbor(nei)
+            bgp.device_attr[dev].vrf_attr[self.vrf1].neighbor_attr[nei].\
+                nbr_remote_as = 500
+
+        # Built entirely on one device, only the other one is left
+        bgp.build_config(devices=[dev1])
+        cfgs = build_delta()
+        self.assertEqual(set(cfgs), {dev2.name})
+        self.assertIn('   remote-as 500', str(cfgs[dev2.name]))
+        cfgs = build_delta()
+        self.assertEqual(cfgs, {})
+
+        # Only the changed attribute
+        nbr = bgp.device_attr[dev1].vrf_attr[self.vrf1].neighbor_attr[nei]
+        nbr.nbr_remote_as = 600
+        cfgs = build_delta()
+        self.assertEqual(set(cfgs), {dev1.name})
+        self.assertMultiLineEqual(str(cfgs[dev1.name]), '\n'.\
+            join([
+                'router bgp 100',
+                ' vrf vrf1',
+                '  neighbor 10.1.1.1',
+                '   remote-as 600',
+                '   exit',
+                '  exit',
+                ' exit',
+                ]))
+
+        # Changed on the Bgp object, built on one device; Still changed on
+        # the other one
+        bgp.nbr_fall_over_bfd = True
+        bgp.build_config(devices=[dev1])
+        cfgs = build_delta()
+        self.assertEqual(set(cfgs), {dev2.name})
+        self.assertMultiLineEqual(str(cfgs[dev2.name]), '\n'.\
+            join([
+                'router bgp 100',
+                ' vrf vrf1',
+                '  neighbor 10.1.1.1',
+                '   bfd fast-detect',
+                '   exit',
+                '  exit',
+                ' exit',
+                ]))
+        cfgs = build_delta()
+        self.assertEqual(cfgs, {})
+
     def test_bgp_with_attributes(self):
         # For failures
         self.maxDiff = None
@@ -7,7 +7,6 @@ __all__ = (
     'EmulatedDevice',
 )
 
-import importlib
 import warnings
 import abc
 from enum import Enum
@@ -20,6 +19,7 @@ from genie.conf.base.attributes import AttributesHelper
 from genie.conf.base.cli import CliConfigBuilder
 
 from genie.libs.conf.address_family import AddressFamily
+from genie.libs.conf.utils.registry import os_class
 
 
 class UnsupportedDeviceOsWarning(UserWarning):
@@ -67,14 +67,10 @@ class Device(genie.conf.base.device.Device):
                     UnsupportedDeviceOsWarning)
 
             else:
-                # Get the location where it will be loaded to
-                mod = 'genie.libs.conf.device.{os}'.\
-                    format(os=device_os)
-
                 try:
-                    # import it
-                    OsDeviceModule = importlib.import_module(mod)
-                    factory_cls = OsDeviceModule.Device
+                    # Resolved once per os
+                    factory_cls = os_class('genie.libs.conf.device',
+                                           device_os, 'Device')
                 except (ImportError, AttributeError) as e:
                     # it does not exist, then just use the default one.
                     # At this time, this is expected, so don't warn at all.
@@ -230,6 +226,14 @@ class Device(genie.conf.base.device.Device):
         osInterface = self.get_os_specific_Interface_class()
         return osInterface.short_interface_name(interface_name)
 
+    def clean_interface_names(self, interface_names):
+        osInterface = self.get_os_specific_Interface_class()
+        return osInterface.clean_interface_names(interface_names)
+
+    def short_interface_names(self, interface_names):
+        osInterface = self.get_os_specific_Interface_class()
+        return osInterface.short_interface_names(interface_names)
+
 
 class EmulatedDevice(Device):
 
@@ -317,13 +321,9 @@ class EmulatedDevice(Device):
                 raise TypeError('Missing tgen_interface keyword argument')
             # need to load the correct Device for the right os.
             os = tgen_interface.device.os
-            # Get the location where it will be loaded to
-            mod = 'genie.libs.conf.device.{os}'.\
-                format(os=os)
-
-            # import it
-            OsDeviceModule = importlib.import_module(mod)
-            factory_cls = OsDeviceModule.EmulatedDevice
+            # Resolved once per os
+            factory_cls = os_class('genie.libs.conf.device', os,
+                                   'EmulatedDevice')
 
         if factory_cls is not cls:
             self = factory_cls.__new__(factory_cls, *args, **kwargs)
@@ -13,6 +13,7 @@ logger = logging.getLogger(__name__)
 from genie.decorator import managedattribute
 
 from genie.libs.conf.device.hltapi import Device as HltapiDevice
+from genie.libs.conf.device.hltapi import hltapi_locked
 import genie.libs.conf.interface.hltapi
 from genie.libs.conf.stream import Stream
 
@@ -23,6 +24,7 @@ class Device(HltapiDevice):
     class Hltapi(HltapiDevice.Hltapi):
         '''Hltapi class customized for Agilent.'''
 
+        @hltapi_locked
         def traffic_control(self, **kwargs):
 
             # Optional arg, but fails to stop with port_handle (at least it
@@ -1 +1,2 @@
 from .device import *
+from .sampler import *
@@ -4,6 +4,7 @@
 
 __all__ = (
     'Device',
+    'hltapi_locked',
 )
 
 from enum import Enum
@@ -11,6 +12,7 @@ import contextlib
 import functools
 import itertools
 import logging
+import threading
 import time
 try:
     from hltapi.exceptions import HltapiError
@@ -23,10 +25,52 @@ from genie.conf.base.attributes import AttributesHelper
 
 import genie.libs.conf.device.tgen
 from genie.libs.conf.stream.stream import Stream, StreamStats
+from .sampler import TrafficSampler
 
 logger = logging.getLogger(__name__)
 
 
+def _locked(lock, func):
+    '''Wrap a callable to call it holding lock.'''
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with lock:
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def hltapi_locked(method):
+    '''Decorate a Device or Hltapi method to run it holding the device's
+    hltapi_lock.
+
+    For the methods using the pyATS connection or Tcl interpreter directly,
+    and those shared with the `TrafficSampler` thread.
+    '''
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.hltapi_lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class _LockedTcl(object):
+    '''Tcl interpreter proxy, calling the interpreter holding a lock.'''
+
+    def __init__(self, tcl, lock):
+        self._tcl = tcl
+        self._lock = lock
+
+    def __getattr__(self, name):
+        value = getattr(self._tcl, name)
+        if callable(value):
+            value = _locked(self._lock, value)
+        return value
+
+
 class Device(genie.libs.conf.device.tgen.Device):
     '''Base Device class for HLTAPI-based TGEN devices'''
 
@@ -34,6 +78,11 @@ class Device(genie.libs.conf.device.tgen.Device):
         '''HLTAPI abstraction object.
 
         HLTAPI Device subclasses are encouraged to subclass Hltapi as well to customize HLTAPI calls to allow Vendor-specific requirements.
+
+        The HLTAPI calls redirected to the pyATS connection, and the Tcl
+        interpreter calls, are made holding the device's `hltapi_lock`;
+        Subclass methods using `pyats_connection` directly must be decorated
+        with `hltapi_locked`.
         '''
 
         device = managedattribute(
@@ -52,10 +101,16 @@ class Device(genie.libs.conf.device.tgen.Device):
                 # TODO This might not be a HltApiConnection!?
                 return connectionmgr.connections[connectionmgr.default_alias]
 
+        @property
+        def hltapi_lock(self):
+            '''The device's hltapi_lock'''
+            return self.device.hltapi_lock
+
         @property
         def tcl(self):
             '''The Tcl interpreter instance.'''
-            return self.pyats_connection._tcl
+            return _LockedTcl(self.pyats_connection._tcl,
+                              self.device.hltapi_lock)
 
         @property
         def tcl_namespace(self):
@@ -66,7 +121,10 @@ class Device(genie.libs.conf.device.tgen.Device):
             '''Redirect to undefined attributes to the pyATS connection.'''
 
             if not name.startswith('_') and name != 'device':
-                return getattr(self.pyats_connection, name)
+                value = getattr(self.pyats_connection, name)
+                if callable(value):
+                    value = _locked(self.device.hltapi_lock, value)
+                return value
 
             f = getattr(super(), '__getattr__', None)
             if f is not None:
@@ -91,6 +149,17 @@ class Device(genie.libs.conf.device.tgen.Device):
         '''
         return self.Hltapi(device=self)
 
+    hltapi_lock = managedattribute(
+        name='hltapi_lock',
+        read_only=True,
+        finit=threading.RLock,
+        doc='''Lock serializing the HLTAPI calls of the device.
+
+        Held by the `hltapi` calls redirected to the pyATS connection, the
+        Tcl interpreter calls, the methods decorated with `hltapi_locked` and
+        by the `TrafficSampler` while it samples. Code using the pyATS
+        connection or Tcl interpreter directly must hold it too.''')
+
     @property
     def all_port_handles(self):
         pass  # TODO hltspl_get_all_port_handles
@@ -104,6 +173,7 @@ class Device(genie.libs.conf.device.tgen.Device):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    @hltapi_locked
     def get_stream_stats(self, streams=None):
         if streams is None:
             streams = self.find_streams()
@@ -231,6 +301,81 @@ class Device(genie.libs.conf.device.tgen.Device):
 
         return stats
 
+    @hltapi_locked
+    def get_stream_counters(self, streams=None):
+        '''Return the TX and RX packet counters of streams.
+
+        Lighter than get_stream_stats; Meant to be polled, see
+        `TrafficSampler`.
+
+        Returns:
+            `dict` of stream: (tx_total_pkts, rx_total_pkts)
+        '''
+        if streams is None:
+            streams = self.find_streams()
+
+        hltapi = self.hltapi
+
+        map_stream_id_to_stream_obj = {}
+        for stream in streams:
+            for stream_id in stream.tgen_handle or ():
+                map_stream_id_to_stream_obj[stream_id] = stream
+
+        counters = {}
+        if not map_stream_id_to_stream_obj:
+            return counters
+
+        tgen_port_handle_to_interface_map = \
+            self.tgen_port_handle_to_interface_map
+        hltkl = hltapi.traffic_stats(
+            port_handle=list(tgen_port_handle_to_interface_map.keys()),
+            mode='streams',
+            streams=list(map_stream_id_to_stream_obj.keys()))
+        if hltkl.get('waiting_for_stats', False):
+            raise HltapiError('Statistics not ready')
+
+        for port_handle in tgen_port_handle_to_interface_map:
+            for stream_id, hltkl_stream \
+                    in hltkl.get('{}.stream'.format(port_handle), {}).items():
+                try:
+                    stream = map_stream_id_to_stream_obj[str(stream_id)]
+                except KeyError:
+                    continue
+                tx_pkts, rx_pkts = counters.get(stream, (0, 0))
+                tx_pkts += int(hltkl_stream.get('tx', {}).get('total_pkts', 0) or 0)
+                rx_pkts += int(hltkl_stream.get('rx', {}).get('total_pkts', 0) or 0)
+                counters[stream] = (tx_pkts, rx_pkts)
+
+        return counters
+
+    traffic_sampler = None
+
+    def start_traffic_sampler(self, streams=None, interval=1.0, size=3600):
+        '''Start sampling the packet counters of streams in the background.
+
+        Returns:
+            `TrafficSampler`: The running sampler, also kept as
+            `traffic_sampler`
+        '''
+        if self.traffic_sampler is not None and self.traffic_sampler.running:
+            self.traffic_sampler.stop()
+        self.traffic_sampler = TrafficSampler(device=self,
+                                              streams=streams,
+                                              interval=interval,
+                                              size=size)
+        self.traffic_sampler.start()
+        return self.traffic_sampler
+
+    def stop_traffic_sampler(self):
+        '''Stop the background sampler, its samples are kept.
+
+        Returns:
+            `TrafficSampler`: The stopped sampler, or None if never started
+        '''
+        if self.traffic_sampler is not None:
+            self.traffic_sampler.stop()
+        return self.traffic_sampler
+
     def restart_traffic(self, *, ports=None, learn=True, start=True, clear_on_start=True, wait_rx=True, rx_timeout=10, tx_timeout=10):
 
         if ports is None:
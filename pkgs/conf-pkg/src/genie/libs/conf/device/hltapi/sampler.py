@@ -0,0 +1,206 @@
+'''
+    Background traffic sampler for HLTAPI-based devices.
+
+    The sampler polls the TX/RX packet counters of the streams at a fixed
+    interval from its own thread and keeps the last samples in a ring buffer.
+    Outages and losses are computed from the samples, without blocking the
+    caller while the traffic is being disrupted (switchover, reload, ...)
+
+    Example:
+
+        >>> sampler = tgen.start_traffic_sampler(interval=0.5)
+        >>> device.switchover()
+        >>> tgen.stop_traffic_sampler()
+        >>> sampler.outage_durations()
+        {<Stream ...>: 0.213, ...}
+'''
+
+__all__ = (
+    'TrafficSampler',
+)
+
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficSampler(object):
+    '''Poll the packet counters of streams in a background thread.
+
+    Each sample is a (timestamp, tx_pkts, rx_pkts) tuple, where tx_pkts and
+    rx_pkts are tuples in the order of the `streams`.
+
+    NOTE: The HLTAPI Tcl interpreter is shared; Each sample is taken holding
+    the device's `hltapi_lock`, which the `Device.hltapi` calls and the
+    methods decorated with `hltapi_locked` hold as well, so the foreground
+    calls wait for the current sample and the other way round. Code using the
+    pyATS connection or Tcl interpreter directly while the sampler is running
+    must hold `device.hltapi_lock`.
+
+    Args:
+        device (`Device`): HLTAPI device providing `get_stream_counters` and
+                           `hltapi_lock`
+        streams (`list`): Streams to sample. Default: all streams of the device
+        interval (`float`): Seconds between 2 samples. Default: 1
+        size (`int`): Number of samples kept, the oldest are dropped first.
+                      Default: 3600
+    '''
+
+    def __init__(self, device, streams=None, interval=1.0, size=3600):
+        if streams is None:
+            streams = device.find_streams()
+        self.device = device
+        # Resolved now, not lazily from the sampling thread
+        self._device_lock = device.hltapi_lock
+        self.streams = tuple(streams)
+        self.interval = interval
+        self.samples = collections.deque(maxlen=size)
+        self.errors = 0
+        self._index = {stream: i for i, stream in enumerate(self.streams)}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        '''Start sampling; Previous samples are discarded'''
+        if self.running:
+            raise RuntimeError('{} sampler is already running'.format(
+                self.device))
+        with self._lock:
+            self.samples.clear()
+        self.errors = 0
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='TrafficSampler-{}'.format(self.device.name),
+            daemon=True)
+        self._thread.start()
+        logger.info('%s: Sampling %d streams every %s seconds',
+                    self.device, len(self.streams), self.interval)
+
+    def stop(self):
+        '''Stop sampling, waiting for the current poll to complete'''
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.info('%s: Stopped sampling after %d samples (%d errors)',
+                    self.device, len(self.samples), self.errors)
+
+    def sample(self):
+        '''Take one sample now and add it to the ring buffer'''
+        with self._device_lock:
+            t0 = time.time()
+            counters = self.device.get_stream_counters(streams=self.streams)
+            t1 = time.time()
+        tx_pkts = tuple(counters.get(stream, (None, None))[0]
+                        for stream in self.streams)
+        rx_pkts = tuple(counters.get(stream, (None, None))[1]
+                        for stream in self.streams)
+        # The counters were read somewhere during the call
+        sample = ((t0 + t1) / 2, tx_pkts, rx_pkts)
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        next_time = time.time()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.errors += 1
+                logger.warning('%s: Could not sample the traffic: %s',
+                               self.device, e)
+            next_time += self.interval
+            # Do not try to catch up if a poll took longer than the interval
+            next_time = max(next_time, time.time())
+            self._stop.wait(next_time - time.time())
+
+    def _stream_samples(self, stream):
+        i = self._index[stream]
+        with self._lock:
+            samples = list(self.samples)
+        return [(timestamp, tx_pkts[i], rx_pkts[i])
+                for timestamp, tx_pkts, rx_pkts in samples
+                if tx_pkts[i] is not None and rx_pkts[i] is not None]
+
+    def loss_timeline(self, stream):
+        '''Return the packets lost between consecutive samples of a stream
+
+        Returns:
+            `list` of (start, end, tx_pkts, rx_pkts, lost_pkts) for each
+            interval between 2 samples
+        '''
+        timeline = []
+        samples = self._stream_samples(stream)
+        for (t1, tx1, rx1), (t2, tx2, rx2) in zip(samples, samples[1:]):
+            tx_pkts = tx2 - tx1
+            rx_pkts = rx2 - rx1
+            timeline.append((t1, t2, tx_pkts, rx_pkts, max(tx_pkts - rx_pkts, 0)))
+        return timeline
+
+    def outage_timeline(self, stream):
+        '''Return the periods during which a stream was not received
+
+        A period starts with the first interval where packets were sent but
+        none received, and ends with the next interval where packets were
+        received again.
+
+        Returns:
+            `list` of (start, end) timestamps
+        '''
+        outages = []
+        for start, end, tx_pkts, rx_pkts, _ in self.loss_timeline(stream):
+            if tx_pkts > 0 and rx_pkts == 0:
+                if outages and outages[-1][1] == start:
+                    # Same outage
+                    outages[-1] = (outages[-1][0], end)
+                else:
+                    outages.append((start, end))
+        return outages
+
+    def tx_rate(self, stream):
+        '''Return the average TX packet rate of a stream, in pps'''
+        samples = self._stream_samples(stream)
+        if len(samples) < 2:
+            return None
+        (t1, tx1, _), (t2, tx2, _) = samples[0], samples[-1]
+        try:
+            return (tx2 - tx1) / (t2 - t1)
+        except ZeroDivisionError:
+            return None
+
+    def outage_duration(self, stream):
+        '''Return the time a stream was lost, in seconds
+
+        Computed from the number of lost packets and the TX packet rate, so
+        the precision is not limited to the sampling interval.
+        '''
+        rate = self.tx_rate(stream)
+        if not rate:
+            return None
+        samples = self._stream_samples(stream)
+        (_, tx1, rx1), (_, tx2, rx2) = samples[0], samples[-1]
+        # Packets in flight at both ends are not lost
+        lost_pkts = max((tx2 - tx1) - (rx2 - rx1), 0)
+        return lost_pkts / rate
+
+    def outage_durations(self):
+        '''Return the outage duration of every stream, in seconds'''
+        return {stream: self.outage_duration(stream)
+                for stream in self.streams}
@@ -19,6 +19,7 @@ except Exception:
 from genie.decorator import managedattribute
 
 from genie.libs.conf.device.hltapi import Device as HltapiDevice
+from genie.libs.conf.device.hltapi import hltapi_locked
 import genie.libs.conf.device
 import genie.libs.conf.interface.hltapi
 from genie.libs.conf.stream import Stream
@@ -38,6 +39,7 @@ class Device(HltapiDevice):
             - ixNet
         '''
 
+        @hltapi_locked
         def traffic_config(self, **kwargs):
             if 'name' in kwargs:
                 assert '.' not in kwargs['name'], \
@@ -130,6 +132,7 @@ class Device(HltapiDevice):
 
             return hltkl
 
+        @hltapi_locked
         def traffic_control(self, **kwargs):
 
             # TODO
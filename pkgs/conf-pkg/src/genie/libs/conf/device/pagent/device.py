@@ -19,6 +19,7 @@ except Exception:
 from genie.decorator import managedattribute
 
 from genie.libs.conf.device.hltapi import Device as HltapiDevice
+from genie.libs.conf.device.hltapi import hltapi_locked
 import genie.libs.conf.interface.hltapi
 import genie.libs.conf.device.ios
 from genie.libs.conf.stream import Stream
@@ -31,6 +32,7 @@ class Device(HltapiDevice, genie.libs.conf.device.ios.Device):
     class Hltapi(HltapiDevice.Hltapi):
         '''Hltapi class customized for Pagent.'''
 
+        @hltapi_locked
         def interface_config(self, **kwargs):
 
             # Pagent does not support -arp_send_req
@@ -48,6 +50,7 @@ class Device(HltapiDevice, genie.libs.conf.device.ios.Device):
 
             return hltkl
 
+        @hltapi_locked
         def traffic_config(self, **kwargs):
 
             # Supports l3_length
@@ -232,6 +235,7 @@ class Device(HltapiDevice, genie.libs.conf.device.ios.Device):
 
             return hltkl
 
+        @hltapi_locked
         def traffic_stats(self, **kwargs):
 
             if 'streams' in kwargs:
@@ -252,6 +256,7 @@ class Device(HltapiDevice, genie.libs.conf.device.ios.Device):
 
             return hltkl
 
+        @hltapi_locked
         def traffic_control(self, **kwargs):
 
             hltkl = self.pyats_connection.traffic_control(**kwargs)
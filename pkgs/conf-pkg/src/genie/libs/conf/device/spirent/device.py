@@ -14,6 +14,7 @@ import functools
 import logging
 import re
 import statistics
+import threading
 import time
 import types
 
@@ -29,9 +30,10 @@ from genie.conf.base.attributes import AttributesHelper
 import genie.conf.base.attributes
 
 from genie.libs.conf.device.hltapi import Device as HltapiDevice
+from genie.libs.conf.device.hltapi import hltapi_locked
 import genie.libs.conf.device
 import genie.libs.conf.interface.hltapi
-from genie.libs.conf.stream import Stream, StreamStats
+from genie.libs.conf.stream import Stream, StreamStats, StreamStatsTable
 from genie.libs.conf.base import IPv4Address, IPv6Address, MAC
 
 logger = logging.getLogger(__name__)
@@ -53,6 +55,60 @@ def try_cast_number(value):
     return tclstr(value)
 
 
+def _stc_sum(values):
+    return sum(values)
+
+
+def _stc_mean(values):
+    return statistics.mean(values)
+
+
+def _stc_port_stray(values):
+    # 'YES', 'NO' or 'NA'
+    if 'YES' in values:
+        return 1
+    if 'NO' in values:
+        return 0
+    return None
+
+
+# (StreamStatsTable counter, STC result attribute, reduce function, only
+# valid with TxStreamResults/RxStreamSummaryResults)
+_STC_TX_COUNTERS = (
+    ('total_pkts', '-FrameCount', _stc_sum, False),
+    ('total_pkt_rate', '-FrameRate', _stc_sum, True),
+    ('total_pkt_bits', '-L1BitCount', _stc_sum, True),
+    ('total_pkt_bit_rate', '-L1BitRate', _stc_sum, True),
+    ('total_pkt_bytes', '-OctetCount', _stc_sum, False),
+    ('total_pkt_byte_rate', '-OctetRate', _stc_sum, False),
+)
+
+_STC_RX_COUNTERS = (
+    ('total_pkts', '-FrameCount', _stc_sum, False),
+    ('total_pkt_rate', '-FrameRate', _stc_sum, True),
+    ('total_pkt_bits', '-L1BitCount', _stc_sum, True),
+    ('total_pkt_bit_rate', '-L1BitRate', _stc_sum, True),
+    ('total_pkt_bytes', '-OctetCount', _stc_sum, False),
+    ('total_pkt_byte_rate', '-OctetRate', _stc_sum, True),
+    ('min_delay', '-MinLatency', min, False),
+    ('max_delay', '-MaxLatency', max, False),
+    ('avg_delay', '-AvgLatency', _stc_mean, False),
+    ('out_of_sequence_pkts', '-OutSeqFrameCount', _stc_sum, False),
+    ('out_of_sequence_pkt_rate', '-OutSeqFrameRate', _stc_sum, False),
+    ('x_adv_seq_in_order_pkts', '-InOrderFrameCount', _stc_sum, False),
+    ('x_adv_seq_in_order_pkt_rate', '-InOrderFrameRate', _stc_sum, False),
+    ('x_adv_seq_reordered_pkts', '-ReorderedFrameCount', _stc_sum, False),
+    ('x_adv_seq_reordered_pkt_rate', '-ReorderedFrameRate', _stc_sum, False),
+    ('x_adv_seq_late_pkts', '-LateFrameCount', _stc_sum, False),
+    ('x_adv_seq_late_pkt_rate', '-LateFrameRate', _stc_sum, False),
+    ('x_adv_seq_duplicate_pkts', '-DuplicateFrameCount', _stc_sum, False),
+    ('x_adv_seq_duplicate_pkt_rate', '-DuplicateFrameRate', _stc_sum, False),
+    ('x_adv_seq_dropped_pkts', '-DroppedFrameCount', _stc_sum, False),
+    ('x_adv_seq_dropped_pkt_rate', '-DroppedFrameRate', _stc_sum, False),
+    ('x_has_port_stray_pkts', '-PortStrayFrames', _stc_port_stray, False),
+)
+
+
 class Device(HltapiDevice):
     '''Device class for HLTAPI devices with spirent OS'''
 
@@ -68,6 +124,41 @@ class Device(HltapiDevice):
             - stc_apply()
         '''
 
+        def __init__(self, device):
+            super().__init__(device)
+            # Per thread: depth of the defer_stc_apply contexts and whether
+            # stc_apply was requested within them
+            self._stc_apply_deferral = threading.local()
+
+        @hltapi_locked
+        def stc_apply(self):
+            '''Apply the STC configuration, unless deferred by this thread.'''
+            deferral = self._stc_apply_deferral
+            if getattr(deferral, 'depth', 0):
+                deferral.pending = True
+                return
+            return self.pyats_connection.stc_apply()
+
+        @contextlib.contextmanager
+        def defer_stc_apply(self):
+            '''A context during which stc_apply calls are merged into one.
+
+            The configuration is applied once, when the outermost context
+            exits, only if stc_apply was called within it. Only the calls of
+            the current thread are deferred, those of other threads (the
+            `TrafficSampler`...) are applied right away.
+            '''
+            deferral = self._stc_apply_deferral
+            deferral.depth = getattr(deferral, 'depth', 0) + 1
+            try:
+                yield
+            finally:
+                deferral.depth -= 1
+                if not deferral.depth and getattr(deferral, 'pending', False):
+                    deferral.pending = False
+                    self.stc_apply()
+
+        @hltapi_locked
         def traffic_config(self, **kwargs):
 
             # Setup persistent datasets at the first sign of traffic
@@ -250,6 +341,8 @@ class Device(HltapiDevice):
                 # -dut_type is Agilent-specific.
                 kwargs.pop('dut_type', None)
 
+                # Results move between pages as streams come and go
+                persist_data.stc_resultdataset_layouts.clear()
                 hltkl = self.pyats_connection.traffic_config(**kwargs)
 
                 if 'stream_id' in hltkl:
@@ -303,6 +396,7 @@ class Device(HltapiDevice):
 
             return hltkl
 
+        @hltapi_locked
         def traffic_control(self, **kwargs):
 
             # Setup persistent datasets at the first sign of traffic
@@ -374,6 +468,21 @@ class Device(HltapiDevice):
             doc='''If True, use STC's TxStreamBlockResults/RxStreamBlockResults
             instead of TxStreamResults/RxStreamSummaryResults.''')
 
+        use_stc_bulk_get = managedattribute(
+            name='use_stc_bulk_get',
+            default=True,
+            type=managedattribute.test_istype(bool),
+            doc='''If True, fetch all the results of a page in a single Tcl
+            evaluation. Reset to False if not supported.''')
+
+        stc_resultdataset_layouts = managedattribute(
+            name='stc_resultdataset_layouts',
+            read_only=True,
+            finit=dict,
+            doc='''Number of results of each streamblock found on each page
+            of the resultdatasets, used to skip the pages without the
+            requested streams. Cleared when streams are configured.''')
+
         stc_TxStreamBlockResults_resultdataset = managedattribute(
             name='stc_TxStreamBlockResults_resultdataset',
             type=str_type)
@@ -457,17 +566,225 @@ class Device(HltapiDevice):
             setattr(pyats_connection, '_genie_persist_data', persist_data)
         return persist_data
 
-    def get_stream_stats(self, streams=None, *, refresh=True):
-        if streams is None:
-            streams = self.find_streams()
+    def _stc_get_many(self, handles):
+        '''Return the attributes of many STC objects.
 
-        stats = StreamStats()
+        All objects are fetched in a single Tcl evaluation; Falls back to one
+        stc_get per object if the bulk fetch is not supported.
+        '''
+        hltapi = self.hltapi
+        tcl = hltapi.tcl
+        cast_ = functools.partial(tcl.cast_array, item_cast=try_cast_number)
+        handles = list(handles)
+        if not handles:
+            return []
 
+        if self.persist_data.use_stc_bulk_get:
+            try:
+                result = tcl.eval(
+                    '::apply {{handles} {'
+                    ' set ret [list];'
+                    ' foreach h $handles { lappend ret [::stc::get $h] };'
+                    ' return $ret'
+                    '}} {%s}' % (' '.join(handles),))
+                values = tcl.cast_list(result, item_cast=cast_)
+                if len(values) == len(handles):
+                    return values
+                raise ValueError('Expected {} results, got {}'.format(
+                    len(handles), len(values)))
+            except Exception as e:
+                logger.warning('%s: Bulk STC fetch not supported, falling '
+                               'back to one fetch per result: %s', self, e)
+                self.persist_data.use_stc_bulk_get = False
+
+        return [hltapi.stc_get(handle, cast_=cast_) for handle in handles]
+
+    def _stc_pages_todo(self, resultdataset, n_pages, streamblocks):
+        '''Return the pages of a resultdataset holding streamblocks' results.
+
+        Pages known, from the previous collections, not to hold any result of
+        the requested streamblocks are skipped. All the pages are returned if
+        the number of pages changed or if any streamblock was never seen.
+
+        Returns:
+            (pages, rows): The pages to fetch and, if any page is skipped, the
+            number of results of each streamblock expected on them, else
+            None.
+        '''
+        layout = self.persist_data.stc_resultdataset_layouts.get(resultdataset)
+        all_pages = list(range(1, n_pages + 1))
+        if not layout or layout['page_count'] != n_pages:
+            return all_pages, None
+        known = collections.Counter()
+        for page_rows in layout['pages'].values():
+            known.update(page_rows)
+        if not set(known).issuperset(streamblocks):
+            return all_pages, None
+        pages = [page for page in all_pages
+                 if not layout['pages'].get(page, known).keys().isdisjoint(
+                     streamblocks)]
+        if len(pages) == n_pages:
+            return all_pages, None
+        return pages, {streamblock: known[streamblock]
+                       for streamblock in streamblocks}
+
+    def _stc_update_layout(self, resultdataset, n_pages, page, rows):
+        layouts = self.persist_data.stc_resultdataset_layouts
+        layout = layouts.get(resultdataset)
+        if not layout or layout['page_count'] != n_pages:
+            layout = layouts[resultdataset] = {
+                'page_count': n_pages,
+                'pages': {},
+            }
+        layout['pages'][page] = collections.Counter(rows)
+
+    @hltapi_locked
+    def _get_stream_results(self, streamblocks, *, refresh=True):
+        '''Fetch the raw STC TX/RX results of streamblocks.
+
+        Returns:
+            (tx, rx, rxport): The TX and RX results dicts per streamblock and
+            the RX port results dict per result handle.
+        '''
         hltapi = self.hltapi
         tcl = hltapi.tcl
 
         need_stc_apply = False
 
+        # set tx_resultdataset/rx_resultdataset
+        if self.persist_data.use_stc_streamblock_stats:
+            tx_resultdataset = self.persist_data.stc_TxStreamBlockResults_resultdataset
+            rx_resultdataset = self.persist_data.stc_RxStreamBlockResults_resultdataset
+            if refresh:
+                # NOTE:
+                #   TxStreamBlockResults and RxStreamBlockResults are for end of test results.
+                #   You must use RefreshResultViewCommand before you can access the results.
+                hltapi.stc_perform('RefreshResultViewCommand',
+                                   '-ResultDataSet', tx_resultdataset,
+                                   '-ExecuteSynchronous', 'TRUE')
+                hltapi.stc_perform('RefreshResultViewCommand',
+                                   '-ResultDataSet', rx_resultdataset,
+                                   '-ExecuteSynchronous', 'TRUE')
+                refresh = False
+        else:
+            tx_resultdataset = self.persist_data.stc_TxStreamResults_resultdataset
+            rx_resultdataset = self.persist_data.stc_RxStreamSummaryResults_resultdataset
+
+        tx_resultdataset_dict = hltapi.stc_get(tx_resultdataset,
+                                               cast_=functools.partial(tcl.cast_array, item_cast=tcl.cast_any))
+        logger.debug('tx_resultdataset_dict=%r', tx_resultdataset_dict)
+        rx_resultdataset_dict = hltapi.stc_get(rx_resultdataset,
+                                               cast_=functools.partial(tcl.cast_array, item_cast=tcl.cast_any))
+        logger.debug('rx_resultdataset_dict=%r', rx_resultdataset_dict)
+        n_tx_pages = tx_resultdataset_dict['-TotalPageCount']
+        n_rx_pages = rx_resultdataset_dict['-TotalPageCount']
+        wanted_streamblocks = set(streamblocks)
+        tx_pages_todo, tx_rows = self._stc_pages_todo(
+            tx_resultdataset, n_tx_pages, wanted_streamblocks)
+        rx_pages_todo, rx_rows = self._stc_pages_todo(
+            rx_resultdataset, n_rx_pages, wanted_streamblocks)
+        if len(tx_pages_todo) < n_tx_pages or len(rx_pages_todo) < n_rx_pages:
+            logger.debug('%s: Skipping %d TX and %d RX pages without the '
+                         'requested streams', self,
+                         n_tx_pages - len(tx_pages_todo),
+                         n_rx_pages - len(rx_pages_todo))
+        arr_tx_streamresults_dicts_per_streamblock = collections.defaultdict(list)
+        arr_rx_streamresults_dicts_per_streamblock = collections.defaultdict(list)
+        arr_rxstreamportresult_dict = {}
+        # Always read pages in the same order (1..n) so that results are more
+        # consistent.
+        for page_iter in sorted(set(tx_pages_todo) | set(rx_pages_todo)):
+            do_tx = page_iter in tx_pages_todo
+            do_rx = page_iter in rx_pages_todo
+            # Change pages
+            bPageChanged = False
+            try:
+                if do_tx and page_iter != tx_resultdataset_dict['-PageNumber']:
+                    hltapi.stc_config(tx_resultdataset, '-PageNumber', page_iter)
+                    need_stc_apply = True
+                    tx_resultdataset_dict['-PageNumber'] = page_iter
+                    bPageChanged = True
+                if do_rx and page_iter != rx_resultdataset_dict['-PageNumber']:
+                    hltapi.stc_config(rx_resultdataset, '-PageNumber', page_iter)
+                    need_stc_apply = True
+                    rx_resultdataset_dict['-PageNumber'] = page_iter
+                    bPageChanged = True
+            finally:
+                if need_stc_apply:
+                    # Switch pages now, even within defer_stc_apply
+                    hltapi.pyats_connection.stc_apply()
+                    need_stc_apply = False
+            if bPageChanged or refresh:
+                # Until proven otherwise, RefreshResultViewCommand should be sufficient even on page change.
+                if do_tx:
+                    hltapi.stc_perform('RefreshResultViewCommand',
+                                       '-ResultDataSet', tx_resultdataset,
+                                       '-ExecuteSynchronous', 'TRUE')
+                if do_rx:
+                    hltapi.stc_perform('RefreshResultViewCommand',
+                                       '-ResultDataSet', rx_resultdataset,
+                                       '-ExecuteSynchronous', 'TRUE')
+
+            # Collect results, all the results of a page at once
+            if do_tx:
+                logger.debug('%s: Fetching TX stream results page %d of %d...', self, tx_resultdataset_dict['-PageNumber'], tx_resultdataset_dict['-TotalPageCount'])
+                page_rows = collections.Counter()
+                for txstreamstats in self._stc_get_many(
+                        hltapi.stc_get(tx_resultdataset, '-ResultHandleList',
+                                       cast_=functools.partial(tcl.cast_list, item_cast=tclstr))):
+                    streamblock = txstreamstats['-parent']
+                    page_rows[streamblock] += 1
+                    if streamblock not in wanted_streamblocks:
+                        continue
+                    arr_tx_streamresults_dicts_per_streamblock[streamblock].append(txstreamstats)
+                self._stc_update_layout(tx_resultdataset, n_tx_pages,
+                                        page_iter, page_rows)
+            if do_rx:
+                logger.debug('%s: Fetching RX stream results page %d of %d...', self, rx_resultdataset_dict['-PageNumber'], rx_resultdataset_dict['-TotalPageCount'])
+                page_rows = collections.Counter()
+                rxstreamportresults_todo = []
+                for rxstreamstats in self._stc_get_many(
+                        hltapi.stc_get(rx_resultdataset, '-ResultHandleList',
+                                       cast_=functools.partial(tcl.cast_list, item_cast=tclstr))):
+                    streamblock = rxstreamstats['-parent']
+                    page_rows[streamblock] += 1
+                    if streamblock not in wanted_streamblocks:
+                        continue
+                    if self.persist_data.use_stc_streamblock_stats:
+                        rxstreamportresults = rxstreamstats.get('-summaryresultchild-Targets', ())  # [-1]?
+                    else:
+                        rxstreamportresults = rxstreamstats.get('-resultchild-Targets', ())  # [-1]?
+                    rxstreamportresults_todo.extend(
+                        tcl.cast_list(rxstreamportresults, item_cast=tclstr))
+                    arr_rx_streamresults_dicts_per_streamblock[streamblock].append(rxstreamstats)
+                rxstreamportresults_todo = [
+                    rxstreamportresult
+                    for rxstreamportresult in rxstreamportresults_todo
+                    if rxstreamportresult not in arr_rxstreamportresult_dict]
+                arr_rxstreamportresult_dict.update(zip(
+                    rxstreamportresults_todo,
+                    self._stc_get_many(rxstreamportresults_todo)))
+                self._stc_update_layout(rx_resultdataset, n_rx_pages,
+                                        page_iter, page_rows)
+
+        if any(rows is not None and rows != {
+                    streamblock: len(results.get(streamblock, ()))
+                    for streamblock in wanted_streamblocks}
+               for rows, results in (
+                   (tx_rows, arr_tx_streamresults_dicts_per_streamblock),
+                   (rx_rows, arr_rx_streamresults_dicts_per_streamblock))):
+            # Results moved to or from the skipped pages since the previous
+            # collection
+            logger.debug('%s: Stale result pages, fetching all pages', self)
+            self.persist_data.stc_resultdataset_layouts.pop(tx_resultdataset, None)
+            self.persist_data.stc_resultdataset_layouts.pop(rx_resultdataset, None)
+            return self._get_stream_results(streamblocks, refresh=refresh)
+
+        return (arr_tx_streamresults_dicts_per_streamblock,
+                arr_rx_streamresults_dicts_per_streamblock,
+                arr_rxstreamportresult_dict)
+
+    def _map_streamblocks(self, streams):
         map_streamblock_to_stream_obj = {}
         for stream in streams:
             streamblocks = stream.tgen_handle
@@ -477,131 +794,30 @@ class Device(HltapiDevice):
                     map_streamblock_to_stream_obj[streamblock] = stream
             else:
                 logger.warn('%r: Nothing to do (no tgen_handle).', stream)
+        return map_streamblock_to_stream_obj
+
+    @hltapi_locked
+    def get_stream_stats(self, streams=None, *, refresh=True):
+        if streams is None:
+            streams = self.find_streams()
+
+        stats = StreamStats()
+
+        hltapi = self.hltapi
+        tcl = hltapi.tcl
+
+        map_streamblock_to_stream_obj = self._map_streamblocks(streams)
 
         streamblocks = list(map_streamblock_to_stream_obj.keys())
         if streamblocks:
 
-            # set tx_resultdataset/rx_resultdataset
-            if self.persist_data.use_stc_streamblock_stats:
-                tx_resultdataset = self.persist_data.stc_TxStreamBlockResults_resultdataset
-                rx_resultdataset = self.persist_data.stc_RxStreamBlockResults_resultdataset
-                if refresh:
-                    # NOTE:
-                    #   TxStreamBlockResults and RxStreamBlockResults are for end of test results.
-                    #   You must use RefreshResultViewCommand before you can access the results.
-                    hltapi.stc_perform('RefreshResultViewCommand',
-                                       '-ResultDataSet', tx_resultdataset,
-                                       '-ExecuteSynchronous', 'TRUE')
-                    hltapi.stc_perform('RefreshResultViewCommand',
-                                       '-ResultDataSet', rx_resultdataset,
-                                       '-ExecuteSynchronous', 'TRUE')
-                    refresh = False
-            else:
-                tx_resultdataset = self.persist_data.stc_TxStreamResults_resultdataset
-                rx_resultdataset = self.persist_data.stc_RxStreamSummaryResults_resultdataset
-
-            tx_resultdataset_dict = hltapi.stc_get(tx_resultdataset,
-                                                   cast_=functools.partial(tcl.cast_array, item_cast=tcl.cast_any))
-            logger.debug('tx_resultdataset_dict=%r', tx_resultdataset_dict)
-            rx_resultdataset_dict = hltapi.stc_get(rx_resultdataset,
-                                                   cast_=functools.partial(tcl.cast_array, item_cast=tcl.cast_any))
-            logger.debug('rx_resultdataset_dict=%r', rx_resultdataset_dict)
-            n_tx_pages_todo = tx_resultdataset_dict['-TotalPageCount']
-            n_rx_pages_todo = rx_resultdataset_dict['-TotalPageCount']
-            arr_tx_streamresults_dicts_per_streamblock = collections.defaultdict(list)
-            arr_rx_streamresults_dicts_per_streamblock = collections.defaultdict(list)
-            arr_rxstreamportresult_dict = {}
-            for page_iter in range(1, max(n_tx_pages_todo, n_rx_pages_todo) + 1):
-                # Change pages
-                bPageChanged = False
-                try:
-                    if True:
-                        # Always read pages in the same order (1..n) so that
-                        # results are more consistent.
-                        if page_iter <= n_tx_pages_todo \
-                                and page_iter != tx_resultdataset_dict['-PageNumber']:
-                            hltapi.stc_config(tx_resultdataset, '-PageNumber', page_iter)
-                            need_stc_apply = True
-                            tx_resultdataset_dict['-PageNumber'] = page_iter
-                            bPageChanged = True
-                        if page_iter <= n_rx_pages_todo \
-                                and page_iter != rx_resultdataset_dict['-PageNumber']:
-                            hltapi.stc_config(rx_resultdataset, '-PageNumber', page_iter)
-                            need_stc_apply = True
-                            rx_resultdataset_dict['-PageNumber'] = page_iter
-                            bPageChanged = True
-                    else:
-                        # Only change page if necessary. This saves 1 sleep of 2
-                        # seconds per cycle but never reads in the same order
-                        # (1,2,3; 2,3,1; 3,1,2; ...)
-                        if page_iter > 1:
-                            if page_iter <= n_tx_pages_todo:
-                                PageNumber = tx_resultdataset_dict['-PageNumber'] \
-                                    % tx_resultdataset_dict['-TotalPageCount'] + 1
-                                hltapi.stc_config(tx_resultdataset, '-PageNumber', PageNumber)
-                                need_stc_apply = True
-                                tx_resultdataset_dict['-PageNumber'] = PageNumber
-                                bPageChanged = True
-                            if page_iter <= n_rx_pages_todo:
-                                PageNumber = rx_resultdataset_dict['-PageNumber'] \
-                                    % rx_resultdataset_dict['-TotalPageCount'] + 1
-                                hltapi.stc_config(rx_resultdataset, '-PageNumber', PageNumber)
-                                need_stc_apply = True
-                                rx_resultdataset_dict['-PageNumber'] = PageNumber
-                                bPageChanged = True
-                finally:
-                    if need_stc_apply:
-                        hltapi.stc_apply()
-                        need_stc_apply = False
-                if bPageChanged or refresh:
-                    if True:
-                        # Until proven otherwise, RefreshResultViewCommand should be sufficient even on page change.
-                        if page_iter <= n_tx_pages_todo:
-                            hltapi.stc_perform('RefreshResultViewCommand',
-                                               '-ResultDataSet', tx_resultdataset,
-                                               '-ExecuteSynchronous', 'TRUE')
-                        if page_iter <= n_rx_pages_todo:
-                            hltapi.stc_perform('RefreshResultViewCommand',
-                                               '-ResultDataSet', rx_resultdataset,
-                                               '-ExecuteSynchronous', 'TRUE')
-                    elif bPageChanged:
-                        logger.info('Waiting 2 seconds for STC result update after page change')
-                        time.sleep(2)
-
-                # Collect results
-                if page_iter <= n_tx_pages_todo:
-                    logger.debug('%s: Fetching TX stream results page %d of %d...', self, tx_resultdataset_dict['-PageNumber'], tx_resultdataset_dict['-TotalPageCount'])
-                    for txstreamresults in hltapi.stc_get(tx_resultdataset, '-ResultHandleList',
-                                                          cast_=functools.partial(tcl.cast_list, item_cast=tclstr)):
-                        txstreamstats = hltapi.stc_get(txstreamresults,
-                                                       cast_=functools.partial(tcl.cast_array, item_cast=try_cast_number))
-                        logger.debug('txstreamstats (%s): %r', txstreamresults, txstreamstats)
-                        streamblock = txstreamstats['-parent']
-                        if streamblock not in streamblocks:
-                            continue
-                        arr_tx_streamresults_dicts_per_streamblock[streamblock].append(txstreamstats)
-                if page_iter <= n_rx_pages_todo:
-                    logger.debug('%s: Fetching RX stream results page %d of %d...', self, rx_resultdataset_dict['-PageNumber'], rx_resultdataset_dict['-TotalPageCount'])
-                    for rxstreamresults in hltapi.stc_get(rx_resultdataset, '-ResultHandleList',
-                                                          cast_=functools.partial(tcl.cast_list, item_cast=tclstr)):
-                        rxstreamstats = hltapi.stc_get(rxstreamresults,
-                                                       cast_=functools.partial(tcl.cast_array, item_cast=try_cast_number))
-                        logger.debug('rxstreamstats (%s): %r', rxstreamresults, rxstreamstats)
-                        streamblock = rxstreamstats['-parent']
-                        if streamblock not in streamblocks:
-                            continue
-                        if self.persist_data.use_stc_streamblock_stats:
-                            rxstreamportresults = rxstreamstats.get('-summaryresultchild-Targets', ())  # [-1]?
-                        else:
-                            rxstreamportresults = rxstreamstats.get('-resultchild-Targets', ())  # [-1]?
-                        rxstreamportresults = tcl.cast_list(rxstreamportresults, item_cast=tclstr)
-                        for rxstreamportresult in rxstreamportresults:
-                            rxstreamportstats = hltapi.stc_get(rxstreamportresult,
-                                                               cast_=functools.partial(tcl.cast_array, item_cast=try_cast_number))
-                            logger.debug('rxstreamportstats (%s): %r', rxstreamportresult, rxstreamportstats)
-                            arr_rxstreamportresult_dict[rxstreamportresult] = rxstreamportstats
-                        arr_rx_streamresults_dicts_per_streamblock[streamblock].append(rxstreamstats)
+            arr_tx_streamresults_dicts_per_streamblock, \
+                arr_rx_streamresults_dicts_per_streamblock, \
+                arr_rxstreamportresult_dict = \
+                self._get_stream_results(streamblocks, refresh=refresh)
 
+            # analyzer -> port
+            map_analyzer_to_port = {}
             for streamblock in streamblocks:
                 stream = map_streamblock_to_stream_obj[streamblock]
                 stream_stats = stats.by_stream[stream] = StreamStats.ByStreamStats()
@@ -640,8 +856,12 @@ class Device(HltapiDevice):
                     for rxstreamportresult in rxstreamportresults:
                         rxstreamstats = arr_rxstreamportresult_dict[rxstreamportresult]
                         analyzer = rxstreamstats['-parent']
-                        port = hltapi.stc_get(analyzer, '-parent',
-                                              cast_=tclstr)
+                        try:
+                            port = map_analyzer_to_port[analyzer]
+                        except KeyError:
+                            port = map_analyzer_to_port[analyzer] = \
+                                hltapi.stc_get(analyzer, '-parent',
+                                               cast_=tclstr)
                         for rx_interface in self.tgen_port_interfaces:
                             if rx_interface.tgen_port_handle != port:
                                 continue
@@ -919,6 +1139,104 @@ class Device(HltapiDevice):
 
         return stats
 
+    @hltapi_locked
+    def get_stream_stats_table(self, streams=None, *, refresh=True):
+        '''Collect the statistics of streams into a `StreamStatsTable`.
+
+        Much lighter than get_stream_stats with many streams: no statistics
+        object is created, only the totals of each stream and of each of its
+        interfaces are computed. Sub-streams are not reported.
+        '''
+        if streams is None:
+            streams = self.find_streams()
+
+        hltapi = self.hltapi
+        tcl = hltapi.tcl
+        use_stc_streamblock_stats = self.persist_data.use_stc_streamblock_stats
+
+        map_streamblock_to_stream_obj = self._map_streamblocks(streams)
+        streamblocks = list(map_streamblock_to_stream_obj.keys())
+        if streamblocks:
+            arr_tx_streamresults_dicts_per_streamblock, \
+                arr_rx_streamresults_dicts_per_streamblock, \
+                arr_rxstreamportresult_dict = \
+                self._get_stream_results(streamblocks, refresh=refresh)
+        else:
+            arr_tx_streamresults_dicts_per_streamblock = {}
+            arr_rx_streamresults_dicts_per_streamblock = {}
+            arr_rxstreamportresult_dict = {}
+
+        map_port_to_interface = {
+            rx_interface.tgen_port_handle: rx_interface
+            for rx_interface in self.tgen_port_interfaces}
+        map_analyzer_to_interface = {}
+
+        # (stream, interface) -> column -> [values]
+        values = collections.OrderedDict()
+
+        def collect(row, direction, counters, stcstats):
+            row_values = values.setdefault(row, collections.defaultdict(list))
+            for counter, key, _, summary_only in counters:
+                if summary_only and use_stc_streamblock_stats:
+                    # XXXJST These are always 0 when using stream block stats
+                    continue
+                value = stcstats.get(key)
+                if value is not None:
+                    row_values[direction + counter].append(value)
+
+        for streamblock in streamblocks:
+            stream = map_streamblock_to_stream_obj[streamblock]
+            tx_interface = stream.source_tgen_interface
+            for txstreamstats in arr_tx_streamresults_dicts_per_streamblock.get(streamblock, ()):
+                collect((stream, None), 'tx_', _STC_TX_COUNTERS, txstreamstats)
+                collect((stream, tx_interface), 'tx_', _STC_TX_COUNTERS, txstreamstats)
+            for rxstreamstats in arr_rx_streamresults_dicts_per_streamblock.get(streamblock, ()):
+                collect((stream, None), 'rx_', _STC_RX_COUNTERS, rxstreamstats)
+                if use_stc_streamblock_stats:
+                    rxstreamportresults = rxstreamstats.get('-summaryresultchild-Targets', ())
+                else:
+                    rxstreamportresults = rxstreamstats.get('-resultchild-Targets', ())
+                for rxstreamportresult in tcl.cast_list(rxstreamportresults, item_cast=tclstr):
+                    rxstreamportstats = arr_rxstreamportresult_dict[rxstreamportresult]
+                    analyzer = rxstreamportstats['-parent']
+                    try:
+                        rx_interface = map_analyzer_to_interface[analyzer]
+                    except KeyError:
+                        port = hltapi.stc_get(analyzer, '-parent', cast_=tclstr)
+                        rx_interface = map_analyzer_to_interface[analyzer] = \
+                            map_port_to_interface.get(port)
+                    if rx_interface is not None:
+                        collect((stream, rx_interface), 'rx_', _STC_RX_COUNTERS,
+                                rxstreamportstats)
+
+        reducers = {}
+        for direction, counters in (('tx_', _STC_TX_COUNTERS),
+                                    ('rx_', _STC_RX_COUNTERS)):
+            for counter, _, reduce_, _ in counters:
+                reducers[direction + counter] = reduce_
+
+        table = StreamStatsTable(values.keys())
+        for (stream, interface), row_values in values.items():
+            for column, column_values in row_values.items():
+                try:
+                    table.set(stream, interface, column,
+                              reducers[column](column_values))
+                except (TypeError, ValueError, statistics.StatisticsError):
+                    # Such as AvgLatency "N/A"
+                    pass
+            if interface is None:
+                if use_stc_streamblock_stats:
+                    count, rate = 'tx_total_pkt_bytes', 'tx_total_pkt_byte_rate'
+                else:
+                    count, rate = 'tx_total_pkt_bits', 'tx_total_pkt_bit_rate'
+                try:
+                    elapsed_time = table.get(stream, count) / table.get(stream, rate)
+                except (TypeError, ZeroDivisionError):
+                    elapsed_time = 0
+                table.set(stream, None, 'elapsed_time', elapsed_time)
+
+        return table
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -1031,16 +1349,17 @@ class Device(HltapiDevice):
         '''A context during which low-level apply calls are deferred.'''
         hltapi = self.hltapi
         tcl = hltapi.tcl
-        if int(tcl.eval('''expr {
-            [info exists ::sth::sthCore::optimization] &&
-            !$::sth::sthCore::optimization
-                        }''')):
-            hltapi.test_control(action='enable')
-            yield
-            hltapi.test_control(action='disable')
-            hltapi.test_control(action='sync')
-        else:
-            yield  # no-op
+        with hltapi.defer_stc_apply():
+            if int(tcl.eval('''expr {
+                [info exists ::sth::sthCore::optimization] &&
+                !$::sth::sthCore::optimization
+                            }''')):
+                hltapi.test_control(action='enable')
+                yield
+                hltapi.test_control(action='disable')
+                hltapi.test_control(action='sync')
+            else:
+                yield
 
     def get_stream_resolved_mac_addresses(self, streams=None, update_cache=True):
 
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+
+import threading
+import unittest
+from unittest.mock import Mock
+
+from genie.libs.conf.device.tgen import Device as TgenDevice
+from genie.libs.conf.device.spirent import Device as SpirentDevice
+
+
+class Tcl(object):
+    '''Tcl interpreter, with the results already cast'''
+
+    def cast_list(self, value, item_cast=None):
+        return list(value)
+
+    def cast_array(self, value, item_cast=None):
+        return dict(value)
+
+    def cast_any(self, value):
+        return value
+
+
+class Hltapi(object):
+    '''STC results, shown on the pages of the resultdatasets'''
+
+    def __init__(self, pages, results):
+        self.tcl = Tcl()
+        # resultdataset -> [result handles of each page]
+        self.pages = pages
+        self.results = results
+        self.page_number = {resultdataset: 1 for resultdataset in pages}
+        # Configured, not applied yet
+        self.page_number_config = {}
+        # (resultdataset, page) read
+        self.read = []
+        self.pyats_connection = Mock()
+        self.pyats_connection.stc_apply.side_effect = self.apply
+
+    def apply(self):
+        self.page_number.update(self.page_number_config)
+
+    def stc_get(self, handle, *args, cast_=None):
+        if args == ('-ResultHandleList',):
+            page = self.page_number[handle]
+            self.read.append((handle, page))
+            return list(self.pages[handle][page - 1])
+        return {'-TotalPageCount': len(self.pages[handle]),
+                '-PageNumber': self.page_number[handle]}
+
+    def stc_config(self, handle, attribute, value):
+        assert attribute == '-PageNumber'
+        self.page_number_config[handle] = value
+
+    def stc_apply(self):
+        # Deferred
+        pass
+
+    def stc_perform(self, *args):
+        pass
+
+
+class Device(object):
+    '''Spirent Device fetching the results of an Hltapi'''
+
+    _get_stream_results = SpirentDevice._get_stream_results
+    _stc_pages_todo = SpirentDevice._stc_pages_todo
+    _stc_update_layout = SpirentDevice._stc_update_layout
+
+    def __init__(self, hltapi):
+        self.hltapi = hltapi
+        self.hltapi_lock = threading.RLock()
+        self.persist_data = Mock()
+        self.persist_data.use_stc_streamblock_stats = False
+        self.persist_data.stc_TxStreamResults_resultdataset = 'tx'
+        self.persist_data.stc_RxStreamSummaryResults_resultdataset = 'rx'
+        self.persist_data.stc_resultdataset_layouts = {}
+
+    def _stc_get_many(self, handles):
+        return [self.hltapi.results[handle] for handle in handles]
+
+
+class test_stream_results(unittest.TestCase):
+
+    def setUp(self):
+        results = {}
+        for streamblock, ports in (('sb1', ('p1', 'p2')), ('sb2', ('p1',))):
+            handle = 'tx-' + streamblock
+            results[handle] = {'-parent': streamblock, 'handle': handle}
+            for port in ports:
+                handle = 'rx-' + streamblock + port
+                results[handle] = {'-parent': streamblock, 'handle': handle}
+        self.hltapi = Hltapi(
+            pages={
+                'tx': [['tx-sb1'], ['tx-sb2']],
+                'rx': [['rx-sb1p1', 'rx-sb1p2'], ['rx-sb2p1']],
+            },
+            results=results)
+        self.device = Device(self.hltapi)
+
+    def rx_results(self, streamblock):
+        tx, rx, rxport = self.device._get_stream_results([streamblock])
+        self.assertEqual(set(tx), {streamblock})
+        self.assertEqual(set(rx), {streamblock})
+        return sorted(result['handle'] for result in rx[streamblock])
+
+    def test_skip_pages(self):
+        self.assertEqual(self.rx_results('sb1'), ['rx-sb1p1', 'rx-sb1p2'])
+        self.assertEqual(len(self.hltapi.read), 4)
+
+        # Only the first pages hold sb1 results
+        del self.hltapi.read[:]
+        self.assertEqual(self.rx_results('sb1'), ['rx-sb1p1', 'rx-sb1p2'])
+        self.assertEqual(self.hltapi.read, [('tx', 1), ('rx', 1)])
+
+        del self.hltapi.read[:]
+        self.assertEqual(self.rx_results('sb2'), ['rx-sb2p1'])
+        self.assertEqual(self.hltapi.read, [('tx', 2), ('rx', 2)])
+
+    def test_rows_moved(self):
+        self.rx_results('sb1')
+
+        # One of the sb1 results moved to the skipped page
+        self.hltapi.pages['rx'] = [['rx-sb1p1'], ['rx-sb1p2', 'rx-sb2p1']]
+        del self.hltapi.read[:]
+        self.assertEqual(self.rx_results('sb1'), ['rx-sb1p1', 'rx-sb1p2'])
+        self.assertEqual(self.hltapi.read, [('tx', 1), ('rx', 1),
+                                            ('tx', 1), ('rx', 1),
+                                            ('tx', 2), ('rx', 2)])
+
+        # An sb2 result moved to the fetched page
+        self.hltapi.pages['rx'] = [['rx-sb1p1', 'rx-sb2p1'], ['rx-sb1p2']]
+        self.assertEqual(self.rx_results('sb2'), ['rx-sb2p1'])
+        del self.hltapi.read[:]
+        self.assertEqual(self.rx_results('sb2'), ['rx-sb2p1'])
+        self.assertEqual(self.hltapi.read, [('rx', 1), ('tx', 2)])
+
+        # The layout is up to date
+        del self.hltapi.read[:]
+        self.assertEqual(self.rx_results('sb1'), ['rx-sb1p1', 'rx-sb1p2'])
+        self.assertEqual(self.hltapi.read, [('tx', 1), ('rx', 1), ('rx', 2)])
+
+    def test_streams_configured(self):
+        self.rx_results('sb1')
+        hltapi = Mock()
+        hltapi.device = self.device
+        hltapi.hltapi_lock = self.device.hltapi_lock
+        hltapi.pyats_connection.traffic_config.return_value = {}
+        SpirentDevice.Hltapi.traffic_config(hltapi, mode='remove',
+                                            stream_id='sb2')
+        self.assertEqual(self.device.persist_data.stc_resultdataset_layouts,
+                         {})
+
+
+class test_defer_stc_apply(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = Mock()
+        device = Mock()
+        device.hltapi_lock = threading.RLock()
+        device.connectionmgr.connections = {'hltapi': self.connection}
+        self.hltapi = SpirentDevice.Hltapi(device=device)
+
+    def test_nested(self):
+        with self.hltapi.defer_stc_apply():
+            self.hltapi.stc_apply()
+            with self.hltapi.defer_stc_apply():
+                self.hltapi.stc_apply()
+            self.hltapi.stc_apply()
+            self.assertFalse(self.connection.stc_apply.called)
+        # Applied once, on exit
+        self.assertEqual(self.connection.stc_apply.call_count, 1)
+
+        with self.hltapi.defer_stc_apply():
+            pass
+        self.assertEqual(self.connection.stc_apply.call_count, 1)
+
+        self.hltapi.stc_apply()
+        self.assertEqual(self.connection.stc_apply.call_count, 2)
+
+    def test_other_thread(self):
+        with self.hltapi.defer_stc_apply():
+            # The sampler thread
+            thread = threading.Thread(target=self.hltapi.stc_apply)
+            thread.start()
+            thread.join()
+            self.assertEqual(self.connection.stc_apply.call_count, 1)
+        # Nothing deferred in this thread
+        self.assertEqual(self.connection.stc_apply.call_count, 1)
+
+
+class Stream(object):
+    '''Stream applying its configuration'''
+
+    def __init__(self, name, interface, hltapi, built):
+        self.name = name
+        self.source_tgen_interface = interface
+        self.hltapi = hltapi
+        self.built = built
+
+    def __lt__(self, other):
+        return self.name < other.name
+
+    def build_config(self, apply=True):
+        self.built.append(('config', self.name))
+        self.hltapi.stc_apply()
+        return ''
+
+    def build_unconfig(self, apply=True):
+        self.built.append(('unconfig', self.name))
+        self.hltapi.stc_apply()
+        return ''
+
+
+class test_build_streams_config(unittest.TestCase):
+
+    def setUp(self):
+        test_defer_stc_apply.setUp(self)
+        self.built = []
+        interfaces = [Mock(), Mock()]
+        interfaces[0].name = '1/1'
+        interfaces[1].name = '1/2'
+        self.device = Mock()
+        self.device.defer_apply_context = self.hltapi.defer_stc_apply
+        self.device.find_streams.return_value = [
+            Stream(name, interfaces[i], self.hltapi, self.built)
+            for name, i in (('s3', 0), ('s1', 0), ('s2', 1))]
+
+    def test_config(self):
+        self.assertEqual(TgenDevice.build_streams_config(self.device), '')
+        # Per interface
+        self.assertEqual(self.built, [('config', 's1'), ('config', 's3'),
+                                      ('config', 's2')])
+        self.assertEqual(self.connection.stc_apply.call_count, 1)
+
+    def test_unconfig(self):
+        TgenDevice.build_streams_config(self.device, unconfig=True)
+        self.assertEqual(self.built, [('unconfig', 's1'), ('unconfig', 's3'),
+                                      ('unconfig', 's2')])
+        self.assertEqual(self.connection.stc_apply.call_count, 1)
+
+    def test_streams(self):
+        stream = self.device.find_streams.return_value[2]
+        TgenDevice.build_streams_config(self.device, streams=[stream])
+        self.assertEqual(self.built, [('config', 's2')])
+        self.assertEqual(self.connection.stc_apply.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
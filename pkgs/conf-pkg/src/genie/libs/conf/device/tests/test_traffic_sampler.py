@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, Mock
+
+from genie.libs.conf.device.hltapi import Device as HltapiDevice
+from genie.libs.conf.device.hltapi import TrafficSampler
+
+
+class test_traffic_sampler(unittest.TestCase):
+
+    def setUp(self):
+        self.device = Mock()
+        self.device.name = 'TGEN'
+        self.device.hltapi_lock = threading.RLock()
+        self.counters = iter([
+            # 1000 pps, stream s1 lost between 2 and 3 seconds
+            {'s1': (0, 0), 's2': (0, 0)},
+            {'s1': (1000, 1000), 's2': (1000, 1000)},
+            {'s1': (2000, 1500), 's2': (2000, 2000)},
+            {'s1': (3000, 1500), 's2': (3000, 3000)},
+            {'s1': (4000, 2500), 's2': (4000, 4000)},
+        ])
+        self.device.get_stream_counters = \
+            Mock(side_effect=lambda streams: next(self.counters))
+
+    def sample(self, sampler):
+        # Take the samples one second apart
+        for timestamp in range(5):
+            sampler.sample()
+            t, tx_pkts, rx_pkts = sampler.samples.pop()
+            sampler.samples.append((timestamp, tx_pkts, rx_pkts))
+
+    def test_outage(self):
+        sampler = TrafficSampler(self.device, streams=['s1', 's2'])
+        self.sample(sampler)
+
+        self.assertEqual(len(sampler.samples), 5)
+        self.assertEqual(sampler.tx_rate('s1'), 1000)
+        self.assertEqual(sampler.outage_duration('s1'), 1.5)
+        self.assertEqual(sampler.outage_duration('s2'), 0)
+        self.assertEqual(sampler.outage_timeline('s1'), [(2, 3)])
+        self.assertEqual(sampler.outage_timeline('s2'), [])
+        self.assertEqual(sampler.loss_timeline('s1')[1],
+                         (1, 2, 1000, 500, 500))
+
+    def test_ring_buffer(self):
+        sampler = TrafficSampler(self.device, streams=['s1', 's2'], size=3)
+        self.sample(sampler)
+        self.assertEqual([t for t, *_ in sampler.samples], [2, 3, 4])
+
+    def test_thread(self):
+        self.device.get_stream_counters = \
+            Mock(return_value={'s1': (0, 0), 's2': (0, 0)})
+        sampler = TrafficSampler(self.device, streams=['s1', 's2'],
+                                 interval=0.01)
+        with sampler:
+            self.assertTrue(sampler.running)
+            time.sleep(0.05)
+        self.assertFalse(sampler.running)
+        self.assertGreater(len(sampler.samples), 0)
+
+    def test_device_lock(self):
+        self.device.get_stream_counters = \
+            Mock(return_value={'s1': (0, 0), 's2': (0, 0)})
+        sampler = TrafficSampler(self.device, streams=['s1', 's2'])
+        thread = threading.Thread(target=sampler.sample)
+        # A foreground HLTAPI call is in progress
+        with self.device.hltapi_lock:
+            thread.start()
+            time.sleep(0.05)
+            self.assertFalse(self.device.get_stream_counters.called)
+        thread.join()
+        self.assertTrue(self.device.get_stream_counters.called)
+        self.assertEqual(len(sampler.samples), 1)
+
+    def test_hltapi_locked(self):
+        calls = MagicMock()
+        stream = Mock()
+        stream.tgen_handle = ['s1']
+        device = Mock()
+        device.hltapi_lock = calls.lock
+        device.tgen_port_handle_to_interface_map = {'1/1': Mock()}
+        device.connectionmgr.connections = {'hltapi': calls.connection}
+        device.hltapi = HltapiDevice.Hltapi(device=device)
+        calls.connection.traffic_stats.return_value = {}
+
+        # Sampled
+        HltapiDevice.get_stream_counters(device, streams=[stream])
+        # Redirected to the connection
+        device.hltapi.traffic_control(action='run')
+        # Not calls
+        device.hltapi.pyats_connection
+        device.hltapi.tcl_namespace
+        self.assertEqual([name for name, args, kwargs in calls.mock_calls], [
+            'lock.__enter__',
+            'lock.__enter__',
+            'connection.traffic_stats',
+            'lock.__exit__',
+            'lock.__exit__',
+            'lock.__enter__',
+            'connection.traffic_control',
+            'lock.__exit__',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ __all__ = (
     'Device',
 )
 
+import collections
 import contextlib
 import logging
 logger = logging.getLogger(__name__)
@@ -13,7 +14,7 @@ logger = logging.getLogger(__name__)
 from genie.decorator import managedattribute
 
 import genie.libs.conf.device
-from genie.libs.conf.stream.stream import Stream
+from genie.libs.conf.stream.stream import Stream, StreamStatsTable
 
 class Device(genie.libs.conf.device.Device):
     '''Base Device class for TGEN devices'''
@@ -65,6 +66,15 @@ class Device(genie.libs.conf.device.Device):
     def get_stream_stats(self, streams=None, **kwargs):
         raise NotImplementedError
 
+    def get_stream_stats_table(self, streams=None, **kwargs):
+        '''Collect the statistics of streams into a `StreamStatsTable`.
+
+        Vendors may provide a faster implementation; This default converts
+        the result of get_stream_stats.
+        '''
+        return StreamStatsTable.from_stream_stats(
+            self.get_stream_stats(streams=streams, **kwargs))
+
     def get_stream_resolved_mac_addresses(self, streams=None):
         raise NotImplementedError
 
@@ -74,6 +84,44 @@ class Device(genie.libs.conf.device.Device):
     def stop_emulation(self, **kwargs):
         raise NotImplementedError
 
+    def build_streams_config(self, streams=None, *, apply=True,
+                             unconfig=False, **kwargs):
+        '''Configure (or unconfigure) many streams at once.
+
+        Streams are grouped by source TGEN interface and configured within a
+        single `defer_apply_context`, so the vendor-specific apply/sync is
+        only done once at the end.
+
+        Args:
+            streams (`list`): Streams to configure. Default: all the active
+                              streams of the device
+            unconfig (`bool`): Unconfigure the streams instead
+
+        Returns:
+            `str`: '' (No CLI lines)
+        '''
+        if streams is None:
+            streams = self.find_streams()
+
+        streams_per_interface = collections.OrderedDict()
+        for stream in sorted(streams):
+            streams_per_interface.setdefault(
+                stream.source_tgen_interface, []).append(stream)
+
+        with self.defer_apply_context():
+            for interface, interface_streams \
+                    in streams_per_interface.items():
+                logger.info('%s: %s %d streams on %s', self,
+                            'Unconfiguring' if unconfig else 'Configuring',
+                            len(interface_streams), interface.name)
+                for stream in interface_streams:
+                    if unconfig:
+                        stream.build_unconfig(apply=apply, **kwargs)
+                    else:
+                        stream.build_config(apply=apply, **kwargs)
+
+        return ''  # No CLI lines
+
     @contextlib.contextmanager
     def defer_apply_context(self):
         '''A context during which low-level apply calls are deferred.
@@ -2,11 +2,11 @@
     Common base Interface classes for all OSes.
 '''
 
-import importlib
 import warnings
 import abc
 import types
 import re
+import functools
 from enum import Enum
 
 from genie.utils.cisco_collections import typedset
@@ -17,9 +17,11 @@ import genie.conf.base.interface
 
 from .ipv4addr import IPv4Addr
 from .ipv6addr import IPv6Addr
+from .numbering import UsedInterfaceNumbers
 from genie.libs import conf
 from genie.libs.conf.base import IPv4Address, IPv6Address, IPv4Interface, IPv6Interface, MAC
 from genie.libs.conf.vrf import Vrf
+from genie.libs.conf.utils.registry import os_class, descendent_class
 
 
 class Option(Enum):
@@ -51,31 +53,8 @@ class Medium(Option):
     p2p = 'p2p'
     broadcast = 'broadcast'
 
-def _get_descendent_subclass(cls, subcls):
-    '''Find the descendent class of cls that is a subclass of subcls.'''
-    found_subclasses = set()
-    subclasses_walked = set()
-    subclasses_to_walk = [cls]
-    while subclasses_to_walk:
-        cls = subclasses_to_walk.pop(0)
-        if cls in subclasses_walked:
-            continue
-        else:
-            subclasses_walked.add(cls)
-        if issubclass(cls, subcls):
-            found_subclasses.add(cls)
-        else:
-            subclasses_to_walk.extend(cls.__subclasses__())
-    if not found_subclasses:
-        raise TypeError('No %r specific subclass of %r found.' % (
-            subcls.__qualname__, cls.__qualname__))
-    if len(found_subclasses) > 1:
-        raise TypeError('Too many %r specific subclass of %r found: %r' % (
-            subcls.__qualname__, cls.__qualname__, found_subclasses))
-    cls = found_subclasses.pop()
-    return cls
-
-
+# Cached, resolved once per (class, subclass)
+_get_descendent_subclass = descendent_class
 
 
 class UnsupportedInterfaceOsWarning(UserWarning):
@@ -86,85 +65,192 @@ class UnknownInterfaceName(UserWarning):
     pass
 
 
-class ParsedInterfaceName(types.SimpleNamespace):
-
-    def __init__(self, name, device=None):
-        if device is None and isinstance(name, ParsedInterfaceName):
-            # copy constructor
-            return super().__init__(vars(name))
-        assert type(name) is str
-
-        d = dict(
-            # main parts
-            type=None,
-            number=None,
-            subintf_sep=None,
-            subintf=None,
-            # sub-parts
-            net_module=None,
-            module=None,
-            rack=None,
-            slot=None,
-            instance=None,
-            port=None,
-            subport=None,
-            cpu=None,
-            rsip=None,
-        )
+# Bound of the interface name caches (parsing, clean and short names)
+INTERFACE_NAME_CACHE_SIZE = 65536
+
+_re_interface_name = re.compile(r'''
+    ^
+    # ignore leading spaces
+    \s*
+    # not an empty string
+    (?=\S)
+    # optional <type>
+    (?P<type>
+        [JTE][13]|                                      # J1, T1, E1, ...
+        (?:ODU|d|OTU|O)(?:[01234]|[12][EF]|3E[12])|     # ODU2, OTU3E2, ...
+        (?:GCC|g)[01]|                                  # GCC0, GCC1
+        [A-Za-z]+(?:-[A-Za-z]+)*                        # generic: POS, tunnel-te, odu...
+    )?
+    # optional spaces
+    \s*
+    # rest is optional too
+    (?:
+        # <number>
+        (?P<number>\d+(?:[/_](?:RP|RSP|CPU)?\d+)*)
+        # optional <subintf>
+        (?:(?P<subintf_sep>[.:])(?P<subintf>\d+))?
+    )?
+    # ignore trailing spaces
+    \s*
+    $
+''', re.VERBOSE | re.IGNORECASE)
+_re_number_cpu = re.compile(r'^(?P<cpu>(?P<rack>\d+)[/_](?P<slot>(?:RP|RSP)?\d+)[/_](?:CPU\d+|\*))$')
+_re_number_rsip = re.compile(r'^(?P<rsip>(?P<rack>\d+)[/_](?P<slot>(?:RP|RSP)?\d+)[/_](?P<instance>\d+)[/_](?P<port>\d+))(?:[/_](?P<subport>\d+))?')
+_re_number_module = re.compile(r'^(?P<module>(?:(?P<net_module>\d+)[/_])?\d+)[/_](?P<port>\d+)$')
+
+
+@functools.lru_cache(maxsize=INTERFACE_NAME_CACHE_SIZE)
+def _parse_interface_name(name):
+    '''Parts of an interface name, as a tuple of (part, value) items.'''
+    d = dict(
+        # main parts
+        type=None,
+        number=None,
+        subintf_sep=None,
+        subintf=None,
+        # sub-parts
+        net_module=None,
+        module=None,
+        rack=None,
+        slot=None,
+        instance=None,
+        port=None,
+        subport=None,
+        cpu=None,
+        rsip=None,
+    )
+
+    m = _re_interface_name.match(name)
+    if not m:
+        raise ValueError('Unrecognized interface name %r' % (name,))
+    d.update(m.groupdict())
+
+    if d['number']:
+        m = _re_number_cpu.match(d['number'])
+        if m:
+            # IOS-XR
+            d.update(m.groupdict())
 
-        m = re.match(r'''
-            ^
-            # ignore leading spaces
-            \s*
-            # not an empty string
-            (?=\S)
-            # optional <type>
-            (?P<type>
-                [JTE][13]|                                      # J1, T1, E1, ...
-                (?:ODU|d|OTU|O)(?:[01234]|[12][EF]|3E[12])|     # ODU2, OTU3E2, ...
-                (?:GCC|g)[01]|                                  # GCC0, GCC1
-                [A-Za-z]+(?:-[A-Za-z]+)*                        # generic: POS, tunnel-te, odu...
-            )?
-            # optional spaces
-            \s*
-            # rest is optional too
-            (?:
-                # <number>
-                (?P<number>\d+(?:[/_](?:RP|RSP|CPU)?\d+)*)
-                # optional <subintf>
-                (?:(?P<subintf_sep>[.:])(?P<subintf>\d+))?
-            )?
-            # ignore trailing spaces
-            \s*
-            $
-        ''', name, re.VERBOSE | re.IGNORECASE)
-        if not m:
-            raise ValueError('Unrecognized interface name %r' % (name,))
-        d.update(m.groupdict())
-
-        if d['number']:
-            m = re.match(r'^(?P<cpu>(?P<rack>\d+)[/_](?P<slot>(?:RP|RSP)?\d+)[/_](?:CPU\d+|\*))$', d['number'])
+        else:
+            # 0/RP0/CPU0/0
+            # 0/RSP0/CPU0/0
+            # 0/0/0/0
+            m = _re_number_rsip.match(d['number'])
             if m:
                 # IOS-XR
                 d.update(m.groupdict())
+                d['cpu'] = '{rack}/{slot}/CPU0'.format_map(d)
 
             else:
-                # 0/RP0/CPU0/0
-                # 0/RSP0/CPU0/0
-                # 0/0/0/0
-                m = re.match(r'^(?P<rsip>(?P<rack>\d+)[/_](?P<slot>(?:RP|RSP)?\d+)[/_](?P<instance>\d+)[/_](?P<port>\d+))(?:[/_](?P<subport>\d+))?', d['number'])
+                m = _re_number_module.match(d['number'])
                 if m:
-                    # IOS-XR
+                    # IOS/NX-OS
                     d.update(m.groupdict())
-                    d['cpu'] = '{rack}/{slot}/CPU0'.format_map(d)
 
-                else:
-                    m = re.match(r'^(?P<module>(?:(?P<net_module>\d+)[/_])?\d+)[/_](?P<port>\d+)$', d['number'])
-                    if m:
-                        # IOS/NX-OS
-                        d.update(m.groupdict())
+    return tuple(d.items())
+
+
+# Generic short->long interface types, looked up in lower case
+_GENERIC_LONG_TYPES = {
+    'g0': 'GCC0',
+    'g1': 'GCC1',
+    'dt': 'Odu-Group-Te',  # what about Odu-Group-Mp?
+    # Special case for at that matches both ATM and Auto-Template
+    'at': 'ATM',
+    # Special case for gi that matches both GigabitEthernet and
+    'gi': 'GigabitEthernet',
+    # Special case for TenGigECtrlr... both TeEC and EC forms seen on XR
+    'ec': 'TenGigECtrlr',
+    'teec': 'TenGigECtrlr',
+    'il': 'InterflexLeft',
+    'ir': 'InterflexRight',
+    # TODO move to nxos
+    # Special case for pw (NXOS pseudowire) that matches several
+    'pw': 'pseudowire',
+    # Special case for se that matches both Serial and Service*
+    # names
+    'se': 'Serial',
+    'sa': 'ServiceApp',
+    'si': 'ServiceInfra',
+    # TODO
+    #'tu' {
+    #    if { $name eq "Tu" } {
+    #        set name_lower "tunnel"
+    #    } else {
+    #        switch -exact -- $caas_os {
+    #            "IOS" -
+    #            "IOSXE" -
+    #            "NXOS" {
+    #                set name_lower "tunnel"
+    #            }
+    #            default {
+    #                set name_lower "tunnel-uti"
+    #            }
+    #        }
+    #    }
+    #}
+    # 'vl' {
+    #     # Special case for vl/Vl/VL that matches vlan on ACSW (but
+    #     # doesn't support short names), Vlan on IOS and VASILeft
+    #     # (hardcoded short name)
+    #     if { $name eq "VL" } {
+    #         set name_lower "vasileft"
+    #     } else {
+    #         set name_lower "vlan"
+    #     }
+    # }
+    'vl': 'vlan',
+    'vr': 'VASIRight',
+    # Special case for lo that matches both Loopback and
+    # LongReachEthernet on Nexus (but doesn't support short names)
+    'lo': 'Loopback',
+}
+
+_re_short_otu = re.compile(r'^o([01234](?:[EF][12]?)?)$', re.IGNORECASE)
+_re_short_odu = re.compile(r'^d([01234](?:[EF][12]?)?)$', re.IGNORECASE)
+_re_long_dash = re.compile('^([a-z])[a-z]*-([a-z])[a-z]*$', re.IGNORECASE)
+_re_long_word = re.compile('^([a-z])([a-z])[a-z]*$', re.IGNORECASE)
+
+# lru_cache of each cached interface name method, cleared when the interface
+# types change
+_interface_name_caches = []
+
+
+def clear_interface_name_caches():
+    '''Forget the clean and short interface names computed so far.'''
+    for cache in _interface_name_caches:
+        cache.cache_clear()
+
+
+def cached_interface_name(func):
+    '''Cache the result of a clean_interface_name/short_interface_name
+    mixedmethod per (class, interface name); The class is the OS-specific
+    Interface class, so the cache is per OS.'''
+
+    @functools.lru_cache(maxsize=INTERFACE_NAME_CACHE_SIZE)
+    def cached(cls, interface_name):
+        return func(None, cls, interface_name)
+
+    @functools.wraps(func)
+    def wrapper(self, cls, interface_name=None):
+        if interface_name is None:
+            interface_name = self.name
+        return cached(cls, interface_name)
+
+    _interface_name_caches.append(cached)
+    return wrapper
+
+
+class ParsedInterfaceName(types.SimpleNamespace):
+
+    def __init__(self, name, device=None):
+        if device is None and isinstance(name, ParsedInterfaceName):
+            # copy constructor
+            return super().__init__(vars(name))
+        assert type(name) is str
 
-        super().__init__(**d)
+        # Parsed once per name; Each object gets its own copy of the parts
+        super().__init__(**dict(_parse_interface_name(name)))
 
     def reconstruct(self):
         return '{type}{number}{subintf_sep}{subintf}'.format(
@@ -503,6 +589,7 @@ class Interface(genie.conf.base.interface.BaseInterface):
 
     @classmethod
     def _build_name_to_class_map(cls):
+        clear_interface_name_caches()
         cls._name_to_class_map = {}
         for subcls in cls.__subclasses__():
             subcls._build_name_to_class_map()
@@ -516,28 +603,20 @@ class Interface(genie.conf.base.interface.BaseInterface):
             range=range)
         return Interface(device=self.device, name=name, **kwargs)
 
+    def generate_sub_interfaces(self, count, range=None, **kwargs):
+        '''Create count sub-interfaces, with the first unused numbers.'''
+        names = SubInterface._generate_unused_sub_interface_names(
+            parent_interface=self,
+            count=count,
+            range=range)
+        return [Interface(device=self.device, name=name, **kwargs)
+                for name in names]
+
     @classmethod
     def _get_os_specific_Interface_class(cls, os):
         assert type(os) is str
-        if False:
-            # XXXJST TODO The abstract module needs to be enhanced.
-            # Use it's API to perform a fast(cached) os-specific only lookup
-            # without instantiating a Lookup instance everytime and be able to
-            # work on classes / class methods.
-            from genie.abstract import Lookup
-            lib = Lookup(os)
-            osInterface = lib.conf.interface.Interface
-            if osInterface is Interface:
-                raise ImportError(
-                    'No Interface class found specific to OS {os!r}' \
-                    .format(os=os))
-
-        else:
-            mod = 'genie.libs.conf.interface.{os}'.\
-                format(os=os)
-            OsInterfaceModule = importlib.import_module(mod)
-            osInterface = OsInterfaceModule.Interface
-        return osInterface
+        # Resolved once per os
+        return os_class('genie.libs.conf.interface', os, 'Interface')
 
     def __new__(cls, *args, **kwargs):
 
@@ -698,6 +777,7 @@ class Interface(genie.conf.base.interface.BaseInterface):
             return d_parsed.number
 
     @mixedmethod
+    @cached_interface_name
     def clean_interface_name(self, cls, interface_name=None):
         if interface_name is None:
             interface_name = self.name
@@ -708,67 +788,14 @@ class Interface(genie.conf.base.interface.BaseInterface):
             return d_parsed.reconstruct()
         # Apply generic short->long mappings
         try:
-            d_parsed.type = {
-                'g0': 'GCC0',
-                'g1': 'GCC1',
-                'dt': 'Odu-Group-Te',  # what about Odu-Group-Mp?
-                # Special case for at that matches both ATM and Auto-Template
-                'at': 'ATM',
-                # Special case for gi that matches both GigabitEthernet and
-                'gi': 'GigabitEthernet',
-                # Special case for TenGigECtrlr... both TeEC and EC forms seen on XR
-                'ec': 'TenGigECtrlr',
-                'teec': 'TenGigECtrlr',
-                'il': 'InterflexLeft',
-                'ir': 'InterflexRight',
-                # TODO move to nxos
-                # Special case for pw (NXOS pseudowire) that matches several
-                'pw': 'pseudowire',
-                # Special case for se that matches both Serial and Service*
-                # names
-                'se': 'Serial',
-                'sa': 'ServiceApp',
-                'si': 'ServiceInfra',
-                # TODO
-                #'tu' {
-                #    if { $name eq "Tu" } {
-                #        set name_lower "tunnel"
-                #    } else {
-                #        switch -exact -- $caas_os {
-                #            "IOS" -
-                #            "IOSXE" -
-                #            "NXOS" {
-                #                set name_lower "tunnel"
-                #            }
-                #            default {
-                #                set name_lower "tunnel-uti"
-                #            }
-                #        }
-                #    }
-                #}
-                # 'vl' {
-                #     # Special case for vl/Vl/VL that matches vlan on ACSW (but
-                #     # doesn't support short names), Vlan on IOS and VASILeft
-                #     # (hardcoded short name)
-                #     if { $name eq "VL" } {
-                #         set name_lower "vasileft"
-                #     } else {
-                #         set name_lower "vlan"
-                #     }
-                # }
-                'vl': 'vlan',
-                'vr': 'VASIRight',
-                # Special case for lo that matches both Loopback and
-                # LongReachEthernet on Nexus (but doesn't support short names)
-                'lo': 'Loopback',
-            }[d_parsed.type.lower()]
+            d_parsed.type = _GENERIC_LONG_TYPES[d_parsed.type.lower()]
         except KeyError:
             for once in [1]:
-                m = re.match(r'^o([01234](?:[EF][12]?)?)$', d_parsed.type, re.IGNORECASE)
+                m = _re_short_otu.match(d_parsed.type)
                 if m:
                     d_parsed.type = 'OTU' + m.group(1).upper()
                     break
-                m = re.match(r'^d([01234](?:[EF][12]?)?)$', d_parsed.type, re.IGNORECASE)
+                m = _re_short_odu.match(d_parsed.type)
                 if m:
                     d_parsed.type = 'ODU' + m.group(1).upper()
                     break
@@ -815,6 +842,7 @@ class Interface(genie.conf.base.interface.BaseInterface):
         return d_parsed.reconstruct()
 
     @mixedmethod
+    @cached_interface_name
     def short_interface_name(self, cls, interface_name=None):
         if interface_name is None:
             interface_name = self.name
@@ -822,13 +850,33 @@ class Interface(genie.conf.base.interface.BaseInterface):
         d_parsed = cls.parse_interface_name(interface_name)
         # When a dash is present, take the first letter of each word.
         # Otherwise, take the first 2 letters
-        m = re.match('^([a-z])[a-z]*-([a-z])[a-z]*$', d_parsed.type, re.IGNORECASE) \
-            or re.match('^([a-z])([a-z])[a-z]*$', d_parsed.type, re.IGNORECASE)
+        m = _re_long_dash.match(d_parsed.type) \
+            or _re_long_word.match(d_parsed.type)
         if m:
             d_parsed.type = m.group(1) + m.group(2)
             return d_parsed.reconstruct()
         return d_parsed.reconstruct()
 
+    @mixedmethod
+    def clean_interface_names(self, cls, interface_names):
+        '''Clean a list of interface names (see clean_interface_name).
+
+        Returns:
+            `list` of the clean names, in the same order
+        '''
+        clean_interface_name = (self or cls).clean_interface_name
+        return [clean_interface_name(name) for name in interface_names]
+
+    @mixedmethod
+    def short_interface_names(self, cls, interface_names):
+        '''Shorten a list of interface names (see short_interface_name).
+
+        Returns:
+            `list` of the short names, in the same order
+        '''
+        short_interface_name = (self or cls).short_interface_name
+        return [short_interface_name(name) for name in interface_names]
+
     @property
     def sub_interfaces(self):
         return {
@@ -880,8 +928,21 @@ class VirtualInterface(Interface,
             device=device, range=range)
         return Interface(device=device, name=name, **kwargs)
 
+    @classmethod
+    def generate_interfaces(cls, device, count, range=None, **kwargs):
+        '''Create count interfaces, with the first unused numbers.'''
+        names = cls._generate_unused_interface_names(
+            device=device, count=count, range=range)
+        return [Interface(device=device, name=name, **kwargs)
+                for name in names]
+
     @classmethod
     def _generate_unused_interface_name(cls, device, range=None):
+        return cls._generate_unused_interface_names(
+            device=device, count=1, range=range)[0]
+
+    @classmethod
+    def _generate_unused_interface_names(cls, device, count, range=None):
         assert isinstance(device, genie.conf.base.Device)
         # Find the os-specific version of this class
         cls = _get_descendent_subclass(
@@ -902,15 +963,12 @@ class VirtualInterface(Interface,
             range = cls._interface_name_number_range
         if type(range) is int:
             range = [range]
-        for n in range:
-            interface_name = '{}{}'.format(
-                interface_name_type, n)
-            if interface_name not in device.interfaces:
-                break
-        else:
+        interface_names = UsedInterfaceNumbers.of(device).unused_names(
+            interface_name_type, range, count=count)
+        if len(interface_names) < count:
             raise TypeError('No more %r interface numbers available on %r' % (
                 interface_name_type, device))
-        return interface_name
+        return interface_names
 
 
 class PseudoInterface(VirtualInterface,
@@ -923,10 +981,7 @@ class EmulatedInterface(Interface):
     @classmethod
     def _get_os_specific_EmulatedInterface_class(cls, os):
         assert type(os) is str
-        mod = 'genie.libs.conf.interface.{os}'.\
-            format(os=os)
-        OsInterfaceModule = importlib.import_module(mod)
-        return OsInterfaceModule.EmulatedInterface
+        return os_class('genie.libs.conf.interface', os, 'EmulatedInterface')
 
     @property
     def tgen_interface(self):
@@ -1298,6 +1353,12 @@ class SubInterface(VirtualInterface):
 
     @classmethod
     def _generate_unused_sub_interface_name(cls, parent_interface, range=None):
+        return cls._generate_unused_sub_interface_names(
+            parent_interface=parent_interface, count=1, range=range)[0]
+
+    @classmethod
+    def _generate_unused_sub_interface_names(cls, parent_interface, count,
+                                             range=None):
         assert isinstance(parent_interface, genie.conf.base.Interface)
         device = parent_interface.device
         # Find the os-specific version of this class
@@ -1310,15 +1371,12 @@ class SubInterface(VirtualInterface):
             range = cls._interface_name_subintf_range
         if type(range) is int:
             range = [range]
-        for n in range:
-            interface_name = '{}.{}'.format(
-                parent_interface_name, n)
-            if interface_name not in device.interfaces:
-                break
-        else:
+        interface_names = UsedInterfaceNumbers.of(device).unused_names(
+            parent_interface_name + '.', range, count=count)
+        if len(interface_names) < count:
             raise TypeError('No more %r subinterface numbers available on %r' % (
                 parent_interface_name, device))
-        return interface_name
+        return interface_names
 
 
 class VlanInterface(VirtualInterface):
@@ -1576,6 +1576,7 @@ class Interface(genie.libs.conf.interface.Interface):
         super().__init__(*args, **kwargs)
 
     @mixedmethod
+    @genie.libs.conf.interface.cached_interface_name
     def clean_interface_name(self, cls, interface_name=None):
         if interface_name is None:
             interface_name = self.name
@@ -1614,6 +1615,7 @@ class Interface(genie.libs.conf.interface.Interface):
         return super(self or cls, Interface).clean_interface_name(d_parsed.reconstruct())
 
     @mixedmethod
+    @genie.libs.conf.interface.cached_interface_name
     def short_interface_name(self, cls, interface_name=None):
         if interface_name is None:
             interface_name = self.name
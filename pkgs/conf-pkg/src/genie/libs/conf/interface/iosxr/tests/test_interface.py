@@ -279,6 +279,42 @@ class test_interface(TestCase):
         with self.assertRaisesRegex(TypeError, r'^No more .* subinterface numbers available'):
             intf2.generate_sub_interface(range=[100, 200])
 
+    def test_generate_interfaces(self):
+
+        Genie.testbed = Testbed()
+        dev1 = Device(name='PE1', os='iosxr')
+
+        lo1 = Interface(device=dev1, name='Loopback1')
+        lo3 = Interface(device=dev1, name='Loopback3')
+        s = LoopbackInterface._generate_unused_interface_names(device=dev1,
+                                                               count=3)
+        self.assertEqual(s, ['Loopback0', 'Loopback2', 'Loopback4'])
+        # Not reserved until created
+        s = LoopbackInterface._generate_unused_interface_name(device=dev1)
+        self.assertEqual(s, 'Loopback0')
+        los = LoopbackInterface.generate_interfaces(device=dev1, count=3)
+        self.assertEqual([lo.name for lo in los],
+                         ['Loopback0', 'Loopback2', 'Loopback4'])
+        lo = LoopbackInterface.generate_interface(device=dev1)
+        self.assertEqual(lo.name, 'Loopback5')
+        # Created some other way
+        lo6 = Interface(device=dev1, name='Loopback6')
+        lo = LoopbackInterface.generate_interface(device=dev1)
+        self.assertEqual(lo.name, 'Loopback7')
+        with self.assertRaisesRegex(TypeError, r'^No more .* interface numbers available'):
+            LoopbackInterface.generate_interfaces(device=dev1, count=3,
+                                                  range=range(6, 10))
+
+        intf1 = Interface(device=dev1, name='GigabitEthernet0/0/0/0')
+        subs = intf1.generate_sub_interfaces(count=2)
+        self.assertEqual([sub.name for sub in subs],
+                         [intf1.name + '.0', intf1.name + '.1'])
+        subs = intf1.generate_sub_interfaces(count=2, range=range(100, 200))
+        self.assertEqual([sub.name for sub in subs],
+                         [intf1.name + '.100', intf1.name + '.101'])
+        s = SubInterface._generate_unused_sub_interface_name(parent_interface=intf1)
+        self.assertEqual(s, intf1.name + '.2')
+
     def test_clean_short_interface_name(self):
 
         Genie.testbed = Testbed()
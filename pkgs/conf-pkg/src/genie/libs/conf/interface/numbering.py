@@ -0,0 +1,194 @@
+'''Index of the interface numbers used on a device, to generate unused names
+
+Generating an unused interface name used to try every number of the range
+in turn until one is not a name of the device, so generating N interfaces
+took N*N tries. The numbers used by the names of a device are indexed once
+per device, per name prefix ('Loopback', 'GigabitEthernet0/0/0/0.', ...), as
+sets of intervals where the next unused number is found by bisection.
+
+Names are never reserved: A generated name is used once an interface is
+created with it, as before. The names generated last are checked on the next
+call; When the number of interfaces of the device is not explained by them,
+interfaces were created or removed some other way and the index is built
+again. As many interfaces removed as created some other way between two calls
+are not seen; Call refresh then.
+
+Example:
+
+    >>> # Loopback0, Loopback2 and Loopback3 exist
+    >>> numbers = UsedInterfaceNumbers.of(device)
+    >>> numbers.unused_names('Loopback', range(0, 65536), count=3)
+    ['Loopback1', 'Loopback4', 'Loopback5']
+'''
+
+__all__ = (
+    'IntervalSet',
+    'UsedInterfaceNumbers',
+)
+
+import re
+import bisect
+
+_re_name_number = re.compile(r'^(?P<prefix>.*?)(?P<number>0|[1-9][0-9]*)$')
+
+
+class IntervalSet(object):
+    '''Set of integers, kept as sorted disjoint intervals [start, end)
+
+    Membership and next unused number are found by bisection.
+    '''
+
+    def __init__(self, numbers=()):
+        self._starts = []
+        self._ends = []
+        for number in sorted(set(numbers)):
+            self.add(number)
+
+    def copy(self):
+        other = type(self)()
+        other._starts = list(self._starts)
+        other._ends = list(self._ends)
+        return other
+
+    def __contains__(self, number):
+        i = bisect.bisect_right(self._starts, number) - 1
+        return i >= 0 and number < self._ends[i]
+
+    def __iter__(self):
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end)
+
+    def __len__(self):
+        return sum(end - start
+                   for start, end in zip(self._starts, self._ends))
+
+    def intervals(self):
+        '''List of (start, end) intervals, end excluded'''
+        return list(zip(self._starts, self._ends))
+
+    def next_unused(self, number):
+        '''Return the first number, from number on, not in the set'''
+        i = bisect.bisect_right(self._starts, number) - 1
+        if i >= 0 and number < self._ends[i]:
+            # Intervals are merged, the end is never in the set
+            return self._ends[i]
+        return number
+
+    def add(self, number):
+        i = bisect.bisect_right(self._starts, number) - 1
+        if i >= 0 and number < self._ends[i]:
+            return
+        merge_before = i >= 0 and self._ends[i] == number
+        merge_after = i + 1 < len(self._starts) \
+            and self._starts[i + 1] == number + 1
+        if merge_before and merge_after:
+            self._ends[i] = self._ends[i + 1]
+            del self._starts[i + 1]
+            del self._ends[i + 1]
+        elif merge_before:
+            self._ends[i] = number + 1
+        elif merge_after:
+            self._starts[i + 1] = number
+        else:
+            self._starts.insert(i + 1, number)
+            self._ends.insert(i + 1, number + 1)
+
+
+class UsedInterfaceNumbers(object):
+    '''Numbers used by the interface names of a device, per name prefix
+
+    Args:
+        device (`Device`): Device of the interfaces
+    '''
+
+    def __init__(self, device):
+        self.device = device
+        self.refresh()
+
+    @classmethod
+    def of(cls, device):
+        '''Return the index of a device, built once'''
+        numbers = device.__dict__.get('_used_interface_numbers')
+        if numbers is None:
+            numbers = cls(device)
+            device.__dict__['_used_interface_numbers'] = numbers
+        return numbers
+
+    def refresh(self):
+        '''Index the names of the device again'''
+        self._prefixes = {}
+        # Names generated by the last call, maybe created since
+        self._generated = []
+        names = list(self.device.interfaces.keys())
+        self._count = len(names)
+        for name in names:
+            self._add(name)
+
+    def _add(self, name):
+        m = _re_name_number.match(name)
+        if m:
+            self.used(m.group('prefix')).add(int(m.group('number')))
+
+    def used(self, prefix):
+        '''IntervalSet of the numbers used after prefix'''
+        try:
+            return self._prefixes[prefix]
+        except KeyError:
+            return self._prefixes.setdefault(prefix, IntervalSet())
+
+    def unused_names(self, prefix, numbers, count=1):
+        '''Return the first count unused names of prefix followed by one of
+        numbers
+
+        Args:
+            prefix (`str`): Start of the names
+            numbers: range (searched by bisection) or iterable of numbers
+            count (`int`): Number of names
+
+        Returns:
+            `list` of names; Shorter than count when numbers run out
+        '''
+        if count < 1:
+            return []
+        interfaces = self.device.interfaces
+        for name in self._generated:
+            if name in interfaces:
+                self._add(name)
+                self._count += 1
+        self._generated = []
+        if len(interfaces) != self._count:
+            # Interfaces created or removed some other way
+            self.refresh()
+
+        used = self.used(prefix)
+        if count > 1:
+            # Names of this call; Not reserved on the device
+            used = used.copy()
+        names = []
+        if isinstance(numbers, range) and numbers.step == 1:
+            number = used.next_unused(numbers.start)
+            while number < numbers.stop and len(names) < count:
+                name = '{}{}'.format(prefix, number)
+                if name not in interfaces:
+                    names.append(name)
+                    if count == 1:
+                        break
+                used.add(number)
+                number = used.next_unused(number)
+            self._generated = names
+            return names
+
+        # Iterators (itertools.count, ...) are not consumed past the last name
+        for number in numbers:
+            if type(number) is int and number in used:
+                continue
+            name = '{}{}'.format(prefix, number)
+            unused = name not in interfaces
+            if type(number) is int and (count > 1 or not unused):
+                used.add(number)
+            if unused:
+                names.append(name)
+                if len(names) >= count:
+                    break
+        self._generated = names
+        return names
@@ -106,6 +106,30 @@ class test_interface(TestCase):
         self.assertEqual(d_parsed.subintf, None)
         self.assertEqual(d_parsed.reconstruct(), 'OTU3E20/0/0/0')
 
+    def test_interface_names_cached(self):
+
+        # Each parse gets its own parts, even when cached
+        d_parsed = ParsedInterfaceName('GigabitEthernet0/0/0/0.2')
+        d_parsed.type = 'Gi'
+        d_parsed = ParsedInterfaceName('GigabitEthernet0/0/0/0.2')
+        self.assertEqual(d_parsed.type, 'GigabitEthernet')
+        self.assertEqual(d_parsed.subintf, '2')
+
+        names = ['Gi0/0/0/0', 'Te0/1/0/0.100', 'BE1', 'Gi0/0/0/0']
+        self.assertEqual(iosxrInterface.clean_interface_names(names), [
+            'GigabitEthernet0/0/0/0',
+            'TenGigE0/1/0/0.100',
+            'Bundle-Ether1',
+            'GigabitEthernet0/0/0/0',
+        ])
+        self.assertEqual(
+            iosxrInterface.short_interface_names(
+                ['GigabitEthernet0/0/0/0', 'Bundle-Ether1.2']),
+            ['Gi0/0/0/0', 'BE1.2'])
+        self.assertEqual(
+            [iosxrInterface.clean_interface_name(name) for name in names],
+            iosxrInterface.clean_interface_names(names))
+
     def test_init(self):
 
         Genie.testbed = Testbed()
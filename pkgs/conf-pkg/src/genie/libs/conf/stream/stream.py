@@ -2,8 +2,10 @@
 __all__ = (
     'Stream',
     'StreamStats',
+    'StreamStatsTable',
 )
 
+import array
 import functools
 import collections
 import itertools
@@ -19,6 +21,11 @@ try:
 except Exception:
     item_cast = None
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from genie.utils.cisco_collections import Range
 from genie.utils.cisco_collections import typedset
 
@@ -74,21 +81,75 @@ def _asdict(self):
     return d
 
 
+def _asdict_value(v):
+    if getattr(v, 'asdict', None):
+        return v.asdict()
+    if isinstance(v, collections.Mapping):
+        return {k2: v2.asdict() if getattr(v2, 'asdict', None) else v2
+                for k2, v2 in v.items()}
+    return v
+
+
+def _is_counter(attr):
+    # Makes no sense substituting delays, lengths and rates
+    return not attr.endswith(('_delay', '_length', '_rate'))
+
+
 class _StatsBase(object):
+    '''Base of the TX/RX statistics
 
-    asdict = _asdict
+    The counters known to all TGENs are slots, listed in `_fields`; Vendor
+    specific counters can still be set and are kept in `__dict__`.
+    '''
+
+    __slots__ = ('__dict__',)
+
+    # Counters
+    _fields = ()
+    # Counters which can be subtracted
+    _counter_fields = ()
+    # (count, rate) counters, rates are updated from the counts
+    _rate_fields = ()
+    # Other public attributes reported by asdict
+    _asdict_attributes = ()
+
+    def __init__(self):
+        for field in self._fields:
+            setattr(self, field, None)
+
+    def asdict(self):
+        d = {field: getattr(self, field) for field in self._fields}
+        for k, v in self.__dict__.items():
+            if k.startswith('_') or callable(v):
+                continue
+            d[k] = _asdict_value(v)
+        for k in self._asdict_attributes:
+            d[k] = _asdict_value(getattr(self, k))
+        return d
 
     def __sub__(self, other):
         d = type(self)()
 
-        for attr in set(dir(self)) | set(dir(other)):
+        for attr in self._counter_fields:
+            v_self = getattr(self, attr)
+            if v_self is None:
+                v_self = 0
+            v_other = getattr(other, attr, None)
+            if v_other is None:
+                v_other = 0
+            try:
+                setattr(d, attr, v_self - v_other)
+            except TypeError:
+                pass
+
+        # Vendor specific counters
+        extra_attrs = set(self.__dict__)
+        extra_attrs.update(other.__dict__)
+        for attr in extra_attrs:
             if attr.startswith('_'):
                 # Private... sub-class must handle if important
                 continue
-            if attr.endswith('_delay') \
-                    or attr.endswith('_length') \
-                    or attr.endswith('_rate'):
-                # Makes no sense substituting these
+            if not _is_counter(attr):
                 continue
             v_self = getattr(self, attr, None)
             if v_self is None:
@@ -104,28 +165,7 @@ class _StatsBase(object):
         return d
 
     def _update_rate_stats(self, elapsed_time):
-        pass
-
-
-class TxStats(_StatsBase):
-    '''Generic TX statistics'''
-    total_pkts = None
-    total_pkt_rate = None
-    total_pkt_bits = None
-    total_pkt_bit_rate = None
-    total_pkt_bytes = None
-    total_pkt_byte_rate = None
-
-    def _update_rate_stats(self, elapsed_time):
-        super()._update_rate_stats(elapsed_time)
-
-        map_count_rate_stats = {
-            'total_pkts': 'total_pkt_rate',
-            'total_pkt_bits': 'total_pkt_bit_rate',
-            'total_pkt_bytes': 'pkt_byte_rate',
-        }
-
-        for count_attr, rate_attr in map_count_rate_stats.items():
+        for count_attr, rate_attr in self._rate_fields:
             count_value = getattr(self, count_attr, None)
             if count_value is None:
                 continue
@@ -135,55 +175,68 @@ class TxStats(_StatsBase):
                 pass
 
 
+class TxStats(_StatsBase):
+    '''Generic TX statistics'''
+
+    __slots__ = _fields = (
+        'total_pkts',
+        'total_pkt_rate',
+        'total_pkt_bits',
+        'total_pkt_bit_rate',
+        'total_pkt_bytes',
+        'total_pkt_byte_rate',
+    )
+
+    _counter_fields = tuple(filter(_is_counter, _fields))
+
+    _rate_fields = (
+        ('total_pkts', 'total_pkt_rate'),
+        ('total_pkt_bits', 'total_pkt_bit_rate'),
+        ('total_pkt_bytes', 'pkt_byte_rate'),
+    )
+
+
 class RxStats(_StatsBase):
     '''Generic RX statistics'''
-    total_pkts = None
-    total_pkt_rate = None
-    total_pkt_bits = None
-    total_pkt_bit_rate = None
-    total_pkt_bytes = None
-    total_pkt_byte_rate = None
-    min_delay = None
-    max_delay = None
-    avg_delay = None
-    out_of_sequence_pkts = None
-    out_of_sequence_pkt_rate = None
-    x_adv_seq_in_order_pkts = None
-    x_adv_seq_in_order_pkt_rate = None
-    x_adv_seq_reordered_pkts = None
-    x_adv_seq_reordered_pkt_rate = None
-    x_adv_seq_late_pkts = None
-    x_adv_seq_late_pkt_rate = None
-    x_adv_seq_duplicate_pkts = None
-    x_adv_seq_duplicate_pkt_rate = None
-    x_adv_seq_dropped_pkts = None
-    x_adv_seq_dropped_pkt_rate = None
-    x_has_port_stray_pkts = None
 
-    def _update_rate_stats(self, elapsed_time):
-        super()._update_rate_stats(elapsed_time)
-
-        map_count_rate_stats = {
-            'total_pkts': 'total_pkt_rate',
-            'total_pkt_bits': 'total_pkt_bit_rate',
-            'total_pkt_bytes': 'pkt_byte_rate',
-            'total_pkt_bytes': 'total_pkt_byte_rate',
-            'out_of_sequence_pkts': 'out_of_sequence_pkt_rate',
-            'x_adv_seq_in_order_pkts': 'x_adv_seq_in_order_pkt_rate',
-            'x_adv_seq_reordered_pkts': 'x_adv_seq_reordered_pkt_rate',
-            'x_adv_seq_late_pkts': 'x_adv_seq_late_pkt_rate',
-            'x_adv_seq_duplicate_pkts': 'x_adv_seq_duplicate_pkt_rate',
-            'x_adv_seq_dropped_pkts': 'x_adv_seq_dropped_pkt_rate',
-        }
-
-        for count_attr, rate_attr in map_count_rate_stats.items():
-            count_value = getattr(self, count_attr, None)
-            if count_value is None:
-                continue
-            try:
-                setattr(self, rate_attr, count_value / elapsed_time)
-            except (TypeError, ZeroDivisionError):
-                pass
+    __slots__ = _fields = (
+        'total_pkts',
+        'total_pkt_rate',
+        'total_pkt_bits',
+        'total_pkt_bit_rate',
+        'total_pkt_bytes',
+        'total_pkt_byte_rate',
+        'min_delay',
+        'max_delay',
+        'avg_delay',
+        'out_of_sequence_pkts',
+        'out_of_sequence_pkt_rate',
+        'x_adv_seq_in_order_pkts',
+        'x_adv_seq_in_order_pkt_rate',
+        'x_adv_seq_reordered_pkts',
+        'x_adv_seq_reordered_pkt_rate',
+        'x_adv_seq_late_pkts',
+        'x_adv_seq_late_pkt_rate',
+        'x_adv_seq_duplicate_pkts',
+        'x_adv_seq_duplicate_pkt_rate',
+        'x_adv_seq_dropped_pkts',
+        'x_adv_seq_dropped_pkt_rate',
+        'x_has_port_stray_pkts',
+    )
+
+    _counter_fields = tuple(filter(_is_counter, _fields))
+
+    _rate_fields = (
+        ('total_pkts', 'total_pkt_rate'),
+        ('total_pkt_bits', 'total_pkt_bit_rate'),
+        ('total_pkt_bytes', 'total_pkt_byte_rate'),
+        ('out_of_sequence_pkts', 'out_of_sequence_pkt_rate'),
+        ('x_adv_seq_in_order_pkts', 'x_adv_seq_in_order_pkt_rate'),
+        ('x_adv_seq_reordered_pkts', 'x_adv_seq_reordered_pkt_rate'),
+        ('x_adv_seq_late_pkts', 'x_adv_seq_late_pkt_rate'),
+        ('x_adv_seq_duplicate_pkts', 'x_adv_seq_duplicate_pkt_rate'),
+        ('x_adv_seq_dropped_pkts', 'x_adv_seq_dropped_pkt_rate'),
+    )
 
 
 class BySubStreamTxStats(TxStats):
@@ -199,6 +252,8 @@ class BySubStreamRxStats(RxStats):
 class StreamTxStats(TxStats):
     '''Stream TX statistics'''
 
+    _asdict_attributes = ('by_sub_stream',)
+
     # dict of BySubStreamTxStats
     by_sub_stream = managedattribute(
         name='by_sub_stream',
@@ -224,6 +279,8 @@ class StreamTxStats(TxStats):
 class StreamRxStats(RxStats):
     '''Stream RX statistics'''
 
+    _asdict_attributes = ('by_sub_stream',)
+
     # dict of BySubStreamRxStats
     by_sub_stream = managedattribute(
         name='by_sub_stream',
@@ -346,6 +403,14 @@ class StreamStats(object):
 
     asdict = _asdict
 
+    def to_table(self):
+        '''Convert to a columnar `StreamStatsTable`
+
+        Subtracting tables is much faster than subtracting StreamStats when
+        there are many streams.
+        '''
+        return StreamStatsTable.from_stream_stats(self)
+
     def __sub__(self, other):
 
         d = StreamStats()
@@ -358,6 +423,288 @@ class StreamStats(object):
 
         return d
 
+class StreamStatsTable(object):
+    '''Columnar statistics of many streams
+
+    One row per (stream, interface) pair, interface is None for the totals of
+    the stream, and one column per counter, such as 'tx_total_pkts' or
+    'rx_max_delay'. The columns are NumPy arrays when NumPy is installed,
+    otherwise `array.array`.
+
+    The count columns (packets, bytes, bits, ...) hold integers; Whether a
+    count was collected is given by `collected`. The rate, delay and
+    elapsed_time columns hold floats, NaN when not collected.
+
+    Example:
+
+        >>> table = tgen.get_stream_stats_table()
+        >>> table.get(stream, 'rx_total_pkts')
+        >>> for stream, interface, counters in table:
+        ...     pass
+        >>> delta = table2 - table1
+    '''
+
+    TX_COUNTERS = (
+        'total_pkts',
+        'total_pkt_rate',
+        'total_pkt_bits',
+        'total_pkt_bit_rate',
+        'total_pkt_bytes',
+        'total_pkt_byte_rate',
+    )
+
+    RX_COUNTERS = TX_COUNTERS + (
+        'min_delay',
+        'max_delay',
+        'avg_delay',
+        'out_of_sequence_pkts',
+        'out_of_sequence_pkt_rate',
+        'x_adv_seq_in_order_pkts',
+        'x_adv_seq_in_order_pkt_rate',
+        'x_adv_seq_reordered_pkts',
+        'x_adv_seq_reordered_pkt_rate',
+        'x_adv_seq_late_pkts',
+        'x_adv_seq_late_pkt_rate',
+        'x_adv_seq_duplicate_pkts',
+        'x_adv_seq_duplicate_pkt_rate',
+        'x_adv_seq_dropped_pkts',
+        'x_adv_seq_dropped_pkt_rate',
+        'x_has_port_stray_pkts',
+    )
+
+    COLUMNS = tuple('tx_' + counter for counter in TX_COUNTERS) \
+        + tuple('rx_' + counter for counter in RX_COUNTERS) \
+        + ('elapsed_time',)
+
+    collect_time = None
+
+    def __init__(self, rows, columns=None):
+        self.rows = tuple(rows)
+        self.columns = tuple(columns or self.COLUMNS)
+        self._row_index = {row: i for i, row in enumerate(self.rows)}
+        self._column_index = {column: i
+                              for i, column in enumerate(self.columns)}
+        # Values of each column, and for the count columns, whether each
+        # value was collected
+        self._data = []
+        self._collected = []
+        for column in self.columns:
+            if self.is_count(column):
+                self._data.append(self._new_column(0))
+                self._collected.append(self._new_column(False))
+            else:
+                self._data.append(self._new_column(float('nan')))
+                self._collected.append(None)
+        self.collect_time = datetime.datetime.now()
+
+    @staticmethod
+    def is_count(column):
+        '''True when the column holds integral counts'''
+        return not column.endswith(('_rate', '_delay', '_length')) \
+            and column != 'elapsed_time'
+
+    def _new_column(self, value):
+        '''Return a column of len(self.rows) values'''
+        if numpy is not None:
+            dtype = {bool: bool, int: numpy.int64}.get(type(value), float)
+            return numpy.full(len(self.rows), value, dtype=dtype)
+        typecode = {bool: 'b', int: 'q'}.get(type(value), 'd')
+        return array.array(typecode, [value]) * len(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, row):
+        return row in self._row_index
+
+    def column(self, column):
+        '''Return the values of a counter, in the order of the rows
+
+        The counts not collected are 0, see `collected`.
+        '''
+        return self._data[self._column_index[column]]
+
+    def collected(self, column):
+        '''Return whether each value of a counter was collected, in the
+        order of the rows'''
+        i = self._column_index[column]
+        if self._collected[i] is not None:
+            return self._collected[i]
+        values = self._data[i]
+        if numpy is not None:
+            return ~numpy.isnan(values)
+        return [value == value for value in values]
+
+    def set(self, stream, interface, column, value):
+        '''Set the value of a counter; None is not collected'''
+        i = self._column_index[column]
+        row = self._row_index[(stream, interface)]
+        collected = self._collected[i]
+        if collected is None:
+            self._data[i][row] = float('nan') if value is None else value
+        elif value is None:
+            self._data[i][row] = 0
+            collected[row] = False
+        else:
+            self._data[i][row] = int(value)
+            collected[row] = True
+
+    def get(self, stream, column, interface=None, default=None):
+        '''Return the value of a counter, or default if not collected'''
+        try:
+            i = self._column_index[column]
+            row = self._row_index[(stream, interface)]
+        except KeyError:
+            return default
+        value = self._data[i][row]
+        if self._collected[i] is not None:
+            return int(value) if self._collected[i][row] else default
+        if value != value:
+            # NaN
+            return default
+        return float(value)
+
+    def __iter__(self):
+        '''Yield (stream, interface, {counter: value}) for every collected
+        counter of every row'''
+        columns = [(column, int if self._collected[i] is not None else float,
+                    self._data[i], self.collected(column))
+                   for i, column in enumerate(self.columns)]
+        for row, (stream, interface) in enumerate(self.rows):
+            yield stream, interface, {
+                column: type_(values[row])
+                for column, type_, values, collected in columns
+                if collected[row]}
+
+    def __sub__(self, other):
+        '''Difference of the counts between 2 collections
+
+        The rows are the rows of self. Rows missing from other, such as
+        streams created since, are compared against 0; Rows only in other,
+        such as streams removed since, are not in the difference. Rates,
+        delays and lengths are kept from self.
+        '''
+        d = StreamStatsTable(self.rows, self.columns)
+        d.collect_time = other.collect_time
+        # Row of other for each row of self
+        pairs = [(i, other._row_index[row])
+                 for i, row in enumerate(self.rows)
+                 if row in other._row_index]
+        for i, column in enumerate(self.columns):
+            values = self._data[i]
+            if self._collected[i] is not None:
+                d._collected[i][:] = self._collected[i]
+            if column.endswith(('_delay', '_length', '_rate')) \
+                    or column == 'rx_x_has_port_stray_pkts' \
+                    or column not in other._column_index:
+                # Makes no sense substituting these
+                d._data[i][:] = values
+                continue
+            other_values = other.column(column)
+            other_collected = other.collected(column)
+            if numpy is not None:
+                base = numpy.zeros(len(self.rows), dtype=values.dtype)
+                if pairs:
+                    rows, other_rows = (list(rows) for rows in zip(*pairs))
+                    base[rows] = numpy.where(other_collected[other_rows],
+                                             other_values[other_rows], 0)
+                d._data[i][:] = values - base
+            else:
+                diff = d._data[i]
+                diff[:] = values
+                for row, other_row in pairs:
+                    if other_collected[other_row]:
+                        diff[row] -= other_values[other_row]
+        d._update_rates()
+        return d
+
+    def _update_rates(self):
+        '''Compute the rates from the counts and the elapsed time of the
+        streams, as ByStreamStats does after a subtraction'''
+        if 'elapsed_time' not in self._column_index:
+            return
+        elapsed_times = self.column('elapsed_time')
+        # Elapsed time of the stream of each row
+        elapsed_time_rows = [self._row_index.get((stream, None))
+                             for stream, _ in self.rows]
+        nan = float('nan')
+        elapsed = [nan if i is None else elapsed_times[i]
+                   for i in elapsed_time_rows]
+        if numpy is not None:
+            elapsed = numpy.array(elapsed)
+            with numpy.errstate(invalid='ignore'):
+                valid_elapsed = elapsed > 0
+        for direction, stats_cls in (('tx_', TxStats), ('rx_', RxStats)):
+            for count, rate in stats_cls._rate_fields:
+                count, rate = direction + count, direction + rate
+                if count not in self._column_index \
+                        or rate not in self._column_index:
+                    continue
+                counts = self.column(count)
+                collected = self.collected(count)
+                rates = self.column(rate)
+                if numpy is not None:
+                    valid = valid_elapsed & collected
+                    rates[valid] = counts[valid] / elapsed[valid]
+                else:
+                    for i, elapsed_time in enumerate(elapsed):
+                        if elapsed_time > 0 and collected[i]:
+                            rates[i] = counts[i] / elapsed_time
+
+    @classmethod
+    def from_stream_stats(cls, stats):
+        '''Build a table from a `StreamStats` object'''
+        rows = []
+        for stream, by_stream in stats.by_stream.items():
+            rows.append((stream, None))
+            rows.extend((stream, interface)
+                        for interface in by_stream.by_interface)
+        table = cls(rows)
+        table.collect_time = stats.collect_time
+        for stream, interface in rows:
+            by_stream = stats.by_stream[stream]
+            if interface is None:
+                target = by_stream
+                table.set(stream, None, 'elapsed_time', by_stream.elapsed_time)
+            else:
+                target = by_stream.by_interface[interface]
+            for direction, counters in (('tx', cls.TX_COUNTERS),
+                                        ('rx', cls.RX_COUNTERS)):
+                sub_stats = getattr(target, direction)
+                for counter in counters:
+                    value = getattr(sub_stats, counter, None)
+                    if isinstance(value, (int, float)):
+                        table.set(stream, interface,
+                                  direction + '_' + counter, value)
+        return table
+
+    def to_stream_stats(self):
+        '''Convert to a `StreamStats` object'''
+        stats = StreamStats()
+        stats.collect_time = self.collect_time
+        for stream, interface, counters in self:
+            by_stream = stats.by_stream.get(stream)
+            if by_stream is None:
+                by_stream = stats.by_stream[stream] = ByStreamStats()
+            if interface is None:
+                target = by_stream
+                by_stream.elapsed_time = counters.get('elapsed_time')
+            else:
+                target = by_stream.by_interface.get(interface)
+                if target is None:
+                    target = by_stream.by_interface[interface] = \
+                        ByInterfaceStreamStats()
+            for column, value in counters.items():
+                direction, _, counter = column.partition('_')
+                if direction == 'tx':
+                    setattr(target.tx, counter, value)
+                elif direction == 'rx':
+                    if counter == 'x_has_port_stray_pkts':
+                        value = bool(value)
+                    setattr(target.rx, counter, value)
+        return stats
+
+
 @functools.total_ordering
 class Stream(ConfigurableBase):
 
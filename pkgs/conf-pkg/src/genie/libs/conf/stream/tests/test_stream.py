@@ -10,7 +10,7 @@ from genie.conf import Genie
 from genie.conf.base import Testbed, Device, Link, Interface
 from genie.conf.base.attributes import UnsupportedAttributeWarning
 
-from genie.libs.conf.stream import Stream
+from genie.libs.conf.stream import Stream, StreamStats, StreamStatsTable
 from genie.libs.conf.base import MAC, IPv4Address, IPv6Address
 
 
@@ -137,6 +137,125 @@ class test_stream(TestCase):
         self.assertTypedEqual(stream1.obj_state, 'active')
         self.assertTypedEqual(stream1.sub_stream_increments, typedset(Stream.SubStreamIncrement, ()))
 
+
+class test_stream_stats(TestCase):
+
+    def test_sub(self):
+
+        stats1 = StreamStats.ByStreamStats()
+        stats1.tx.total_pkts = 1000
+        stats1.rx.total_pkts = 900
+        stats1.rx.min_delay = 5
+        # Vendor-specific counter
+        stats1.rx._dropped_pkts = 100
+        stats1.rx.dropped_pkts = 100
+        stats1.elapsed_time = 10
+        stats2 = StreamStats.ByStreamStats()
+        stats2.tx.total_pkts = 500
+        stats2.rx.total_pkts = 450
+        stats2.elapsed_time = 5
+
+        delta = stats1 - stats2
+        self.assertEqual(delta.tx.total_pkts, 500)
+        self.assertEqual(delta.tx.total_pkt_rate, 100)
+        self.assertEqual(delta.rx.total_pkts, 450)
+        self.assertEqual(delta.rx.dropped_pkts, 100)
+        self.assertIs(delta.rx.min_delay, None)
+        self.assertFalse(hasattr(delta.rx, '_dropped_pkts'))
+
+    def test_asdict(self):
+
+        stats = StreamStats.ByStreamStats()
+        stats.rx.total_pkts = 10
+        stats.rx.dropped_pkts = 1
+        d = stats.rx.asdict()
+        self.assertEqual(d['total_pkts'], 10)
+        self.assertEqual(d['dropped_pkts'], 1)
+        self.assertIs(d['max_delay'], None)
+        self.assertEqual(d['by_sub_stream'], {})
+
+
+class test_stream_stats_table(TestCase):
+
+    def test_table(self):
+
+        table1 = StreamStatsTable([('s1', None), ('s1', 'intf1'), ('s2', None)])
+        table1.set('s1', None, 'tx_total_pkts', 100)
+        table1.set('s1', None, 'rx_max_delay', 3.5)
+        table1.set('s1', 'intf1', 'rx_total_pkts', 90)
+        table1.set('s2', None, 'tx_total_pkts', 5)
+
+        self.assertEqual(len(table1), 3)
+        self.assertEqual(table1.get('s1', 'tx_total_pkts'), 100)
+        self.assertEqual(table1.get('s1', 'rx_total_pkts', interface='intf1'), 90)
+        self.assertIs(table1.get('s1', 'rx_total_pkts'), None)
+        self.assertIs(table1.get('s3', 'tx_total_pkts'), None)
+        self.assertEqual(list(table1), [
+            ('s1', None, {'tx_total_pkts': 100, 'rx_max_delay': 3.5}),
+            ('s1', 'intf1', {'rx_total_pkts': 90}),
+            ('s2', None, {'tx_total_pkts': 5}),
+        ])
+
+        table2 = StreamStatsTable([('s1', None), ('s1', 'intf1')])
+        table2.set('s1', None, 'tx_total_pkts', 40)
+        table2.set('s1', None, 'rx_max_delay', 1)
+        table2.set('s1', 'intf1', 'rx_total_pkts', 80)
+
+        delta = table1 - table2
+        self.assertEqual(delta.get('s1', 'tx_total_pkts'), 60)
+        # Delays are not substracted
+        self.assertEqual(delta.get('s1', 'rx_max_delay'), 3.5)
+        self.assertEqual(delta.get('s1', 'rx_total_pkts', interface='intf1'), 10)
+        # Not in table2
+        self.assertEqual(delta.get('s2', 'tx_total_pkts'), 5)
+
+        table1.set('s1', None, 'elapsed_time', 10)
+        table2.set('s1', None, 'elapsed_time', 5)
+        delta = table1 - table2
+        # Rates over the elapsed time between the 2 tables
+        self.assertEqual(delta.get('s1', 'tx_total_pkt_rate'), 12)
+        self.assertEqual(delta.get('s1', 'rx_total_pkt_rate', interface='intf1'), 2)
+
+        stats = table1.to_stream_stats()
+        self.assertIsInstance(stats, StreamStats)
+        self.assertEqual(stats.by_stream['s1'].tx.total_pkts, 100)
+        self.assertEqual(stats.by_stream['s1'].by_interface['intf1'].rx.total_pkts, 90)
+        self.assertEqual(
+            list(StreamStatsTable.from_stream_stats(stats)), list(table1))
+
+    def test_table_counts(self):
+
+        # Counts above 2**53 are kept exact
+        count = 2**60 + 1
+        table1 = StreamStatsTable([('s1', None), ('s2', None)])
+        table1.set('s1', None, 'tx_total_pkt_bytes', count + 10)
+        table1.set('s1', None, 'tx_total_pkt_byte_rate', 2.5)
+        table1.set('s2', None, 'tx_total_pkts', 5)
+        self.assertEqual(table1.get('s1', 'tx_total_pkt_bytes'), count + 10)
+        self.assertIs(type(table1.get('s1', 'tx_total_pkt_bytes')), int)
+        self.assertIs(type(table1.get('s1', 'tx_total_pkt_byte_rate')), float)
+        self.assertEqual(list(table1.collected('tx_total_pkts')),
+                         [False, True])
+        self.assertEqual(list(table1.column('tx_total_pkts')), [0, 5])
+
+        table2 = StreamStatsTable([('s1', None), ('s3', None)])
+        table2.set('s1', None, 'tx_total_pkt_bytes', count)
+        table2.set('s3', None, 'tx_total_pkts', 7)
+
+        delta = table1 - table2
+        self.assertEqual(delta.get('s1', 'tx_total_pkt_bytes'), 10)
+        self.assertEqual(delta.get('s1', 'tx_total_pkt_byte_rate'), 2.5)
+        # Not collected in table1
+        self.assertIs(delta.get('s1', 'tx_total_pkts'), None)
+        # Only in table1, compared against 0
+        self.assertEqual(delta.get('s2', 'tx_total_pkts'), 5)
+        # Only in table2, not in the difference
+        self.assertNotIn(('s3', None), delta)
+        self.assertEqual(delta.rows, table1.rows)
+
+        table1.set('s2', None, 'tx_total_pkts', None)
+        self.assertIs(table1.get('s2', 'tx_total_pkts'), None)
+
 if __name__ == '__main__':
     unittest.main()
 
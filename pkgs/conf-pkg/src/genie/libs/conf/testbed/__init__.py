@@ -5,6 +5,7 @@ import contextlib
 import functools
 import types
 from copy import copy
+from concurrent.futures import ThreadPoolExecutor
 
 # import pcall
 import importlib
@@ -123,8 +124,29 @@ def _clean_cfgs_dict_inner(cfgs, *, testbed=None, device=None, add_to_cfgs=None)
     raise ValueError(cfgs)
 
 
+class ConfigOnDevicesError(Exception):
+    '''Configuration failed on some of the devices configured in parallel.
+
+    Attributes:
+        errors (`dict`): Device name -> exception raised
+    '''
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('Configuration failed on {n} device(s):\n{e}'.format(
+            n=len(errors),
+            e='\n'.join('{}: {!r}'.format(device_name, e)
+                        for device_name, e in errors.items())))
+
+
 class Testbed(genie.conf.base.testbed.Testbed):
 
+    # Number of devices config_on_devices configures at the same time when
+    # not given, each in its own thread; 1 configures them one after another.
+    # Also applies to build_config/build_unconfig and the features applying
+    # their configuration (Bgp.build_config(apply=True), ...)
+    config_workers = 1
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -630,9 +652,8 @@ class Testbed(genie.conf.base.testbed.Testbed):
             config_features(feature_kwargs)
             flush_cfgs()
 
-            config_features(sorted(set().union(
-                *(device.find_streams()
-                  for device in bo.tgen_devices))))
+            for tgen_device in bo.tgen_devices:
+                tgen_device.build_streams_config(apply=False)
             flush_cfgs()
 
             tgen_apply_exit_stack.close()
@@ -750,9 +771,8 @@ class Testbed(genie.conf.base.testbed.Testbed):
                     tgen_apply_exit_stack.enter_context(
                         tgen_device.defer_apply_context())
 
-            unconfig_features(sorted(set().union(
-                *(device.find_streams()
-                  for device in bo.tgen_devices))))
+            for tgen_device in bo.tgen_devices:
+                tgen_device.build_streams_config(apply=False, unconfig=True)
             flush_cfgs()
 
             from genie.libs.conf.static_routing import StaticRouting
@@ -952,50 +972,52 @@ class Testbed(genie.conf.base.testbed.Testbed):
             assert cfg.device is device
             cfg.apply(**kwargs)
 
-    def config_on_devices(self, cfgs, **kwargs):
+    def config_on_devices(self, cfgs, workers=None, **kwargs):
+        '''Apply configurations on their devices.
+
+        Args:
+            cfgs: Configurations, indexed by device (see _clean_cfgs_dict)
+            workers (`int`): Number of devices configured at the same time.
+                Default: config_workers
+            kwargs: Arguments to Config.apply
+
+        Raises:
+            ConfigOnDevicesError: Configuration failed on some devices, once
+                all the devices are configured (workers > 1 only)
+        '''
 
         cfgs = _clean_cfgs_dict(cfgs, testbed=self)
+        device_names = sorted(cfgs.keys())
+
+        if workers is None:
+            workers = self.config_workers
 
-        fg_device_names = set(cfgs.keys())
-        bg_device_names = set()
-
-        if False:  # Change to False to disable pcall altogether
-            if len(fg_device_names) < 2:
-                # Run in foreground only
-                pass
-            else:
-                # Move devices with compatible configurations to background
-                for device_name in list(fg_device_names):
-                    # YangConfig is incompatible with pcall, keep in foreground
-                    if any(
-                            isinstance(cfg, YangConfig)
-                            for cfg in cfgs[device_name]):
-                        continue
-                    # Move to background
-                    fg_device_names.remove(device_name)
-                    bg_device_names.add(device_name)
-
-        p = None
-        try:
-            if bg_device_names:
-                # Apply background configurations in parallel
-                p = Pcall(self.config_on_device,
-                          device=[self.devices[device_name]
-                                  for device_name in sorted(bg_device_names)],
-                          configs=[cfgs[device_name]
-                                   for device_name in sorted(bg_device_names)],
-                          ckwargs=kwargs,
-                          )
-                p.start()
-
-            # Apply foreground configurations serially
-            for device_name in sorted(fg_device_names):
+        if workers <= 1 or len(device_names) < 2:
+            # Apply configurations serially
+            for device_name in device_names:
                 self.config_on_device(
                     device=self.devices[device_name],
                     configs=cfgs[device_name],
                     **kwargs)
+            return
 
-        finally:
-            if p:
-                p.join()
+        # Apply configurations in parallel, each device on its own
+        # connections; CliConfig and YangConfig alike.
+        with ThreadPoolExecutor(
+                max_workers=min(workers, len(device_names))) as executor:
+            futures = collections.OrderedDict(
+                (device_name, executor.submit(
+                    self.config_on_device,
+                    device=self.devices[device_name],
+                    configs=cfgs[device_name],
+                    **kwargs))
+                for device_name in device_names)
+
+        errors = collections.OrderedDict()
+        for device_name, future in futures.items():
+            e = future.exception()
+            if e is not None:
+                errors[device_name] = e
+        if errors:
+            raise ConfigOnDevicesError(errors) from next(iter(errors.values()))
 
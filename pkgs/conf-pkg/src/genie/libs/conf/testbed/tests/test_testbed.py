@@ -1,14 +1,16 @@
 #!/usr/bin/env python
 
+import contextlib
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from genie.conf.tests import TestCase
 from genie.conf import Genie
 from genie.conf.base import Testbed, Device
 
 from genie.libs.conf.device import UnsupportedDeviceOsWarning
-from genie.libs.conf.testbed import Testbed as XbuTestbed
+from genie.libs.conf.testbed import Testbed as XbuTestbed, \
+    ConfigOnDevicesError
 
 
 class test_device(TestCase):
@@ -22,6 +24,81 @@ class test_device(TestCase):
             self.assertIsInstance(Genie.testbed, XbuTestbed)
             self.assertIs(type(Genie.testbed), XbuTestbed)
 
+
+class test_config_on_devices(TestCase):
+
+    def setUp(self):
+        Genie.testbed = self.testbed = Testbed()
+        for name in ('R1', 'R2', 'R3'):
+            Device(testbed=self.testbed, name=name, os='iosxr')
+        self.cfgs = {name: 'hostname ' + name for name in ('R1', 'R2', 'R3')}
+
+    def test_parallel(self):
+        configured = []
+
+        def config_on_device(device, configs, **kwargs):
+            self.assertEqual(kwargs, {'fail_invalid': True})
+            configured.append(device.name)
+
+        self.testbed.config_on_device = Mock(side_effect=config_on_device)
+        self.testbed.config_on_devices(self.cfgs, workers=3,
+                                       fail_invalid=True)
+        self.assertEqual(sorted(configured), ['R1', 'R2', 'R3'])
+
+    def test_errors(self):
+
+        def config_on_device(device, configs, **kwargs):
+            if device.name != 'R2':
+                raise ValueError(device.name)
+
+        self.testbed.config_on_device = Mock(side_effect=config_on_device)
+        with self.assertRaises(ConfigOnDevicesError) as cm:
+            self.testbed.config_on_devices(self.cfgs, workers=2)
+        self.assertEqual(list(cm.exception.errors), ['R1', 'R3'])
+        # All the devices were configured
+        self.assertEqual(self.testbed.config_on_device.call_count, 3)
+
+        # Serially, the first error is raised as is
+        self.testbed.config_on_device.reset_mock()
+        with self.assertRaises(ValueError):
+            self.testbed.config_on_devices(self.cfgs)
+        self.assertEqual(self.testbed.config_on_device.call_count, 1)
+
+
+class test_build_streams(TestCase):
+
+    def setUp(self):
+        Genie.testbed = self.testbed = Testbed()
+        self.tgen = Device(testbed=self.testbed, name='TGEN', os='spirent')
+        self.calls = []
+
+        @contextlib.contextmanager
+        def defer_apply_context():
+            self.calls.append('defer')
+            yield
+            self.calls.append('apply')
+
+        for name, value in (
+                ('defer_apply_context', defer_apply_context),
+                ('stop_emulation', Mock()),
+                ('start_emulation', Mock()),
+                ('find_streams', Mock(return_value=[])),
+                ('build_streams_config', Mock(
+                    side_effect=lambda **kwargs: self.calls.append(kwargs)))):
+            patcher = patch.object(self.tgen, name, value, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_build_config(self):
+        self.testbed.build_config(apply=False)
+        # All the streams at once, applied when the deferral ends
+        self.assertEqual(self.calls, ['defer', {'apply': False}, 'apply'])
+
+    def test_build_unconfig(self):
+        self.testbed.build_unconfig(apply=False)
+        self.assertEqual(self.calls, [
+            'defer', {'apply': False, 'unconfig': True}, 'apply'])
+
 if __name__ == '__main__':
     unittest.main()
 
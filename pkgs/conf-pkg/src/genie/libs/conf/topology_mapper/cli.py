@@ -7,7 +7,6 @@ except Exception:
     pass
 
 import re
-import functools
 import logging
 logger = logging.getLogger(__name__)
 
@@ -15,6 +14,7 @@ __all__ = (
     'clean_cli_output',
     'config_cli_to_tree',
     'cli_tree_to_config',
+    'dictionary_sort_key',
 )
 
 
@@ -33,11 +33,14 @@ def clean_cli_output(output, cmd=None, os=None,
 
     from genie.libs.conf.utils import ansi
 
-    output = re.sub(r'\t', r' ', output)
-    output = re.sub(r'\r+\n', r'\n', output)
-    output = re.sub(r'.*\r', r'', output, re.MULTILINE)
-    output = re.sub(ansi.re_generic, r'', output)
-    output = re.sub(r'\s+$', r'', output, re.MULTILINE)
+    # Each pass is skipped when there is nothing to clean
+    output = output.replace('\t', ' ')
+    if '\r' in output:
+        output = re.sub(r'\r+\n', r'\n', output)
+        output = re.sub(r'.*\r', r'', output, re.MULTILINE)
+    if '\x1b' in output or '\x9b' in output:
+        output = re.sub(ansi.re_generic, r'', output)
+    output = output.rstrip()
 
     if cmd:
         m = re.match(r'^(?P<cmd>(?:do )?' + re.escape(cmd) + r')(?:\n|$)', output)
@@ -71,6 +74,9 @@ def clean_cli_output(output, cmd=None, os=None,
             output = output[:m.start('line')] + output[m.end('line'):]
 
     if remove_prompt:
+        # The prompt can only be on the last line
+        tail_start = max(output.rfind('\n'), 0)
+        tail = output[tail_start:]
         for once in [1]:
             m = re.search(r'''
                 (?:^|\n)
@@ -85,29 +91,29 @@ def clean_cli_output(output, cmd=None, os=None,
                     )?
                 )
                 $
-            ''', output, re.VERBOSE)
+            ''', tail, re.VERBOSE)
             if m:
                 # IOS-XR:
                 #   RP/0/0/CPU0:
                 #   RP/0/0/CPU0:JSTVXR-R1#
                 #   RP/0/0/CPU0:JSTVXR-R1(config)#
                 d.update(m.groupdict())
-                output = output[:m.start(0)] + output[m.end(0):]
+                output = output[:tail_start + m.start(0)] + output[tail_start + m.end(0):]
                 break
-            m = re.search(r'(?:^|\n)(?P<prompt>[\w-]+(\([^\)]+\)){0,2}#)$', output)
+            m = re.search(r'(?:^|\n)(?P<prompt>[\w-]+(\([^\)]+\)){0,2}#)$', tail)
             if m:
                 # IOS / NX-OS:
                 #   N7K-Get-well-R1#
                 #   JSTVNX-R1(config)(xmlin)#
                 d.update(m.groupdict())
-                output = output[:m.start(0)] + output[m.end(0):]
+                output = output[:tail_start + m.start(0)] + output[tail_start + m.end(0):]
                 break
-            m = re.search(r'(^|\n)(?P<prompt>\w+@[\w-]+[#>])$', output)
+            m = re.search(r'(^|\n)(?P<prompt>\w+@[\w-]+[#>])$', tail)
             if m:
                 # Juniper:
                 #   admin@MX4#
                 d.update(m.groupdict())
-                output = output[:m.start(0)] + output[m.end(0):]
+                output = output[:tail_start + m.start(0)] + output[tail_start + m.end(0):]
                 break
 
     if return_dict:
@@ -117,6 +123,55 @@ def clean_cli_output(output, cmd=None, os=None,
         return output
 
 
+_re_digits = re.compile(r'[0-9]+')
+
+
+def _number_key(m):
+    digits = m.group(0)
+    number = digits.lstrip('0') or '0'
+    # Numbers sort where '0'-'9' do, then by number of digits and value
+    return '0' + chr(len(number)) + number
+
+
+def _zeros_key(m):
+    digits = m.group(0)
+    return chr(len(digits) - len(digits.lstrip('0') or '0'))
+
+
+# Lines of the show running-config header
+_config_header_prefixes = (
+    'Building configuration',
+    'Current configuration',
+    '! Last configuration change at',
+    '!! Last configuration change at',
+    '! NVRAM config last updated at',
+    '!! NVRAM config last updated at',
+    '!Command:',
+    '!Time:',
+)
+
+
+def dictionary_sort_key(string):
+    '''Sort key ordering strings like Tcl's `lsort -dictionary`.
+
+    Case is ignored, except as a tie-breaker (upper case first), and embedded
+    numbers are compared as integers, leading zeros only breaking ties.
+
+    Example:
+
+        >>> sorted(['R10', 'r2', 'R2', 'R1'], key=dictionary_sort_key)
+        ['R1', 'R2', 'r2', 'R10']
+    '''
+    # Case and leading zeros only matter if the rest is equal; Upper case
+    # letters have lower code points than their lower case counterparts
+    return (_re_digits.sub(_number_key, string.lower()),
+            _re_digits.sub(_zeros_key, string))
+
+
+def _tree_sort_key(item):
+    return dictionary_sort_key(item[0])
+
+
 def config_cli_to_tree(cli, *, os=None, strip=False, sort=False, keylist=False,
                        consistency_checks=False, keep_all=False,
                        keep_empty=False, keep_comments=False,
@@ -131,137 +186,107 @@ def config_cli_to_tree(cli, *, os=None, strip=False, sort=False, keylist=False,
         keep_comments = True
         keep_closures = True
 
-    tcl_imported = True
-
-    try:
-        from ats.tcl.internal import DictionaryCompare
-    except ImportError:
-        tcl_imported = False
-        pass
-
-    def _DictionaryCompare_index0(first, second):
-        if tcl_imported:
-            return DictionaryCompare(first[0], second[0])
-        else:
-            return 0
-
     cli = clean_cli_output(cli, os=os)
     if keylist:
         cli = cli.replace('.', '_')
 
+    # Value of leaf lines
+    leaf = () if keylist else None
+
     if os == 'junos':
 
-        if strip:
-            cli = re.sub(r'^ +| +$', r'', cli, re.MULTILINE)
+        # Each level is a list of (line, children) where the children of the
+        # sub-mode being built are None until closed
+        stack = [[]]
+        for my_line in cli.splitlines():
+            if strip:
+                my_line = my_line.strip(' ')
+            line = my_line.strip(' ')
 
-        if keep_comments:
-            # Put inline comments on their own line
-            cli = re.sub(r'; #', r';\n#', cli)
-        else:
-            # Remove inline comments
-            cli = re.sub(r'; #.*', r'', cli)
+            if not line:
+                continue
 
-        # Protect sub-modes with braces (Adds an extra open brace)
-        cli = re.sub(r'^.*\S(?= +\{$)', r'{{&}', cli, re.MULTILINE)
+            if line.startswith('#'):
+                if keep_comments:
+                    stack[-1].append((my_line, leaf))
+                continue
 
-        if keep_comments:
-            # Protect comment lines
-            if keylist:
-                cli = re.sub(r'^ *#.*', r'{{&} {}}', cli, re.MULTILINE)
+            comment = None
+            i = my_line.find('; #')
+            if i != -1:
+                # Inline comment
+                comment = my_line[i + 2:]
+                my_line = my_line[:i + 1]
+                line = my_line.strip(' ')
+
+            if line == '}':
+                if len(stack) > 1:
+                    children = stack.pop()
+                    if sort:
+                        children.sort(key=_tree_sort_key)
+                    stack[-1][-1] = (stack[-1][-1][0], tuple(children))
+            elif line.endswith(' {'):
+                # Sub-mode
+                stack[-1].append((my_line[:my_line.rfind(' {')].rstrip(' '), None))
+                stack.append([])
             else:
-                cli = re.sub(r'^ *#.*', r'{{&}}', cli, re.MULTILINE)
-        else:
-            # Remove comment lines
-            cli = re.sub(r'^ *#.*', r'', cli, re.MULTILINE)
-
-        # Protect value config lines (drop the ;)
-        if keylist:
-            cli = re.sub(r'^(.*\S);$', r'{{\1} {}}', cli, re.MULTILINE)
-        else:
-            cli = re.sub(r'^(.*\S);$', r'{{\1}}', cli, re.MULTILINE)
-
-        # Add an extra close brace to end of sub-modes
-        cli = re.sub(r'^ *\}$', r'}}', cli, re.MULTILINE)
-
-        # Need to get rid of the non-canonical string representations
-        # and recurse into children
+                if line.endswith(';'):
+                    my_line = my_line[:my_line.rfind(';')]
+                stack[-1].append((my_line, leaf))
+
+            if comment is not None and keep_comments:
+                stack[-1].append((comment, leaf))
+
+        while len(stack) > 1:
+            children = stack.pop()
+            if sort:
+                children.sort(key=_tree_sort_key)
+            stack[-1][-1] = (stack[-1][-1][0], tuple(children))
+
+        tree = stack[0]
         if sort:
+            tree.sort(key=_tree_sort_key)
 
-            def _clean_cli(clie):
-                clie = ats.tcl.cast_list(clie)
-                if len(clie) == 2:
-                    return (clie[0], tuple(sorted(
-                        (_clean_cli(e) for e in ats.tcl.cast_list(clie[1])),
-                        key=functools.cmp_to_key(_DictionaryCompare_index0))))
-                else:
-                    return (clie[0], None)
-
-            tree = tuple(sorted(
-                (_clean_cli(e) for e in ats.tcl.cast_list(cli)),
-                key=functools.cmp_to_key(_DictionaryCompare_index0)))
-        else:
-
-            def _clean_cli(clie):
-                clie = ats.tcl.cast_list(clie)
-                if len(clie) == 2:
-                    return (clie[0], tuple(
-                        (_clean_cli(e) for e in ats.tcl.cast_list(clie[1]))))
-                else:
-                    return (clie[0], None)
-
-            tree = tuple(
-                (_clean_cli(e) for e in ats.tcl.cast_list(cli)))
-
-        return tree
+        return tuple(tree)
 
     else:
 
         is_nxos = os == 'nxos'
 
-        lvl = 0
-        lvl_indent = {
-            lvl: 0,
-        }
-        lvl_tree = {
-            lvl: [],
-        }
+        # Indentation and (line, children) lists of each level
+        lvl_indent = [0]
+        lvl_tree = [[]]
 
         def _wrap_up_one_lvl():
             # Generic code to wrap up lvl's tree to children and move up to lvl-=1
-            nonlocal lvl
-            nonlocal lvl_tree
-            children = lvl_tree[lvl]
+            lvl_indent.pop()
+            children = lvl_tree.pop()
             if sort:
-                children = sorted(
-                    children,
-                    key=functools.cmp_to_key(_DictionaryCompare_index0))
-            lvl -= 1
-            lvl_tree[lvl][-1] = (lvl_tree[lvl][-1][0], tuple(children))
+                children.sort(key=_tree_sort_key)
+            lvl_tree[-1][-1] = (lvl_tree[-1][-1][0], tuple(children))
 
         lines = cli.splitlines()
+        last_iline = len(lines) - 1
         for iline, my_line in enumerate(lines):
             keep_line = True
 
-            if re.match(r'^Building configuration', my_line) \
-                    or re.match(r'^Current configuration', my_line) \
-                    or re.match(r'^!!? Last configuration change at', my_line) \
-                    or re.match(r'^!!? NVRAM config last updated at', my_line) \
-                    or re.match(r'^!(Command|Time):', my_line):
+            if my_line.startswith(_config_header_prefixes):
                 continue
 
-            my_indent = len(re.match(r'^ *', my_line).group(0))
+            line = my_line.lstrip(' ')
+            my_indent = len(my_line) - len(line)
             if strip:
-                my_line = my_line.strip()
+                my_line = line = my_line.strip()
 
             if consistency_checks:
                 if is_nxos:
                     if my_indent % 2:
                         pass  # TODO
                 elif os is not None:
-                    if my_indent > lvl_indent[lvl] + 1:
+                    if my_indent > lvl_indent[-1] + 1:
                         pass  # TODO
 
-            if my_indent > lvl_indent[lvl]:
+            if my_indent > lvl_indent[-1]:
 
                 # Scenario:
                 #
@@ -275,19 +300,18 @@ def config_cli_to_tree(cli, *, os=None, strip=False, sort=False, keylist=False,
                 #  b       (l=1, i=1)
                 #   c      (l=2, i=2)
 
-                lvl += 1
-                lvl_indent[lvl] = my_indent
-                lvl_tree[lvl] = []
+                lvl_indent.append(my_indent)
+                lvl_tree.append([])
 
             else:
-                while my_indent < lvl_indent[lvl]:
+                while my_indent < lvl_indent[-1]:
 
                     # a        (l=0, i=0)
                     #  b       (l=1, i=1)
                     #   c      (l=2, i=2)
                     # d        (l=?, i<2)
 
-                    if my_indent <= lvl_indent[lvl - 1]:
+                    if my_indent <= lvl_indent[-2]:
                         # Scenarios:
                         #
                         #   a        (l=0, i=0)
@@ -332,101 +356,84 @@ def config_cli_to_tree(cli, *, os=None, strip=False, sort=False, keylist=False,
                         if consistency_checks:
                             pass  # TODO
 
-                        lvl_indent[lvl] = my_indent
+                        lvl_indent[-1] = my_indent
                         break
 
+            lvl = len(lvl_tree) - 1
             max_lvl = lvl
 
-            for once in [1]:
-                m = re.match(r'^ *exit$', my_line)
-                if m:
+            if line == 'exit':
 
-                    # Scenario:
-                    #
-                    # a        (l=0, i=0)
-                    #  b       (l=1, i=1)
-                    #   "exit" (l=2, i=2)
+                # Scenario:
+                #
+                # a        (l=0, i=0)
+                #  b       (l=1, i=1)
+                #   "exit" (l=2, i=2)
 
-                    # Action: Force current level to exit
-                    #
-                    # a        (l=0, i=0)
-                    #  b       (l=1, i=1)
+                # Action: Force current level to exit
+                #
+                # a        (l=0, i=0)
+                #  b       (l=1, i=1)
 
-                    if lvl:
-                        max_lvl = lvl - 1
-                    elif consistency_checks:
-                        pass  # TODO
-                    keep_line = keep_closures
-                    break
+                if lvl:
+                    max_lvl = lvl - 1
+                elif consistency_checks:
+                    pass  # TODO
+                keep_line = keep_closures
 
-                m = re.match(r'^ *quit$', my_line)
-                if m:
+            elif line == 'quit':
 
-                    # Scenario:
-                    #
-                    # a        (l=0, i=0)
-                    #  b       (l=1, i=1)
-                    #   "quit" (l=2, i=2)
+                # Scenario:
+                #
+                # a        (l=0, i=0)
+                #  b       (l=1, i=1)
+                #   "quit" (l=2, i=2)
 
-                    # Action: Force all levels to exit
-                    #
-                    # a        (l=0, i=0)
-                    #  b       (l=1, i=1)
+                # Action: Force all levels to exit
+                #
+                # a        (l=0, i=0)
+                #  b       (l=1, i=1)
 
-                    max_lvl = 0
-                    keep_line = keep_closures
-                    break
+                max_lvl = 0
+                keep_line = keep_closures
 
-                m = re.match(r'^end$', my_line)
-                if m:
+            elif my_line == 'end':
 
-                    # Scenario:
-                    #
-                    # a        (l=0, i=0)
-                    #  b       (l=1, i=1)
-                    # "end"    (l=2, i=0)
+                # Scenario:
+                #
+                # a        (l=0, i=0)
+                #  b       (l=1, i=1)
+                # "end"    (l=2, i=0)
 
-                    # Action: None
-                    #
-                    # a        (l=0, i=0)
-                    #  b       (l=1, i=1)
+                # Action: None
+                #
+                # a        (l=0, i=0)
+                #  b       (l=1, i=1)
 
-                    max_lvl = 0
-                    keep_line = keep_closures
+                max_lvl = 0
+                keep_line = keep_closures
 
-                    if consistency_checks and iline != len(lines) - 1:
-                        pass  # TODO
-                    break
+                if consistency_checks and iline != last_iline:
+                    pass  # TODO
 
-                m = re.match(r'^ *!', my_line)
-                if m:
-                    keep_line = keep_comments
-                    break
+            elif line.startswith('!'):
+                keep_line = keep_comments
 
-                m = re.match(r'^$', my_line)
-                if m:
-                    keep_line = keep_empty
-                    break
+            elif not my_line:
+                keep_line = keep_empty
 
             if keep_line:
-                if keylist:
-                    lvl_tree[lvl].append((my_line, ()))
-                else:
-                    lvl_tree[lvl].append((my_line, None))
+                lvl_tree[-1].append((my_line, leaf))
 
-            while lvl > max_lvl:
+            while len(lvl_tree) - 1 > max_lvl:
                 _wrap_up_one_lvl()
 
-        while lvl:
+        while len(lvl_tree) > 1:
             _wrap_up_one_lvl()
 
-        # assert lvl == 0
-
         tree = lvl_tree[0]
         if sort:
-            tree = sorted(
-                tree,
-                key=functools.cmp_to_key(_DictionaryCompare_index0))
+            tree.sort(key=_tree_sort_key)
 
         return tuple(tree)
 
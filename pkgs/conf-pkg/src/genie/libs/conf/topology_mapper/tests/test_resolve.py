@@ -9,14 +9,24 @@ logging.root.addHandler(ats.log.managed_handlers.screen)
 import types
 import unittest
 import functools
+import collections
+import multiprocessing
 import os
+import time
+from unittest.mock import patch
 
 from ats.datastructures.logic import And, Not, Or
 import ats.topology
 import genie.conf
 import genie.conf.base
 
+from genie.utils.cisco_collections import OrderedSet
+
 from genie.libs.conf.topology_mapper import TopologyMapper
+from genie.libs.conf.topology_mapper.exceptions import \
+    FailedToResolveException
+from genie.libs.conf.topology_mapper.topology_mapper import \
+    PropagatingResolver, Resolver, TopologySubset, _fork_imap_unordered
 
 firex_topology1_yaml = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
@@ -26,6 +36,14 @@ firex_topology3_yaml = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
     'firex_topology3.yaml')
 
+firex_topology4_yaml = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'firex_topology4.yaml')
+
+pyats_topology1_yaml = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'pyats_topology1.yaml')
+
 class TestResolve(unittest.TestCase):
 
     def test_topology_objects_1(self):
@@ -135,6 +153,269 @@ class TestResolve(unittest.TestCase):
                 set([device.os for device in genie_testbed.find_devices(os=Or('iosxr'))]),
                 set(['iosxr']))
 
+class TestPropagatingResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.topology = TopologyMapper(topology_file=firex_topology1_yaml)
+        if self.topology.device_names is None:
+            self.skipTest('Object names can not be sorted')
+
+    def create_resolver(self, physical_links):
+        '''Resolver of the R1/R2/R3 triangle on a pool of devices.
+
+        physical_links is {link: (device, device)}; The interface of a device
+        on a link is named "link.device".
+        '''
+        topology = self.topology
+        xos_devices = OrderedSet(sorted(set(
+            xos_device
+            for link_devices in physical_links.values()
+            for xos_device in link_devices)))
+        xos_interfaces = OrderedSet(sorted(
+            '%s.%s' % (xos_link, xos_device)
+            for xos_link, link_devices in physical_links.items()
+            for xos_device in link_devices))
+        dynobj_mappings = {None: {}}
+        dynobj_mappings_link_parts = {None: {}}
+        for device_name in topology.device_names:
+            dynobj_mappings[None][device_name] = xos_devices
+        for interface_name in topology.interface_names:
+            dynobj_mappings[None][interface_name] = xos_interfaces
+        for link_name in topology.link_names:
+            dynobj_mappings[None][link_name] = \
+                OrderedSet(sorted(physical_links))
+            link_parts = collections.defaultdict(set)
+            for xos_link, (xos_device1, xos_device2) in physical_links.items():
+                for xos_link_devices in ((xos_device1, xos_device2),
+                                         (xos_device2, xos_device1)):
+                    xos_link_parts = (xos_link,) + tuple(
+                        '%s.%s' % (xos_link, xos_device)
+                        for xos_device in xos_link_devices)
+                    link_parts[xos_link_devices].add(xos_link_parts)
+                    link_parts[None].add(xos_link_parts)
+            dynobj_mappings_link_parts[None][link_name] = link_parts
+
+        _trace = types.SimpleNamespace(
+            step=False, _try=False, reject=False, constraint=False,
+            stats=False, read=False)
+        resolver = PropagatingResolver(
+            topology=topology,
+            subset=TopologySubset(
+                topology=topology,
+                name='master',
+                subset_required_objects=topology.object_names),
+            dynobj_mappings=dynobj_mappings,
+            dynobj_mappings_link_parts=dynobj_mappings_link_parts,
+            _trace=_trace,
+            _find_all=False)
+        return resolver
+
+    def resolve(self, physical_links):
+        resolver = self.create_resolver(physical_links)
+        resolver.resolve()
+        return resolver.best_objects
+
+    def test_resolve_triangle(self):
+        best_objects = self.resolve({
+            'ab': ('A', 'B'),
+            'bc': ('B', 'C'),
+            'ca': ('C', 'A'),
+            'cd': ('C', 'D'),
+        })
+        self.assertIsNotNone(best_objects)
+        self.assertCountEqual(
+            [best_objects[device_name] for device_name in ('R1', 'R2', 'R3')],
+            ['A', 'B', 'C'])
+        self.assertCountEqual(
+            [best_objects[link_name] for link_name in ('L1', 'L2', 'L3')],
+            ['ab', 'bc', 'ca'])
+        for link_name in ('L1', 'L2', 'L3'):
+            for interface_name, device_name in zip(
+                    self.topology.link_interface_names(link_name),
+                    self.topology.link_device_names(link_name)):
+                self.assertEqual(best_objects[interface_name], '%s.%s' % (
+                    best_objects[link_name], best_objects[device_name]))
+
+    def test_resolve_no_triangle(self):
+        best_objects = self.resolve({
+            'ab': ('A', 'B'),
+            'bc': ('B', 'C'),
+            'cd': ('C', 'D'),
+            'da': ('D', 'A'),
+        })
+        self.assertIsNone(best_objects)
+
+    def test_iter_solutions(self):
+        resolver = self.create_resolver({
+            'ab': ('A', 'B'),
+            'bc': ('B', 'C'),
+            'ca': ('C', 'A'),
+            'cd': ('C', 'D'),
+        })
+        solutions = list(resolver.iter_solutions())
+        # Any permutation of A, B and C
+        self.assertEqual(len(solutions), 6)
+        self.assertEqual(
+            len(set(tuple(best_objects[device_name]
+                          for device_name in ('R1', 'R2', 'R3'))
+                    for best_objects in solutions)),
+            6)
+
+def _sleep(seconds, value):
+    time.sleep(seconds)
+    return value
+
+def _raise():
+    raise ValueError('failed')
+
+def _die():
+    os._exit(1)
+
+def _run(seconds):
+    start = time.time()
+    time.sleep(seconds)
+    return os.getpid(), start, time.time()
+
+class TestForkImapUnordered(unittest.TestCase):
+
+    def test_results(self):
+        funcs = [functools.partial(_sleep, seconds, value)
+                 for seconds, value in ((0.6, 'a'), (0.1, 'b'), (0.3, 'c'))]
+        # As they return, with the index of their function
+        self.assertEqual(list(_fork_imap_unordered(funcs, processes=3)),
+                         [(1, 'b'), (2, 'c'), (0, 'a')])
+
+    def test_processes(self):
+        funcs = [functools.partial(_run, 0.2)] * 5
+        results = dict(_fork_imap_unordered(funcs, processes=2))
+        self.assertEqual(sorted(results), list(range(5)))
+        # Each in its own forked process
+        pids = set(pid for pid, start, end in results.values())
+        self.assertEqual(len(pids), 5)
+        self.assertNotIn(os.getpid(), pids)
+        # At most 2 at once
+        for pid, start, end in results.values():
+            self.assertLessEqual(len([
+                pid2 for pid2, start2, end2 in results.values()
+                if start2 <= start < end2]), 2)
+
+    def test_failures(self):
+        funcs = [_raise, _die, functools.partial(_sleep, 0, 'c')]
+        self.assertEqual(dict(_fork_imap_unordered(funcs, processes=3)),
+                         {0: None, 1: None, 2: 'c'})
+
+    def test_close(self):
+        funcs = [functools.partial(_sleep, 0, 'a')] + \
+            [functools.partial(_sleep, 60, 'b')] * 2
+        start = time.time()
+        results = _fork_imap_unordered(funcs, processes=3)
+        self.assertEqual(next(results), (0, 'a'))
+        results.close()
+        # The others are terminated
+        self.assertEqual(multiprocessing.active_children(), [])
+        self.assertLess(time.time() - start, 30)
+
+class TestResolveProcesses(unittest.TestCase):
+    '''Subsets and branches resolved in forked processes.
+
+    The square is not in pyats_topology1 (router3 has a single link), the
+    triangle is router1, router2 and router4.
+    '''
+
+    def setUp(self):
+        if TopologyMapper(topology_file=firex_topology1_yaml).device_names \
+                is None:
+            # Nor can the subsets be loaded
+            self.skipTest('Object names can not be sorted')
+        self.topology = TopologyMapper(topology_file=firex_topology4_yaml)
+        self.testbed = genie.conf.Genie.init(
+            ats.topology.loader.load(pyats_topology1_yaml))
+
+    def patch_resolve(self, subset_name, action):
+        '''Call action before resolving subset_name, in the processes too.'''
+        resolve = Resolver.resolve
+
+        def patched_resolve(resolver):
+            if resolver.subset.name == subset_name:
+                action()
+            return resolve(resolver)
+
+        patcher = patch.object(Resolver, 'resolve', patched_resolve)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertSolution(self, assignments, subset_name):
+        subset = self.topology.constraints.subsets[subset_name]
+        devices = [assignments[device_name]
+                   for device_name in self.topology.device_names & subset]
+        self.assertEqual(len(set(devices)), len(devices))
+        for device in devices:
+            # The objects of this testbed, not copies
+            self.assertIs(self.testbed.devices[device.name], device)
+        self.assertEqual(assignments['R2'].os, 'iosxr')
+        for link_name in self.topology.link_names & subset:
+            link = assignments[link_name]
+            self.assertIn(link, self.testbed.links)
+            for interface_name, device_name in zip(
+                    self.topology.link_interface_names(link_name),
+                    self.topology.link_device_names(link_name)):
+                interface = assignments[interface_name]
+                self.assertIs(interface.device, assignments[device_name])
+                self.assertIn(interface, link.interfaces)
+
+    def test_branches(self):
+        # 2 branches of the triangle
+        self.topology.do_resolve(subset='triangle', processes=2)
+        self.assertEqual(self.topology.resolved_subset.name, 'triangle')
+        self.assertSolution(self.topology.assignments, 'triangle')
+
+    def test_subsets(self):
+        # 2 branches of each subset
+        self.topology.do_resolve(subset=['square', 'triangle'], processes=4)
+        self.assertEqual(self.topology.resolved_subset.name, 'triangle')
+        self.assertSolution(self.topology.assignments, 'triangle')
+
+    def test_failed(self):
+        with self.assertRaises(FailedToResolveException):
+            self.topology.do_resolve(subset='square', processes=2)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_first_subset_wins(self):
+        # The line is found first, the triangle is waited for
+        self.patch_resolve('triangle', functools.partial(time.sleep, 1))
+        self.topology.do_resolve(subset=['triangle', 'line'], processes=2)
+        self.assertEqual(self.topology.resolved_subset.name, 'triangle')
+        self.assertSolution(self.topology.assignments, 'triangle')
+
+    def test_cancel(self):
+        # The line wins, the triangle search is cancelled
+        self.patch_resolve('triangle', functools.partial(time.sleep, 60))
+        start = time.time()
+        self.topology.do_resolve(subset=['line', 'triangle'], processes=2)
+        self.assertLess(time.time() - start, 30)
+        self.assertEqual(self.topology.resolved_subset.name, 'line')
+        self.assertSolution(self.topology.assignments, 'line')
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_process_died(self):
+        self.patch_resolve('triangle', functools.partial(os._exit, 1))
+        self.topology.do_resolve(subset=['triangle', 'line'], processes=2)
+        self.assertEqual(self.topology.resolved_subset.name, 'line')
+        self.assertSolution(self.topology.assignments, 'line')
+
+    def test_find_all(self):
+        solutions = list(self.topology.find_all(subset='triangle'))
+        # R2 on router1 or router2, R1 and R3 on the other one and router4,
+        # either link between router1 and router2
+        self.assertEqual(len(solutions), 8)
+        for subset_name, assignments in solutions:
+            self.assertEqual(subset_name, 'triangle')
+            self.assertSolution(assignments, 'triangle')
+        self.assertEqual(len(set(
+            tuple(assignments[object_name]
+                  for object_name in ('R1', 'R2', 'R3', 'L1', 'L2', 'L3'))
+            for subset_name, assignments in solutions)), 8)
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -9,7 +9,9 @@ import contextlib
 import functools
 import itertools
 import logging
+import multiprocessing
 import os
+import queue
 import re
 import time
 import types
@@ -88,6 +90,52 @@ def copy_map_depth(map, depth):
     return map
 
 
+def _fork_imap_unordered(funcs, processes):
+    '''Call each function in a forked process, at most `processes` at once.
+
+    Generates (index, result) tuples as the functions return; result is None
+    if the function raised an exception or the process died. Processes still
+    running when the generator is closed are terminated.
+    '''
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    pending = collections.deque(enumerate(funcs))
+    running = {}
+
+    def target(index, func):
+        try:
+            result = func()
+        except Exception:
+            logger.exception('Process %d failed', index)
+            result = None
+        results.put((index, result))
+
+    try:
+        while pending or running:
+            while pending and len(running) < processes:
+                index, func = pending.popleft()
+                process = ctx.Process(target=target, args=(index, func))
+                process.daemon = True
+                process.start()
+                running[index] = process
+            try:
+                index, result = results.get(timeout=1)
+            except queue.Empty:
+                for index, process in list(running.items()):
+                    if process.exitcode not in (None, 0):
+                        # Died without sending a result
+                        del running[index]
+                        yield index, None
+                continue
+            running.pop(index).join()
+            yield index, result
+    finally:
+        for process in running.values():
+            process.terminate()
+        for process in running.values():
+            process.join()
+
+
 class TopologySubset(object):
 
     def __init__(self,
@@ -706,6 +754,265 @@ class Resolver(object):
         return tuple(l_explain)
 
 
+class PropagatingResolver(Resolver):
+    '''Resolver maintaining arc consistency between the decisions.
+
+    Instead of walking the devices and links in a fixed order, this resolver:
+
+    - Filters the candidates of every device and link until they are arc
+      consistent before searching; A device candidate is only kept if each
+      of its links still has a candidate going through it, and vice versa.
+    - Decides the object with the fewest candidates left first, ties broken
+      by the number of undecided objects it constrains.
+    - Maintains arc consistency after every choice.
+    - Remembers the sub-problems (undecided objects and their remaining
+      candidates) proven to have no solution, so equivalent choices, such as
+      identical devices of a pool, are only explored once.
+
+    All constraints between devices and links are binary, so once arc
+    consistent the sub-problem left only depends on the candidates of the
+    undecided objects, which is what makes these nogoods sound.
+
+    Weighted constraint groups are not supported; Mandatory constraint groups
+    are already part of the candidates. resolve keeps the first solution,
+    iter_solutions generates all of them.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.link_decision_order = [
+            link_name
+            for link_name in self.topology.link_names
+            if link_name in self.subset.link_names]
+        self.stats = collections.Counter()
+
+    def _add_arc(self, object_name, object_name2, kind, kind2):
+        self.arcs[object_name][object_name2] = kind
+        self.arcs[object_name2][object_name] = kind2
+
+    def _link_parts_may_intersect(self, link_name, link_name2):
+        # Same conditions as the link parts intersection constraints of
+        # Resolver.pass1_walker
+        link_device_names = self.cache.link_device_names[link_name]
+        link_device_names2 = self.cache.link_device_names[link_name2]
+        link_device_names_intersect = set(link_device_names) & set(link_device_names2)
+        if len(link_device_names_intersect) != min(len(link_device_names), len(link_device_names2)):
+            return False
+        if self.dynobj_mappings[None][link_name].isdisjoint(self.dynobj_mappings[None][link_name2]):
+            return False
+        link_interface_names = self.cache.link_interface_names[link_name]
+        link_interface_names2 = self.cache.link_interface_names[link_name2]
+        for device_name2 in link_device_names_intersect:
+            interface_name1 = link_interface_names[link_device_names.index(device_name2)]
+            interface_name2 = link_interface_names2[link_device_names2.index(device_name2)]
+            if self.dynobj_mappings[None][interface_name1].isdisjoint(self.dynobj_mappings[None][interface_name2]):
+                return False
+        return True
+
+    def _build_problem(self):
+        '''Return the initial candidates of each object and build the arcs.'''
+        domains = collections.OrderedDict()
+        self.arcs = collections.defaultdict(dict)
+        # xos_link_parts -> xos_link_devices
+        self.part_devices = {}
+        # xos_link_parts -> frozenset(xos_link_parts)
+        self.part_sets = {}
+
+        for device_name in self.device_decision_order:
+            domains[device_name] = list(self.dynobj_mappings[None][device_name])
+
+        for link_name in self.link_decision_order:
+            link_device_names = self.cache.link_device_names[link_name]
+            xos_link_parts_list = []
+            for xos_link_devices, xos_link_parts_set in \
+                    self.dynobj_mappings_link_parts[None][link_name].items():
+                if xos_link_devices is None:
+                    continue
+                # A device is only ever mapped to one xos device
+                if len(set(zip(link_device_names, xos_link_devices))) \
+                        != len(set(link_device_names)) \
+                        or len(set(xos_link_devices)) != len(set(link_device_names)):
+                    continue
+                for xos_link_parts in xos_link_parts_set:
+                    self.part_devices[xos_link_parts] = xos_link_devices
+                    self.part_sets[xos_link_parts] = frozenset(xos_link_parts)
+                    xos_link_parts_list.append(xos_link_parts)
+            domains[link_name] = sorted(xos_link_parts_list)
+            for device_name in set(link_device_names):
+                if device_name not in domains:
+                    # Device outside of the subset; No possible mapping
+                    domains[link_name] = []
+                    continue
+                positions = tuple(
+                    i for i, link_device_name in enumerate(link_device_names)
+                    if link_device_name == device_name)
+                self._add_arc(link_name, device_name,
+                              ('link_device', positions),
+                              ('device_link', positions))
+
+        for i, device_name in enumerate(self.device_decision_order):
+            for device_name2 in self.device_decision_order[i + 1:]:
+                if not self.dynobj_mappings[None][device_name].isdisjoint(self.dynobj_mappings[None][device_name2]):
+                    self._add_arc(device_name, device_name2,
+                                  ('device_collision',), ('device_collision',))
+
+        for i, link_name in enumerate(self.link_decision_order):
+            for link_name2 in self.link_decision_order[i + 1:]:
+                if self._link_parts_may_intersect(link_name, link_name2):
+                    self._add_arc(link_name, link_name2,
+                                  ('link_parts_intersect',),
+                                  ('link_parts_intersect',))
+
+        self.decision_index = {
+            object_name: i for i, object_name in enumerate(domains)}
+        return domains
+
+    def _revise(self, values, values2, kind):
+        '''Return the values supported by at least one of values2.'''
+        if kind[0] == 'device_collision':
+            if len(values2) == 1 and values2[0] in values:
+                return [value for value in values if value != values2[0]]
+            return values
+        if kind[0] == 'link_device':
+            # values are link parts, values2 are devices
+            xos_devices = set(values2)
+            positions = kind[1]
+            part_devices = self.part_devices
+            return [
+                xos_link_parts for xos_link_parts in values
+                if all(part_devices[xos_link_parts][i] in xos_devices
+                       for i in positions)]
+        if kind[0] == 'device_link':
+            # values are devices, values2 are link parts
+            part_devices = self.part_devices
+            xos_devices = set(
+                part_devices[xos_link_parts][i]
+                for xos_link_parts in values2
+                for i in kind[1])
+            return [value for value in values if value in xos_devices]
+        if kind[0] == 'link_parts_intersect':
+            part_sets = [self.part_sets[xos_link_parts2]
+                         for xos_link_parts2 in values2]
+            return [
+                xos_link_parts for xos_link_parts in values
+                if any(part_set.isdisjoint(xos_link_parts)
+                       for part_set in part_sets)]
+        raise ValueError(kind)
+
+    def _propagate(self, domains, arcs):
+        '''Revise arcs until all are consistent.
+
+        Returns False if an object is left without candidates.
+        '''
+        queue = collections.deque(arcs)
+        queued = set(queue)
+        while queue:
+            arc = queue.popleft()
+            queued.discard(arc)
+            object_name, object_name2 = arc
+            values = domains[object_name]
+            new_values = self._revise(
+                values, domains[object_name2],
+                self.arcs[object_name][object_name2])
+            if len(new_values) == len(values):
+                continue
+            self.stats['filter'] += len(values) - len(new_values)
+            if not new_values:
+                if self._trace.constraint:
+                    logger.debug('No candidates left for %s given %s',
+                                 object_name, object_name2)
+                return False
+            domains[object_name] = new_values
+            for object_name3 in self.arcs[object_name]:
+                if object_name3 != object_name2:
+                    arc3 = (object_name3, object_name)
+                    if arc3 not in queued:
+                        queued.add(arc3)
+                        queue.append(arc3)
+        return True
+
+    def _nogood_key(self, domains, undecided):
+        return tuple(
+            (object_name, tuple(domains[object_name]))
+            for object_name in domains
+            if object_name in undecided)
+
+    def _choose_object(self, domains, undecided):
+        def most_constrained(object_name):
+            return (
+                len(domains[object_name]),
+                -sum(1 for object_name2 in self.arcs[object_name]
+                     if object_name2 in undecided),
+                self.decision_index[object_name])
+        return min(undecided, key=most_constrained)
+
+    def _solutions(self, domains, undecided):
+        if not undecided:
+            yield domains
+            return
+        key = self._nogood_key(domains, undecided)
+        if key in self.nogoods:
+            self.stats['nogood_hit'] += 1
+            return
+        found = False
+        object_name = self._choose_object(domains, undecided)
+        undecided = undecided - {object_name}
+        for value in domains[object_name]:
+            self.stats['choice'] += 1
+            if self._trace._try:
+                logger.debug('Try %s = %r', object_name, value)
+            new_domains = copy(domains)
+            new_domains[object_name] = [value]
+            if self._propagate(new_domains, [
+                    (object_name2, object_name)
+                    for object_name2 in self.arcs[object_name]
+                    if object_name2 in undecided]):
+                for solution in self._solutions(new_domains, undecided):
+                    found = True
+                    yield solution
+            if self._trace.reject:
+                logger.debug('Reject %s = %r', object_name, value)
+        if not found:
+            self.nogoods.add(key)
+
+    def _best_objects(self, solution):
+        best_objects = {object_name: None
+                        for object_name in self.topology.object_names}
+        for device_name in self.device_decision_order:
+            best_objects[device_name] = solution[device_name][0]
+        for link_name in self.link_decision_order:
+            best_objects.update(zip(
+                (link_name,) + self.cache.link_interface_names[link_name],
+                solution[link_name][0]))
+        return best_objects
+
+    def iter_solutions(self):
+        '''Generator of all the solutions, as {object_name: xos_object}.'''
+        self.nogoods = set()
+        self.stats.clear()
+        domains = self._build_problem()
+        if self._trace.step:
+            logger.debug('arc consistency...')
+        if not all(domains.values()) or not self._propagate(domains, [
+                (object_name, object_name2)
+                for object_name in domains
+                for object_name2 in self.arcs[object_name]]):
+            return
+        if self._trace.step:
+            logger.debug('search...')
+        for solution in self._solutions(domains, frozenset(domains)):
+            self.stats['solution'] += 1
+            yield self._best_objects(solution)
+
+    def resolve(self):
+        self.best_objects = next(self.iter_solutions(), None)
+        if self._trace.stats:
+            logger.debug('%r: %d candidates filtered, %d choices, '
+                         '%d nogoods, %d nogood hits', self,
+                         self.stats['filter'], self.stats['choice'],
+                         len(self.nogoods), self.stats['nogood_hit'])
+
+
 class Constraints(ats.topology.Testbed):
 
     subsets = None
@@ -1092,7 +1399,8 @@ class TopologyMapper(object):
         if log_diagram:
             self.log_diagram()
 
-    def do_resolve(self, subset=None, required_objects=None):
+    def do_resolve(self, subset=None, required_objects=None, propagate=False,
+                   processes=None, find_all=False):
 
         debug_level = 5
         log_traces = False  # TODO
@@ -1565,6 +1873,178 @@ class TopologyMapper(object):
             logger.debug('dynobjs_by_type=%r', dynobjs_by_type)
             logger.debug('dynobj_mappings=%r', dynobj_mappings)
             logger.debug('dynobj_mappings_link_parts=%r', dynobj_mappings_link_parts)
+        resolver_class = Resolver
+        if propagate or find_all:
+            if weighted_constraint_groups_list and not find_all:
+                logger.warning('Weighted constraint groups are not supported by the propagating resolver; Using the default resolver.')
+            else:
+                resolver_class = PropagatingResolver
+
+        def create_subset(subset_name):
+            return TopologySubset(
+                    topology=self,
+                    name=subset_name,
+                    subset_required_objects=all_objects if subset_name == 'master' else self.constraints.subsets[subset_name],
+                    )
+
+        def create_resolver(subset_name, branch=None):
+            # If branch is (ibranch, nbranches), only the ibranch-th of
+            # nbranches disjoint slices of the candidates of the first device
+            # is searched.
+            if _trace.step:
+                logger.debug('Resolving topology... subset_name=%r', subset_name)
+            subset = create_subset(subset_name)
+
+            r = resolver_class(
+                    topology=self,
+                    subset=subset,
+                    dynobj_mappings=dynobj_mappings,
+                    dynobj_mappings_link_parts=dynobj_mappings_link_parts,
+                    _trace=_trace,
+                    _find_all=_find_all,
+                    )
+
+            # Define states {{{
+
+            # TODO limit weighted_constraint_groups_list to applicable ones
+            if weighted_constraint_groups_list:
+                r.max_weight = 0
+                for group_name in weighted_constraint_groups_list:
+                    constraint_group = self.constraint_groups[group_name]
+                    group_weight = constraint_group.weight
+                    r.cg_info.groups[group_name] = types.SimpleNamespace()
+                    r.cg_info.groups[group_name].weight = group_weight
+                    r.cg_info.groups[group_name].ratio = 1
+                    r.cg_info.groups[group_name].object_names = set(constraint_group.object_names)
+                    r.cg_state.groups[group_name] = types.SimpleNamespace()
+                    if group_weight < 0:
+                        # Do not include in max_weight
+                        r.cg_state.groups[group_name].accounted = False
+                    else:
+                        r.cg_state.groups[group_name].accounted = True
+                        if group_weight >= float('inf') or r.max_weight >= float('inf'):
+                            r.max_weight = float('inf')
+                        else:
+                            r.max_weight += group_weight
+                r.best_weight = - float('inf')
+                r.cg_state.cur_weight = max_weight
+
+            # }}}
+
+            if branch is not None and r.device_decision_order:
+                ibranch, nbranches = branch
+                device_name = r.device_decision_order[0]
+                r.dynobj_mappings[None][device_name] = OrderedSet(
+                    list(r.dynobj_mappings[None][device_name])[ibranch::nbranches])
+
+            return subset, r
+
+        def accept_solution(subset, best_objects, best_weight):
+            if (
+                    not best_objects or
+                    (weighted_constraint_groups_list and best_weight < 0)):
+                logger.debug('Failed to resolve X-Scale dynamic topology, subset %r', subset.name)
+                return False
+            if weighted_constraint_groups_list:
+                logger.info('Resolved X-Scale dynamic topology, subset %r, weight %r.', subset.name, best_weight)
+            else:
+                logger.info('Resolved X-Scale dynamic topology, subset %r.', subset.name)
+            # enaDestructor -id on_resolve_fail -cancel
+            active_xos_interfaces = []
+            # enaTbSetDefaultTopologyLayer [keylget kltopo params.topolayer]
+            for object_name, object_value in best_objects.items():
+                if object_name in ('RESOLVE', 'SOLUTION'):
+                    continue
+                if object_value is None:
+                    continue
+                self.assign(object_name, object_value)
+                if isinstance(object_value, genie.conf.base.Device):
+                    # if { [enaTbGetTestDeviceParam $object_value -type] eq "router" } {
+                    #     lappend lvActiveIntfs [enaTbFindInterface -router $object_value -interface "Loopback0" -create]
+                    # }
+                    # enaTbSetTestDevice $object_value -label [linsert [keylget kltopo objects.$object_name.params.labels] 0 $object_name]
+                    pass
+                elif isinstance(object_value, genie.conf.base.Interface):
+                    active_xos_interfaces.append(object_value)
+                    # enaTbSetInterface $object_value -topolayer [keylget kltopo params.topolayer]
+                elif isinstance(object_value, genie.conf.base.Link):
+                    # enaTbSetLink $object_value -topolayer [keylget kltopo params.topolayer]
+                    pass
+                else:
+                    raise ValueError(object_value)
+            Genie.testbed.set_active_interfaces(active_xos_interfaces)
+            # enaTbSetDefaultTopologyLayer test
+            self.resolved_subset = subset
+            return True
+
+        if find_all:
+            return self._iter_solutions(subset_names, create_resolver)
+
+        if processes is not None and processes > 1:
+            # Search the subsets, and disjoint slices of the candidates of
+            # their first device, in forked processes. The first subset, in
+            # order, found to have a solution wins and the remaining searches
+            # are cancelled.
+            nbranches = 1 if weighted_constraint_groups_list else max(1, processes // len(subset_names))
+            tasks = [
+                (subset_name, (ibranch, nbranches))
+                for subset_name in subset_names
+                for ibranch in range(nbranches)]
+
+            # Objects are sent back from the processes as their index
+            xos_object_index = collections.OrderedDict()
+            for object_name, xos_objs in dynobj_mappings[None].items():
+                for xos_obj in xos_objs:
+                    xos_object_index.setdefault(xos_obj, len(xos_object_index))
+            for link_name, xos_link_parts_map in dynobj_mappings_link_parts[None].items():
+                for xos_link_parts in xos_link_parts_map[None]:
+                    for xos_obj in xos_link_parts:
+                        xos_object_index.setdefault(xos_obj, len(xos_object_index))
+            xos_objects = list(xos_object_index)
+
+            def resolve_task(subset_name, branch):
+                subset, r = create_resolver(subset_name, branch=branch)
+                r.resolve()
+                if (
+                        not r.best_objects or
+                        (weighted_constraint_groups_list and r.best_weight < 0)):
+                    return None
+                return (
+                    {object_name: xos_object_index[object_value]
+                     for object_name, object_value in r.best_objects.items()
+                     if object_value is not None and object_name not in ('RESOLVE', 'SOLUTION')},
+                    getattr(r, 'best_weight', None))
+
+            remaining = collections.Counter({subset_name: nbranches for subset_name in subset_names})
+            solutions = {}
+            winner = None
+            results = _fork_imap_unordered(
+                [functools.partial(resolve_task, *task) for task in tasks],
+                processes)
+            try:
+                for itask, result in results:
+                    subset_name = tasks[itask][0]
+                    remaining[subset_name] -= 1
+                    if result is not None:
+                        solutions.setdefault(subset_name, result)
+                    for subset_name in subset_names:
+                        if subset_name in solutions:
+                            winner = subset_name
+                            break
+                        if remaining[subset_name]:
+                            # Still searching a preferred subset
+                            break
+                    if winner is not None:
+                        break
+            finally:
+                results.close()
+            if winner is not None:
+                best_objects, best_weight = solutions[winner]
+                best_objects = {object_name: xos_objects[i] for object_name, i in best_objects.items()}
+                if accept_solution(create_subset(winner), best_objects, best_weight):
+                    return
+            raise FailedToResolveException(self)
+
         for subset_name in subset_names:
 
             # if { $_trace(trace_cg) } {
@@ -1697,49 +2177,7 @@ class TopologyMapper(object):
             #
             # # }}}
 
-            if _trace.step:
-                logger.debug('Resolving topology... subset_name=%r', subset_name)
-            subset = TopologySubset(
-                    topology=self,
-                    name=subset_name,
-                    subset_required_objects=all_objects if subset_name == 'master' else self.constraints.subsets[subset_name],
-                    )
-
-            r = Resolver(
-                    topology=self,
-                    subset=subset,
-                    dynobj_mappings=dynobj_mappings,
-                    dynobj_mappings_link_parts=dynobj_mappings_link_parts,
-                    _trace=_trace,
-                    _find_all=_find_all,
-                    )
-
-            # Define states {{{
-
-            # TODO limit weighted_constraint_groups_list to applicable ones
-            if weighted_constraint_groups_list:
-                r.max_weight = 0
-                for group_name in weighted_constraint_groups_list:
-                    constraint_group = self.constraint_groups[group_name]
-                    group_weight = constraint_group.weight
-                    r.cg_info.groups[group_name] = types.SimpleNamespace()
-                    r.cg_info.groups[group_name].weight = group_weight
-                    r.cg_info.groups[group_name].ratio = 1
-                    r.cg_info.groups[group_name].object_names = set(constraint_group.object_names)
-                    r.cg_state.groups[group_name] = types.SimpleNamespace()
-                    if group_weight < 0:
-                        # Do not include in max_weight
-                        r.cg_state.groups[group_name].accounted = False
-                    else:
-                        r.cg_state.groups[group_name].accounted = True
-                        if group_weight >= float('inf') or r.max_weight >= float('inf'):
-                            r.max_weight = float('inf')
-                        else:
-                            r.max_weight += group_weight
-                r.best_weight = - float('inf')
-                r.cg_state.cur_weight = max_weight
-
-            # }}}
+            subset, r = create_resolver(subset_name)
 
             # if _trace.step:
             #     enaTraceProc -leave false -max-args 1 _choose_device
@@ -1750,42 +2188,8 @@ class TopologyMapper(object):
 
             # if { $_trace(stats) } { _dump_stats }
 
-            if (
-                    not r.best_objects or
-                    (weighted_constraint_groups_list and r.best_weight < 0)):
-                logger.debug('Failed to resolve X-Scale dynamic topology, subset %r', subset_name)
-                continue
-            if weighted_constraint_groups_list:
-                logger.info('Resolved X-Scale dynamic topology, subset %r, weight %r.', subset_name, r.best_weight)
-            else:
-                logger.info('Resolved X-Scale dynamic topology, subset %r.', subset_name)
-            # enaDestructor -id on_resolve_fail -cancel
-            active_xos_interfaces = []
-            # enaTbSetDefaultTopologyLayer [keylget kltopo params.topolayer]
-            for object_name, object_value in r.best_objects.items():
-                if object_name in ('RESOLVE', 'SOLUTION'):
-                    continue
-                if object_value is None:
-                    continue
-                self.assign(object_name, object_value)
-                if isinstance(object_value, genie.conf.base.Device):
-                    # if { [enaTbGetTestDeviceParam $object_value -type] eq "router" } {
-                    #     lappend lvActiveIntfs [enaTbFindInterface -router $object_value -interface "Loopback0" -create]
-                    # }
-                    # enaTbSetTestDevice $object_value -label [linsert [keylget kltopo objects.$object_name.params.labels] 0 $object_name]
-                    pass
-                elif isinstance(object_value, genie.conf.base.Interface):
-                    active_xos_interfaces.append(object_value)
-                    # enaTbSetInterface $object_value -topolayer [keylget kltopo params.topolayer]
-                elif isinstance(object_value, genie.conf.base.Link):
-                    # enaTbSetLink $object_value -topolayer [keylget kltopo params.topolayer]
-                    pass
-                else:
-                    raise ValueError(object_value)
-            Genie.testbed.set_active_interfaces(active_xos_interfaces)
-            # enaTbSetDefaultTopologyLayer test
-            self.resolved_subset = subset
-            return
+            if accept_solution(subset, r.best_objects, getattr(r, 'best_weight', None)):
+                return
 
         # if { $_trace(dump_fail) } {
         #     xscale::dyntopo dump
@@ -1801,6 +2205,27 @@ class TopologyMapper(object):
         # enaDestructor -id dyntopo_debug_restore -eval
         raise FailedToResolveException(self)
 
+    def find_all(self, **kwargs):
+        '''Generate all the possible assignments of the topology.
+
+        Nothing is assigned; (subset_name, assignments) tuples are generated
+        as they are found, where assignments is {object_name: object}.
+        Constraint group weights are ignored.
+
+        Accepts the same arguments as do_resolve.
+        '''
+        self.forget()
+        yield from self.do_resolve(find_all=True, **kwargs)
+
+    def _iter_solutions(self, subset_names, create_resolver):
+        for subset_name in subset_names:
+            subset, r = create_resolver(subset_name)
+            for best_objects in r.iter_solutions():
+                yield subset_name, {
+                    object_name: object_value
+                    for object_name, object_value in best_objects.items()
+                    if object_value is not None}
+
     def log_diagram(self):
         legend = []
         legend.append('Topology assignments:')
@@ -1847,10 +2272,10 @@ class TopologyMapper(object):
             Genie.init(testbed=ats.easypy.runtime.testbed)
         elif Genie.testbed:
             # Reset object states
-            for xos_device in Genie.testbed.devices:
+            for xos_device in Genie.testbed.devices.values():
                 xos_device.obj_state = 'active'
-                for xos_link in xos_device.interfaces:
-                    xos_link.obj_state = 'active'
+                for xos_interface in xos_device.interfaces.values():
+                    xos_interface.obj_state = 'active'
             for link in Genie.testbed.links:
                 link.obj_state = 'active'
             # TODO remove features?
@@ -0,0 +1,96 @@
+'''Cached lookup of the OS-specific Conf classes
+
+The Conf factories (Interface, Device, EmulatedDevice, ...) create the class
+specific to the OS of the device, found in the `<package>.<os>` module. The
+class is resolved once per (package, os, name) and kept, as are the
+descendent classes looked up from it; An OS without module is remembered
+too, and the same error is raised again. Other errors (missing class, error
+importing the module) are not kept, the lookup is tried again.
+
+Example:
+
+    >>> os_class('genie.libs.conf.interface', 'iosxr', 'Interface')
+    <class 'genie.libs.conf.interface.iosxr.interface.Interface'>
+
+Classes defined after a lookup (new subclasses) are only seen once
+clear_os_classes is called.
+'''
+
+__all__ = (
+    'os_class',
+    'descendent_class',
+    'clear_os_classes',
+)
+
+import functools
+import importlib
+
+# (package, os, name) -> class, or the ImportError of a missing OS module
+_os_classes = {}
+
+
+def os_class(package, os, name):
+    '''Return the class `name` specific to an OS
+
+    Args:
+        package (`str`): Package of the OS modules, e.g. genie.libs.conf.device
+        os (`str`): Device os
+        name (`str`): Class name, e.g. Device
+
+    Returns:
+        The class
+
+    Raises:
+        ImportError: No module for the OS
+        AttributeError: No such class in the OS module
+    '''
+    key = (package, os, name)
+    try:
+        found = _os_classes[key]
+    except KeyError:
+        module_name = '{package}.{os}'.format(package=package, os=os)
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            if e.name == module_name:
+                # No module for the OS, it will not appear
+                _os_classes[key] = e
+            raise
+        found = _os_classes[key] = getattr(module, name)
+        return found
+    if isinstance(found, ImportError):
+        # A new error each time, not to grow the traceback of the cached one
+        raise type(found)(*found.args, name=found.name, path=found.path)
+    return found
+
+
+@functools.lru_cache(maxsize=None)
+def descendent_class(cls, subcls):
+    '''Find the descendent class of cls that is a subclass of subcls.'''
+    found_subclasses = set()
+    subclasses_walked = set()
+    subclasses_to_walk = [cls]
+    while subclasses_to_walk:
+        cls = subclasses_to_walk.pop(0)
+        if cls in subclasses_walked:
+            continue
+        else:
+            subclasses_walked.add(cls)
+        if issubclass(cls, subcls):
+            found_subclasses.add(cls)
+        else:
+            subclasses_to_walk.extend(cls.__subclasses__())
+    if not found_subclasses:
+        raise TypeError('No %r specific subclass of %r found.' % (
+            subcls.__qualname__, cls.__qualname__))
+    if len(found_subclasses) > 1:
+        raise TypeError('Too many %r specific subclass of %r found: %r' % (
+            subcls.__qualname__, cls.__qualname__, found_subclasses))
+    cls = found_subclasses.pop()
+    return cls
+
+
+def clear_os_classes():
+    '''Forget the classes looked up so far'''
+    _os_classes.clear()
+    descendent_class.cache_clear()
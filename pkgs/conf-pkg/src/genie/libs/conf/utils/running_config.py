@@ -0,0 +1,275 @@
+'''Learn several Conf features from one show running-config
+
+Each Conf feature learn_config runs its own ShowRunningConfig* parser, which
+sends its own `show running-config <section>` command to the device; Learning
+BGP, VRF, PIM, MSDP and TRM sends five of them, each one going through the
+whole configuration on the device.
+
+While RunningConfigSections is entered, the running-config of the device is
+fetched once and the section commands the parsers send are answered from it:
+
+* `show running-config <feature>` on NX-OS, for the features in
+  NXOS_SECTIONS: The lines of the feature and their parent modes.
+* `show running-config <words>` on IOS-XR: The top-level blocks starting
+  with the words (router bgp, vrf, ...).
+* `show running-config | section|include|exclude|begin <regex>` on any OS.
+
+Any other command, or section which cannot be answered exactly, is sent to
+the device as before.
+
+Example:
+
+    >>> learnt = learn_config(device, [Bgp, Vrf, Pim])
+    >>> learnt[Bgp]
+    [<Bgp object ...>]
+
+    >>> with RunningConfigSections(device):
+    ...     Bgp.learn_config(device=device)
+    ...     Vrf.learn_config(device=device)
+'''
+
+__all__ = (
+    'RunningConfigSections',
+    'section_config',
+    'learn_config',
+)
+
+import re
+import copy
+import logging
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# show running-config <feature> on NX-OS; feature -> regex of its lines
+NXOS_SECTIONS = {
+    'bgp': r'^(feature bgp|router bgp)\b',
+    'pim': r'^\s*(feature pim|ip pim)\b',
+    'pim6': r'^\s*(feature pim6|ipv6 pim)\b',
+    'msdp': r'^\s*(feature msdp|ip msdp)\b',
+}
+
+# Lines at the top-level which still belong to the previous block
+_BLOCK_ENDS = ('end-policy', 'end-set')
+
+_re_show_run = re.compile(r'^show\s+(?:run|running-config)(?=\s|\||$)')
+_re_filter = re.compile(r'^(?P<filter>\S+)\s+(?P<pattern>.+)$')
+
+_filters = {
+    'section': 'section', 'sec': 'section', 's': 'section',
+    'include': 'include', 'inc': 'include', 'i': 'include',
+    'exclude': 'exclude', 'exc': 'exclude', 'ex': 'exclude', 'e': 'exclude',
+    'begin': 'begin', 'beg': 'begin', 'b': 'begin',
+}
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+
+def _blocks(lines):
+    '''Split lines into top-level blocks, each a list of lines'''
+    blocks = []
+    for line in lines:
+        if not line.strip():
+            continue
+        if blocks and (line[:1].isspace() or line.strip() in _BLOCK_ENDS):
+            blocks[-1].append(line)
+        else:
+            blocks.append([line])
+    return blocks
+
+
+def _section(lines, match):
+    '''Blocks whose header matches, and the matching lines of the others
+    along with their header and the lines below them'''
+    out = []
+    for block in _blocks(lines):
+        if match(block[0]):
+            out.extend(block)
+            continue
+        kept = []
+        i = 1
+        while i < len(block):
+            if match(block[i]):
+                indent = _indent(block[i])
+                kept.append(block[i])
+                i += 1
+                while i < len(block) and _indent(block[i]) > indent:
+                    kept.append(block[i])
+                    i += 1
+            else:
+                i += 1
+        if kept:
+            out.append(block[0])
+            out.extend(kept)
+    return out
+
+
+def _prefix(lines, words):
+    '''Top-level blocks whose header starts with words'''
+    out = []
+    for block in _blocks(lines):
+        if block[0].split()[:len(words)] == words:
+            out.extend(block)
+    return out
+
+
+def section_config(running_config, command, os=None):
+    '''Return the output of a show running-config command, computed from the
+    full running-config
+
+    Args:
+        running_config (`str`): Output of show running-config
+        command (`str`): show running-config command
+        os (`str`): Device os
+
+    Returns:
+        `str`, or None if the output cannot be computed exactly
+    '''
+    command = ' '.join(command.split())
+    m = _re_show_run.match(command)
+    if not m:
+        return None
+    args, *filters = command[m.end():].split('|')
+    args = args.split()
+
+    lines = running_config.splitlines()
+    if args:
+        if os == 'nxos' and len(args) == 1 and args[0] in NXOS_SECTIONS:
+            regex = re.compile(NXOS_SECTIONS[args[0]])
+            lines = _section(lines, regex.search)
+        elif os == 'iosxr' and args[0] not in ('all', 'formal'):
+            lines = _prefix(lines, args)
+            if not lines:
+                # Could also be an abbreviated keyword, let the device say
+                return None
+        else:
+            return None
+
+    for filter_ in filters:
+        m = _re_filter.match(filter_.strip())
+        if not m or m.group('filter') not in _filters:
+            return None
+        pattern = m.group('pattern')
+        if len(pattern) > 1 and pattern[0] == pattern[-1] and \
+           pattern[0] in '"\'':
+            pattern = pattern[1:-1]
+        try:
+            search = re.compile(pattern).search
+        except re.error:
+            return None
+        kind = _filters[m.group('filter')]
+        if kind == 'section':
+            lines = _section(lines, search)
+        elif kind == 'include':
+            lines = [line for line in lines if search(line)]
+        elif kind == 'exclude':
+            lines = [line for line in lines if not search(line)]
+        else:
+            for i, line in enumerate(lines):
+                if search(line):
+                    lines = lines[i:]
+                    break
+            else:
+                lines = []
+
+    return '\n'.join(lines)
+
+
+class RunningConfigSections(object):
+    '''Answer the show running-config section commands sent to a device from
+    one show running-config
+
+    The running-config is fetched on the first section command and kept
+    until the device is configured or `refresh` is called; It is kept when
+    exiting, so the same object can be entered again to learn more features
+    from the same running-config.
+
+    Args:
+        device (`Device`): Device to learn from
+        running_config (`str`): Running-config to use instead of fetching it
+    '''
+
+    # Methods of the device which are wrapped
+    WRAPPED = ('execute', 'configure')
+
+    def __init__(self, device, running_config=None):
+        self.device = device
+        self.running_config = running_config
+        self.hits = 0
+        # Methods set directly on the device object, restored on exit
+        self._originals = {}
+        self._methods = {}
+
+    def __enter__(self):
+        for name in self.WRAPPED:
+            if name in self.device.__dict__:
+                self._originals[name] = self.device.__dict__[name]
+            self._methods[name] = getattr(self.device, name)
+        self.device.execute = self._execute
+        self.device.configure = self._configure
+        return self
+
+    def __exit__(self, *exc_info):
+        for name in self.WRAPPED:
+            if name in self._originals:
+                setattr(self.device, name, self._originals.pop(name))
+            else:
+                self.device.__dict__.pop(name, None)
+        self._methods.clear()
+
+    def refresh(self):
+        '''Fetch the running-config again on the next section command'''
+        self.running_config = None
+
+    def _execute(self, command, *args, **kwargs):
+        execute = self._methods['execute']
+        if args or not isinstance(command, str) or \
+           not _re_show_run.match(command.strip()):
+            return execute(command, *args, **kwargs)
+
+        if self.running_config is None:
+            self.running_config = execute('show running-config')
+        output = section_config(self.running_config, command,
+                                os=getattr(self.device, 'os', None))
+        if output is None:
+            return execute(command, *args, **kwargs)
+        self.hits += 1
+        log.debug("'{c}' answered from the running-config of '{d}'".format(
+            c=command, d=self.device.name))
+        return output
+
+    def _configure(self, *args, **kwargs):
+        try:
+            return self._methods['configure'](*args, **kwargs)
+        finally:
+            self.refresh()
+
+
+def learn_config(device, features, running_config=None, **kwargs):
+    '''Learn several Conf features from one show running-config
+
+    Args:
+        device (`Device`): Device to learn from
+        features (`list`): Conf classes to learn, or a dictionary of
+                           Conf class -> learn_config keyword arguments
+        running_config (`str`): Running-config to use instead of fetching it
+        kwargs: learn_config keyword arguments of every feature
+
+    Returns:
+        `OrderedDict`: Conf class -> list of learnt Conf objects
+    '''
+    if not isinstance(features, dict):
+        features = OrderedDict((feature, {}) for feature in features)
+
+    learnt = OrderedDict()
+    with RunningConfigSections(device, running_config) as sections:
+        for feature, feature_kwargs in features.items():
+            # learn_config extends the attributes list it is given
+            kw = copy.deepcopy(dict(kwargs, **(feature_kwargs or {})))
+            learnt[feature] = feature.learn_config(device=device, **kw)
+    log.info("Learnt {f} from one running-config of '{d}' ({n} commands "
+             "answered)".format(f=', '.join(f.__name__ for f in learnt),
+                                d=device.name, n=sections.hits))
+    return learnt
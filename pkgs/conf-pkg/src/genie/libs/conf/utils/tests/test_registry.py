@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+import sys
+import types
+import unittest
+from unittest.mock import patch
+
+from genie.libs.conf.utils.registry import os_class, descendent_class, \
+                                          clear_os_classes
+
+
+class Interface(object):
+    pass
+
+
+class LoopbackInterface(Interface):
+    pass
+
+
+class OsInterface(Interface):
+    pass
+
+
+class OsLoopbackInterface(OsInterface, LoopbackInterface):
+    pass
+
+
+class test_registry(unittest.TestCase):
+
+    def setUp(self):
+        clear_os_classes()
+        self.module = types.ModuleType('registry_pkg.myos')
+        self.module.Interface = OsInterface
+        self.addCleanup(clear_os_classes)
+
+    def test_os_class(self):
+        with patch.dict(sys.modules, {'registry_pkg.myos': self.module}), \
+             patch('importlib.import_module',
+                   side_effect=lambda name: sys.modules[name]) as import_:
+            for i in range(3):
+                self.assertIs(os_class('registry_pkg', 'myos', 'Interface'),
+                              OsInterface)
+            self.assertEqual(import_.call_count, 1)
+
+            # Missing class, not kept
+            for i in range(2):
+                with self.assertRaises(AttributeError):
+                    os_class('registry_pkg', 'myos', 'Device')
+            self.assertEqual(import_.call_count, 3)
+            self.module.Device = OsInterface
+            self.assertIs(os_class('registry_pkg', 'myos', 'Device'),
+                          OsInterface)
+
+    def test_os_module_missing(self):
+        def import_module(name):
+            raise ImportError('No module named {!r}'.format(name), name=name)
+
+        with patch('importlib.import_module',
+                   side_effect=import_module) as import_:
+            # Raised again without importing
+            for i in range(2):
+                with self.assertRaises(ImportError) as cm:
+                    os_class('registry_pkg', 'myos', 'Interface')
+                self.assertEqual(cm.exception.name, 'registry_pkg.myos')
+            self.assertEqual(import_.call_count, 1)
+
+        for i in range(2):
+            with self.assertRaises(ImportError):
+                os_class('registry_pkg_missing', 'myos', 'Interface')
+
+    def test_os_module_error(self):
+        # The module of the OS fails importing another module, not kept
+        error = ImportError("No module named 'other'", name='other')
+        with patch('importlib.import_module',
+                   side_effect=[error, self.module]) as import_:
+            with self.assertRaises(ImportError) as cm:
+                os_class('registry_pkg', 'myos', 'Interface')
+            self.assertEqual(cm.exception.name, 'other')
+            self.assertIs(os_class('registry_pkg', 'myos', 'Interface'),
+                          OsInterface)
+            self.assertEqual(import_.call_count, 2)
+
+    def test_descendent_class(self):
+        self.assertIs(descendent_class(OsInterface, LoopbackInterface),
+                      OsLoopbackInterface)
+        self.assertIs(descendent_class(OsInterface, LoopbackInterface),
+                      OsLoopbackInterface)
+        with self.assertRaises(TypeError):
+            descendent_class(Interface, unittest.TestCase)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import Mock
+
+from genie.libs.conf.utils.running_config import RunningConfigSections, \
+                                                 section_config, learn_config
+
+nxos_config = '''\
+!Command: show running-config
+version 7.0(3)I7(1)
+feature bgp
+feature pim
+feature pim6
+ip pim rp-address 1.1.1.1 group-list 224.0.0.0/4
+ipv6 pim rp-address 2001::1 group-list ff00::/8
+vrf context VRF1
+  ip pim ssm range 232.0.0.0/8
+  rd 1:1
+interface Ethernet1/1
+  description bgp peer
+  ip address 10.1.1.1/24
+  ip pim sparse-mode
+router bgp 100
+  router-id 1.1.1.1
+  neighbor 10.1.1.2
+    remote-as 200
+'''
+
+iosxr_config = '''\
+hostname R1
+vrf VRF1
+ address-family ipv4 unicast
+  import route-target
+   100:1
+  !
+ !
+!
+route-policy PASS
+  pass
+end-policy
+!
+router bgp 100
+ bgp router-id 1.1.1.1
+!
+'''
+
+
+class test_section_config(unittest.TestCase):
+
+    def test_nxos_sections(self):
+        self.assertEqual(
+            section_config(nxos_config, 'show running-config bgp', os='nxos'),
+            'feature bgp\n'
+            'router bgp 100\n'
+            '  router-id 1.1.1.1\n'
+            '  neighbor 10.1.1.2\n'
+            '    remote-as 200')
+        self.assertEqual(
+            section_config(nxos_config, 'show running-config pim', os='nxos'),
+            'feature pim\n'
+            'ip pim rp-address 1.1.1.1 group-list 224.0.0.0/4\n'
+            'vrf context VRF1\n'
+            '  ip pim ssm range 232.0.0.0/8\n'
+            'interface Ethernet1/1\n'
+            '  ip pim sparse-mode')
+        self.assertEqual(
+            section_config(nxos_config, 'show running-config pim6',
+                           os='nxos'),
+            'feature pim6\n'
+            'ipv6 pim rp-address 2001::1 group-list ff00::/8')
+        # Not known, sent to the device
+        self.assertIsNone(
+            section_config(nxos_config, 'show running-config vrf VRF1',
+                           os='nxos'))
+
+    def test_iosxr_prefix(self):
+        self.assertEqual(
+            section_config(iosxr_config, 'show running-config router bgp',
+                           os='iosxr'),
+            'router bgp 100\n'
+            ' bgp router-id 1.1.1.1')
+        self.assertEqual(
+            section_config(iosxr_config, 'show run route-policy',
+                           os='iosxr'),
+            'route-policy PASS\n'
+            '  pass\n'
+            'end-policy')
+        self.assertIsNone(
+            section_config(iosxr_config, 'show running-config router ospf',
+                           os='iosxr'))
+
+    def test_filters(self):
+        self.assertEqual(
+            section_config(nxos_config,
+                           'show running-config | section "^vrf context"'),
+            'vrf context VRF1\n'
+            '  ip pim ssm range 232.0.0.0/8\n'
+            '  rd 1:1')
+        self.assertEqual(
+            section_config(nxos_config, 'show run | inc ^feature'),
+            'feature bgp\nfeature pim\nfeature pim6')
+        self.assertEqual(
+            section_config(nxos_config, 'show running-config | inc feature '
+                                        '| exclude pim'),
+            'feature bgp')
+        self.assertEqual(
+            section_config(nxos_config, 'show running-config | begin '
+                                        'router').splitlines()[0],
+            'router bgp 100')
+        self.assertIsNone(
+            section_config(nxos_config, 'show running-config | count'))
+        self.assertIsNone(section_config(nxos_config, 'show version'))
+
+
+class test_running_config_sections(unittest.TestCase):
+
+    def setUp(self):
+        self.device = Mock()
+        self.device.name = 'PE1'
+        self.device.os = 'nxos'
+        self.execute = Mock(side_effect=lambda cmd, **kwargs:
+                            nxos_config if cmd == 'show running-config'
+                            else 'output of ' + cmd)
+        self.device.execute = self.execute
+
+    def test_one_fetch(self):
+        with RunningConfigSections(self.device) as sections:
+            self.device.execute('show running-config bgp')
+            self.device.execute('show running-config pim')
+            self.assertEqual(self.device.execute('show version'),
+                             'output of show version')
+            self.device.configure('feature msdp')
+            self.device.execute('show running-config bgp')
+        self.assertEqual(sections.hits, 3)
+        self.assertEqual([c[0][0] for c in self.execute.call_args_list],
+                         ['show running-config',
+                          'show version',
+                          'show running-config'])
+        # Restored on exit
+        self.assertIs(self.device.execute, self.execute)
+
+    def test_learn_config(self):
+        class Bgp(object):
+            @classmethod
+            def learn_config(cls, device, **kwargs):
+                return [device.execute('show running-config bgp'), kwargs]
+
+        class Pim(Bgp):
+            @classmethod
+            def learn_config(cls, device, **kwargs):
+                kwargs['attributes'].append('v4_vrfs_list')
+                return [device.execute('show running-config pim'), kwargs]
+
+        attributes = ['pim[enabled_pim]']
+        learnt = learn_config(self.device, {Bgp: {},
+                                            Pim: {'attributes': attributes}})
+        self.assertEqual(list(learnt), [Bgp, Pim])
+        self.assertTrue(learnt[Bgp][0].startswith('feature bgp'))
+        self.assertEqual(learnt[Pim][1]['attributes'],
+                         ['pim[enabled_pim]', 'v4_vrfs_list'])
+        # The attributes given are not modified
+        self.assertEqual(attributes, ['pim[enabled_pim]'])
+        self.assertEqual(self.execute.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
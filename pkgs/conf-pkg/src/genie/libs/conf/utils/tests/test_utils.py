@@ -203,6 +203,40 @@ class test_config_cli_to_tree(TestCase):
             end-policy
         '''))
 
+    def test_cli_to_tree_junos(self):
+
+        cli = inspect.cleandoc('''
+            version 15.1R1;
+            interfaces {
+                ge-0/0/10 {
+                    unit 0; # inline comment
+                }
+                ge-0/0/2 {
+                    description "to R2";
+                }
+            }
+        ''')
+
+        cli_tree = config_cli_to_tree(cli, os='junos', strip=True, sort=True)
+        self.assertEqual(cli_tree, (
+            ('interfaces', (
+                ('ge-0/0/2', (
+                    ('description "to R2"', None),
+                )),
+                ('ge-0/0/10', (
+                    ('unit 0', None),
+                )),
+            )),
+            ('version 15.1R1', None),
+        ))
+
+    def test_dictionary_sort_key(self):
+
+        self.assertEqual(
+            sorted(['R10', 'r2', 'R2', 'R1', 'a007', 'a07', 'a7', 'a-1'],
+                   key=dictionary_sort_key),
+            ['a-1', 'a7', 'a07', 'a007', 'R1', 'R2', 'r2', 'R10'])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -26,10 +26,17 @@ from genie.libs.parser.nxos.show_vrf import ShowVrf
 # nxos show_routing
 from genie.libs.parser.nxos.show_routing import ShowRoutingVrfAll
 
+# Ops utils
+from genie.libs.ops.utils.planner import CommandPlanner
+
 
 class Bgp(Base):
     '''BGP Genie Ops Object'''
 
+    # Connection aliases used to execute the per vrf and per neighbor
+    # commands in parallel, ex: ['vty_1', 'vty_2']
+    sessions = None
+
     # Callables
     def get_af_key(self, item):
         return {key: {} for key in item.keys()}
@@ -441,8 +448,15 @@ class Bgp(Base):
 
         # Creating a list of all vrfs configured on the device. Looping through
         # each vrf to execute "show bgp vrf <vrf_name> all neighbors"
+        planner = CommandPlanner(self.device, sessions=self.sessions)
+
         if hasattr(self, 'info') and 'list_of_vrfs' in self.info:
 
+            # Execute 'show bgp vrf <vrf_name> all neighbors' once per vrf
+            for vrf_name in sorted(self.info['list_of_vrfs']):
+                planner.add(ShowBgpVrfAllNeighbors, vrf=vrf_name)
+            planner.execute(maker=self.maker)
+
             for vrf_name in sorted(self.info['list_of_vrfs']):
 
                 # neighbor_id
@@ -959,6 +973,14 @@ class Bgp(Base):
                 if hasattr (self, 'routes_per_peer') and\
                    'list_of_neighbors' in self.routes_per_peer:
 
+                    # Execute the per neighbor commands once each
+                    for neighbor in sorted(self.routes_per_peer['list_of_neighbors']):
+                        for cmd in [ShowBgpVrfAllNeighborsAdvertisedRoutes,
+                                    ShowBgpVrfAllNeighborsRoutes,
+                                    ShowBgpVrfAllNeighborsReceivedRoutes]:
+                            planner.add(cmd, vrf=vrf_name, neighbor=neighbor)
+                    planner.execute(maker=self.maker)
+
                     for neighbor in sorted(self.routes_per_peer['list_of_neighbors']):
 
                         # advertised
@@ -0,0 +1 @@
+'''Shared helpers for the Genie Ops objects'''
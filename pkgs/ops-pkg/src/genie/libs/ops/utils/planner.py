@@ -0,0 +1,155 @@
+'''Command planner for the Ops learn()
+
+Ops objects register many `add_leaf` entries which share the same parser and
+the same keyword arguments. The planner collects the distinct
+(parser, kwargs) pairs, executes each of them exactly once and stores the
+parsed output into the Ops maker, so the following `make()` call does not
+send the command again.
+
+When extra connections are opened on the device, independent commands are
+sent in parallel, one command per connection at a time.
+
+Example:
+
+    >>> device.connect(alias='vty_1', via='vty')
+    >>> device.connect(alias='vty_2', via='vty')
+    >>> planner = CommandPlanner(device, sessions=['vty_1', 'vty_2'])
+    >>> planner.add(ShowBgpVrfAllNeighborsRoutes, vrf='default',
+    ...             neighbor='10.4.1.1')
+    >>> planner.execute(maker=bgp.maker)
+'''
+
+# Python
+import queue
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Metaparser
+from genie.metaparser.util.exceptions import SchemaEmptyParserError
+
+log = logging.getLogger(__name__)
+
+
+def outputs_key(kwargs):
+    '''Key used by the Ops maker to store the output of a parser
+
+    Args:
+        kwargs (`dict`): Keyword arguments given to the parser
+
+    Returns:
+        `str`: '' when there is no kwargs, otherwise "{'vrf':'all'}"
+    '''
+    if not kwargs:
+        return ''
+    return '{' + ','.join(["'{k}':'{v}'".format(k=k, v=v)
+                           for k, v in sorted(kwargs.items())]) + '}'
+
+
+class SessionDevice(object):
+    '''Device proxy which sends the commands through one of its connections
+
+    The parsers only call `execute` on the device, everything else is
+    resolved on the real device object.
+    '''
+
+    def __init__(self, device, session):
+        self._device = device
+        self._session = session
+
+    def execute(self, *args, **kwargs):
+        return self._session.execute(*args, **kwargs)
+
+    def __getattr__(self, item):
+        return getattr(self._device, item)
+
+
+class CommandPlanner(object):
+    '''Collect the distinct (parser, kwargs) pairs and execute them once
+
+    Args:
+        device (`Device`): Device to execute the commands on
+        sessions (`list`): Connection aliases already connected on the
+                           device. When more than one is given, the commands
+                           are executed in parallel, one worker per
+                           connection. Default to the device default
+                           connection, executed serially.
+    '''
+
+    def __init__(self, device, sessions=None):
+        self.device = device
+        self.sessions = list(sessions or [])
+        # (cmd, outputs_key) -> (cmd, kwargs), keeps insertion order
+        self.pending = {}
+
+    def add(self, cmd, **kwargs):
+        '''Register a parser to execute; duplicates are ignored'''
+        self.pending.setdefault((cmd, outputs_key(kwargs)), (cmd, kwargs))
+
+    def _connections(self):
+        connections = []
+        for alias in self.sessions:
+            try:
+                connections.append(
+                    self.device.connectionmgr.connections[alias])
+            except KeyError:
+                log.warning("Connection '{a}' does not exists on '{d}', it "
+                            "will not be used".format(a=alias,
+                                                      d=self.device.name))
+        return connections
+
+    def _parse(self, device, cmd, kwargs):
+        try:
+            return True, cmd(device=device).parse(**kwargs)
+        except SchemaEmptyParserError:
+            return True, {}
+        except Exception as e:
+            # Let the maker deal with it, the same way it always did
+            log.debug("Could not execute '{c}' with {k}: {e}".format(
+                c=cmd.__name__, k=kwargs, e=e))
+            return False, None
+
+    def execute(self, maker):
+        '''Execute the pending commands and store them into the maker outputs
+
+        Commands which already have an output in the maker are not executed.
+
+        Args:
+            maker (`Maker`): Maker of the Ops object
+        '''
+        todo = [(key, cmd, kwargs)
+                for (cmd, key), (cmd, kwargs) in self.pending.items()
+                if key not in maker.outputs.get(cmd, {})]
+        self.pending = {}
+        if not todo:
+            return
+
+        connections = self._connections()
+        if len(connections) < 2:
+            device = SessionDevice(self.device, connections[0]) \
+                if connections else self.device
+            results = [self._parse(device, cmd, kwargs)
+                       for _, cmd, kwargs in todo]
+        else:
+            # One worker per connection; a connection is only used by one
+            # worker at a time
+            free = queue.Queue()
+            for connection in connections:
+                free.put(connection)
+
+            def work(item):
+                _, cmd, kwargs = item
+                connection = free.get()
+                try:
+                    return self._parse(
+                        SessionDevice(self.device, connection), cmd, kwargs)
+                finally:
+                    free.put(connection)
+
+            log.info("Executing {n} commands over {s} connections".format(
+                n=len(todo), s=len(connections)))
+            with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+                results = list(executor.map(work, todo))
+
+        for (key, cmd, _), (parsed, output) in zip(todo, results):
+            if parsed:
+                maker.outputs.setdefault(cmd, {})[key] = output
@@ -0,0 +1,87 @@
+# Python
+import unittest
+from unittest.mock import Mock
+
+# ATS
+from ats.topology import Device
+
+# Genie
+from genie.libs.ops.utils.planner import CommandPlanner, outputs_key
+from genie.metaparser.util.exceptions import SchemaEmptyParserError
+
+
+class ShowDummy(object):
+    '''Parser like object which records the commands sent'''
+
+    def __init__(self, device):
+        self.device = device
+
+    def parse(self, **kwargs):
+        out = self.device.execute('show dummy {}'.format(
+            ' '.join(str(v) for _, v in sorted(kwargs.items()))).strip())
+        if not out:
+            raise SchemaEmptyParserError(out)
+        return {'output': out}
+
+
+class test_planner(unittest.TestCase):
+
+    def setUp(self):
+        self.device = Device(name='aDevice')
+        self.device.os = 'nxos'
+        self.device.execute = Mock(side_effect=lambda cmd: cmd)
+        self.maker = Mock()
+        self.maker.outputs = {}
+
+    def test_outputs_key(self):
+        self.assertEqual(outputs_key({}), '')
+        self.assertEqual(outputs_key({'vrf': 'all'}), "{'vrf':'all'}")
+        self.assertEqual(outputs_key({'vrf': 'default', 'neighbor': '1.1.1.1'}),
+                         "{'neighbor':'1.1.1.1','vrf':'default'}")
+
+    def test_deduplicate(self):
+        planner = CommandPlanner(self.device)
+        planner.add(ShowDummy, vrf='VRF1')
+        planner.add(ShowDummy, vrf='VRF1')
+        planner.add(ShowDummy, vrf='default')
+        planner.execute(maker=self.maker)
+
+        self.assertEqual(self.device.execute.call_count, 2)
+        self.assertEqual(self.maker.outputs[ShowDummy],
+                         {"{'vrf':'VRF1'}": {'output': 'show dummy VRF1'},
+                          "{'vrf':'default'}": {'output': 'show dummy default'}})
+
+        # Already in the maker outputs, not executed again
+        planner.add(ShowDummy, vrf='VRF1')
+        planner.execute(maker=self.maker)
+        self.assertEqual(self.device.execute.call_count, 2)
+
+    def test_empty_output(self):
+        self.device.execute = Mock(return_value='')
+        planner = CommandPlanner(self.device)
+        planner.add(ShowDummy, vrf='VRF1')
+        planner.execute(maker=self.maker)
+        self.assertEqual(self.maker.outputs[ShowDummy], {"{'vrf':'VRF1'}": {}})
+
+    def test_sessions(self):
+        sessions = {}
+        for alias in ['vty_1', 'vty_2']:
+            sessions[alias] = Mock()
+            sessions[alias].execute = Mock(side_effect=lambda cmd: cmd)
+        self.device.connectionmgr.connections.update(sessions)
+
+        planner = CommandPlanner(self.device, sessions=['vty_1', 'vty_2'])
+        for neighbor in range(10):
+            planner.add(ShowDummy, neighbor=neighbor)
+        planner.execute(maker=self.maker)
+
+        self.assertEqual(len(self.maker.outputs[ShowDummy]), 10)
+        self.assertEqual(self.maker.outputs[ShowDummy]["{'neighbor':'3'}"],
+                         {'output': 'show dummy 3'})
+        self.assertEqual(sessions['vty_1'].execute.call_count +
+                         sessions['vty_2'].execute.call_count, 10)
+        self.assertFalse(self.device.execute.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
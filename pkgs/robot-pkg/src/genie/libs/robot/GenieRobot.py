@@ -7,6 +7,7 @@ import importlib
 from collections import ChainMap
 from copy import deepcopy
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from robot.api.deco import keyword
 from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
@@ -20,7 +21,6 @@ from ats.results import (Passed, Failed, Aborted, Errored,
                          Skipped, Blocked, Passx)
 
 from genie.conf import Genie
-from genie.utils.diff import Diff
 from genie.conf.base import loader
 from genie.conf.base import Testbed
 from genie.utils.config import Config
@@ -31,6 +31,9 @@ from genie.harness.discovery import GenieScriptDiscover
 from genie.harness.datafile.loader import TriggerdatafileLoader,\
                                           VerificationdatafileLoader,\
                                           PtsdatafileLoader
+from genie.libs.sdk.libs.utils.cache import enable_output_cache,\
+                                            disable_output_cache
+from genie.libs.sdk.libs.utils.hashdiff import hash_tree, snapshot_diff
 
 log = logging.getLogger(__name__)
 
@@ -45,6 +48,10 @@ class GenieRobot(object):
         # save builtin so we dont have to re-create then everytime
         self.builtin = BuiltIn()
 
+        # (section, name, device, context) -> datafile to discover the
+        # testcase from, with only what is needed for it
+        self._testcases = {}
+
         # Need to create a testscript
         try:
             # If pyATS, then call their use_testbed api, then convert
@@ -290,33 +297,37 @@ class GenieRobot(object):
         '''Call any verification defined in the verification datafile
            on device using a specific alias with a context (cli, xml, yang, ...)
         '''
-        # Set the variables to find the verification
-        self.testscript.verification_uids = Or(name+'$')
-        self.testscript.verification_groups = None
-        self.testscript.verifications = deepcopy(self.verification_datafile)
-        self.testscript.triggers = None
-
-        # Modify the parameters to include context
-        if name in self.testscript.verifications:
-            # Add new parameters named context
-            # No need to revert, as a deepcopy was taken, and after discovery
-            # nothing is done with the datafiles after
-            if 'devices' in self.testscript.verifications[name]:
-                # For each device add context
-                for dev in self.testscript.verifications[name]['devices']:
-                    # To shorten the variable
-                    verf = self.testscript.verifications[name]
-                    if 'devices_attributes' not in verf or\
-                        verf['devices_attributes'][dev] == 'None':
-                        verf.setdefault('devices_attributes', {})
-                        verf['devices_attributes'].setdefault(dev, {})
-                        verf['devices_attributes'][dev] = {}
-
-                    self.testscript.verifications[name]\
+        def prepare(datafile):
+            # Set the variables to find the verification
+            self.testscript.verification_uids = Or(name+'$')
+            self.testscript.verification_groups = None
+            self.testscript.verifications = deepcopy(datafile)
+            self.testscript.triggers = None
+
+            # Modify the parameters to include context
+            if name in self.testscript.verifications:
+                # Add new parameters named context
+                # No need to revert, as a deepcopy was taken, and after
+                # discovery nothing is done with the datafiles after
+                if 'devices' in self.testscript.verifications[name]:
+                    # For each device add context
+                    for dev in self.testscript.verifications[name]['devices']:
+                        # To shorten the variable
+                        verf = self.testscript.verifications[name]
+                        if 'devices_attributes' not in verf or\
+                            verf['devices_attributes'][dev] == 'None':
+                            verf.setdefault('devices_attributes', {})
+                            verf['devices_attributes'].setdefault(dev, {})
+                            verf['devices_attributes'][dev] = {}
+
+                        self.testscript.verifications[name]\
                                 ['devices_attributes'][dev]['context'] = context
 
         self._run_genie_trigger_verification(name=name, alias=alias,
-                                             device=device, context=context)
+                                             device=device, context=context,
+                                             section='verification',
+                                             datafile=self.verification_datafile,
+                                             prepare=prepare)
 
     @keyword('Run trigger "${name:[^"]+}" on device "${device:[^"]+}" '
              'using alias "${alias:[^"]+}"')
@@ -356,23 +367,26 @@ class GenieRobot(object):
         using a specific alias with a context (cli, xml, yang, ...)
         '''
 
-        # Set the variables to find the trigger
-        device_handle = self._search_device(device)
-
-        self.testscript.trigger_uids = Or(name+'$')
-        self.testscript.trigger_groups = None
-        self.testscript.triggers = deepcopy(self.trigger_datafile)
-        self.testscript.verifications = None
+        def prepare(datafile):
+            # Set the variables to find the trigger
+            device_handle = self._search_device(device)
 
-        # Modify the parameters to include context
-        self._add_abstraction_datafiles(datafile=self.testscript.triggers,
-                                        name=name,
-                                        context=context,
-                                        device=device_handle)
+            self.testscript.trigger_uids = Or(name+'$')
+            self.testscript.trigger_groups = None
+            self.testscript.triggers = deepcopy(datafile)
+            self.testscript.verifications = None
 
+            # Modify the parameters to include context
+            self._add_abstraction_datafiles(datafile=self.testscript.triggers,
+                                            name=name,
+                                            context=context,
+                                            device=device_handle)
 
         self._run_genie_trigger_verification(name=name, alias=alias,
-                                                 device=device, context=context)
+                                             device=device, context=context,
+                                             section='trigger',
+                                             datafile=self.trigger_datafile,
+                                             prepare=prepare)
 
     @keyword('verify count "${number:[^"]+}" "${structure:[^"]+}" on device "${device:[^"]+}"')
     def verify_count(self, number, structure, device):
@@ -487,6 +501,28 @@ class GenieRobot(object):
             self.builtin.fail("Expected synchronized server to be '{}', but "
                               "found '{}'".format(server, output[0][0]))
 
+    @keyword('Enable output cache on devices "${device:[^"]+}"')
+    def enable_output_cache(self, device):
+        '''Reuse the show commands output on the devices for 30 seconds'''
+        return self.enable_output_cache_ttl(device=device, ttl=30)
+
+    @keyword('Enable output cache on devices "${device:[^"]+}" '
+             'for "${ttl:[^"]+}" seconds')
+    def enable_output_cache_ttl(self, device, ttl):
+        '''Reuse the show commands output on the devices for ttl seconds.
+           The cache of a device is invalidated when it is configured or
+           when any other command than show is executed on it.
+        '''
+        for dev in device.split(';'):
+            enable_output_cache(self._search_device(dev.strip()),
+                                ttl=int(ttl))
+
+    @keyword('Disable output cache on devices "${device:[^"]+}"')
+    def disable_output_cache(self, device):
+        '''Stop reusing the show commands output on the devices'''
+        for dev in device.split(';'):
+            disable_output_cache(self._search_device(dev.strip()))
+
     @keyword('Profile the system for "${feature:[^"]+}" on devices '
              '"${device:[^"]+}" as "${name:[^"]+}"')
     def profile_system(self, feature, device, name):
@@ -520,30 +556,65 @@ class GenieRobot(object):
                                         name=name,
                                         alias=alias)
 
-    def _profile_the_system(self, feature, device, context, name, alias):
-        '''Profile system as per the provided features on the devices
+    @keyword('Profile the system for "${feature:[^"]+}" on devices '
+             '"${device:[^"]+}" as "${name:[^"]+}" '
+             'using "${workers:[^"]+}" workers')
+    def profile_system_workers(self, feature, device, name, workers):
+        '''Profile system as per the provided features on the devices,
+           profiling up to `workers` devices at the same time
         '''
-        profiled = {}
-
-        for dev in device.split(';'):
-
-            for fet in feature.split(';'):
-
-                if fet not in profiled:
-                    profiled[fet] = {}
-                if dev not in profiled[fet]:
-                    profiled[fet][dev] = {}
-
-                if fet == 'config':
-                    log.info("Start learning device configuration")
-                    profiled[fet][dev] = self._profile_config(dev)
-                else:
-                    log.info("Start learning feature {f}".format(f=fet))
-                    learnt_feature = self.genie_ops_on_device_alias_context(
-                        feature=fet.strip(), alias=None, device=dev)
+        return self._profile_the_system(feature=feature,
+                                        device=device,
+                                        context='cli',
+                                        name=name,
+                                        alias=None,
+                                        workers=int(workers))
 
-                    profiled[fet][dev] = learnt_feature
+    def _profile_the_system(self, feature, device, context, name, alias,
+                            workers=1):
+        '''Profile system as per the provided features on the devices
 
+        Devices are profiled in parallel with up to `workers` devices at a
+        time; the features of a device are learnt one after another on its
+        connection. A failing device does not stop the others, the failures
+        are reported once every device is profiled.
+        '''
+        profiled = {}
+        features = feature.split(';')
+        devices = device.split(';')
+        for fet in features:
+            profiled[fet] = {dev: {} for dev in devices}
+
+        def profile_device(dev):
+            learnt = {}
+            failures = {}
+            for fet in features:
+                try:
+                    if fet == 'config':
+                        log.info("Start learning device configuration")
+                        learnt[fet] = self._profile_config(dev)
+                    else:
+                        log.info("Start learning feature {f}".format(f=fet))
+                        learnt[fet] = self.genie_ops_on_device_alias_context(
+                            feature=fet.strip(), alias=None, device=dev)
+                    # Hashed now, compare profile only diffs what changed
+                    hash_tree(learnt[fet], exclude=self._profile_exclude(fet))
+                except Exception as e:
+                    log.warning("Could not learn '{f}' on device '{d}': {e}"
+                                .format(f=fet, d=dev, e=e))
+                    failures[fet] = e
+            return learnt, failures
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(profile_device, devices))
+
+        failed = []
+        for dev, (learnt, failures) in zip(devices, results):
+            for fet, ops in learnt.items():
+                profiled[fet][dev] = ops
+            for fet, e in failures.items():
+                failed.append("'{f}' on device '{d}': {e}".format(f=fet, d=dev,
+                                                                 e=e))
 
         if os.path.isdir(os.path.dirname(name)):
             # the user provided a file to save as pickle
@@ -553,6 +624,26 @@ class GenieRobot(object):
             self.testscript.parameters[name] = profiled
             log.info('Saved system profile as variable %s' % name)
 
+        if failed:
+            self.builtin.fail('Could not profile the system for:\n{f}'
+                              .format(f='\n'.join(failed)))
+
+    def _profile_exclude(self, fet):
+        '''Keys ignored when comparing the profiles of a feature'''
+        exclude_list = ['device', 'maker', 'diff_ignore', 'callables',
+                        '(Current configuration.*)']
+
+        pts_datafile = getattr(self, 'pts_datafile', None) or {}
+        if 'exclude' in pts_datafile:
+            exclude_list.extend(pts_datafile['exclude'])
+
+        # Get the information too from the pts_data
+        try:
+            exclude_list.extend(pts_datafile[fet]['exclude'])
+        except KeyError:
+            pass
+        return exclude_list
+
     def _profile_config(self, device):
         device_handle = self._search_device(device)
         config = Config(device_handle.execute('show running-config'))
@@ -574,32 +665,21 @@ class GenieRobot(object):
         else:
             compare2 = self.testscript.parameters[pts_compare]
 
-        exclude_list = ['device', 'maker', 'diff_ignore', 'callables',
-                        '(Current configuration.*)']
-
-        if 'exclude' in self.pts_datafile:
-            exclude_list.extend(self.pts_datafile['exclude'])
-
         msg = []
         for fet in compare1:
             failed = []
-            feature_exclude_list = exclude_list
-
-            # Get the information too from the pts_data
-            try:
-                feature_exclude_list.extend(self.pts_datafile[fet]['exclude'])
-            except KeyError:
-                pass
+            feature_exclude_list = self._profile_exclude(fet)
 
             for dev in compare1[fet]:
                 # Only compare for the specified devices
                 if dev not in devices:
                     continue
 
-                diff = Diff(compare1[fet][dev], compare2[fet][dev],
-                    exclude=feature_exclude_list)
-
-                diff.findDiff()
+                # Only the branches which changed are diffed; Both profiles
+                # were hashed when learnt
+                diff = snapshot_diff(compare1[fet][dev], compare2[fet][dev],
+                                     exclude=feature_exclude_list,
+                                     cache2=True)
 
                 if len(diff.diffs):
                     failed.append((dev, diff))
@@ -628,12 +708,66 @@ class GenieRobot(object):
         self.builtin.pass_execution(message)
 
     def _run_genie_trigger_verification(self, alias, device, context,
-                                            name):
+                                            name, section, datafile, prepare):
         try:
             device_handle = self._search_device(device)
         except Exception as e:
             raise Exception("Could not find '{d}'".format(d=device))
 
+        # Discovering the testcases of the whole datafile is expensive, it is
+        # only done the first time a trigger/verification is requested on a
+        # device; The next runs discover it from a datafile holding only it.
+        # The index is reset when the testbed and datafiles are loaded again
+        key = (section, name, device_handle.name, context)
+        narrowed = self._testcases.get(key)
+
+        # The testscript datafiles are used by the testcase when it runs
+        prepare(datafile if narrowed is None else narrowed)
+
+        # Each run gets its own testcase, from the discovery
+        tc = self._discover_testcase(name=name, device=device_handle)
+        if narrowed is None:
+            self._testcases[key] = self._narrow_datafile(datafile, name,
+                                                         device_handle)
+
+        # Set the tags
+        tags = tc.groups if hasattr(tc, 'groups') else []
+
+        # Found our testcase - Now Execute it
+        try:
+            # Make sure its reset, as we dont need some of these functionalities
+            executer.reset()
+            reporter.reset()
+            result = tc()
+        except Exception as e:
+            # No need, as pyats has already logged the error
+            pass
+
+        # Maps the result RobotFramework
+        self._convert_result(result, name, ' '.join(tags))
+
+    @staticmethod
+    def _narrow_datafile(datafile, name, device):
+        '''Return the datafile with only the trigger/verification name, on
+        device only; The other sections of the datafile are kept'''
+        narrowed = {}
+        for key, value in datafile.items():
+            if key != name and isinstance(value, dict) and 'source' in value:
+                # Another trigger/verification
+                continue
+            narrowed[key] = value
+
+        entry = narrowed.get(name)
+        if isinstance(entry, dict) and \
+           isinstance(entry.get('devices'), (list, tuple)):
+            devices = [dev for dev in entry['devices']
+                       if dev in (device.name, device.alias)]
+            if devices:
+                narrowed[name] = dict(entry, devices=devices)
+        return narrowed
+
+    def _discover_testcase(self, name, device):
+        '''Discover the testcase named name for device'''
         genie_discovery = GenieScriptDiscover(self.testscript)
 
         # To call the __iter__ of the discovery which will force
@@ -650,7 +784,7 @@ class GenieRobot(object):
             # Make sure the device match the right device and
             # Make sure it match the name, as
             # Or logic could match more than expected
-            if tc.parameters['uut'] != device_handle or\
+            if tc.parameters['uut'] != device or\
                not re.match(name+'\.', tc.uid):
                 continue
             tc_to_run.append(tc)
@@ -662,27 +796,9 @@ class GenieRobot(object):
         if len(tc_to_run) != 1:
             raise Exception("Requested to run '{r}' but more than one was "
                             "found '{v}'".format(r=name,
-                                                 v=', '.join(tc_to_run)))
-
-        # Get the testcase class
-        cls = tc_to_run[0]
-        # Add to Cls the context if any
-
-        # Set the tags
-        tags = cls.groups if hasattr(cls, 'groups') else []
-
-        # Found our testcase - Now Execute it
-        try:
-            # Make sure its reset, as we dont need some of these functionalities
-            executer.reset()
-            reporter.reset()
-            result = cls()
-        except Exception as e:
-            # No need, as pyats has already logged the error
-            pass
-
-        # Maps the result RobotFramework
-        self._convert_result(result, name, ' '.join(tags))
+                                                 v=', '.join(tc.uid for tc in
+                                                             tc_to_run)))
+        return tc_to_run[0]
 
     def _add_abstraction_datafiles(self, datafile, name, device, context):
         '''Add context abstraction'''
@@ -761,6 +877,9 @@ class GenieRobot(object):
                                  "command first.") from e
 
     def _load_genie_datafile(self):
+        # Testcases discovered with the previous datafiles
+        self._testcases = {}
+
         # Load the datafiles
         variables = self.builtin.get_variables()
         datafiles = []
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import Mock, patch
+
+from ats.results import Passed
+
+from genie.libs.robot import GenieRobot as genie_robot
+from genie.libs.robot.GenieRobot import GenieRobot
+
+
+class Section(object):
+    '''Common setup/cleanup'''
+
+    def __init__(self, uid):
+        self.uid = uid
+        self.parameters = {}
+
+
+class Trigger(object):
+    '''Testcase found by the discovery, recording what it was run with'''
+
+    def __init__(self, uid, device, datafile):
+        self.uid = uid
+        self.parameters = {'uut': device}
+        self.datafile = datafile
+        self.groups = ['group1']
+
+    def __call__(self):
+        # State left over by a previous run
+        self.leftover = getattr(self, 'state', None)
+        self.state = 'ran'
+        self.parameters['learnt'] = 'bgp'
+        self.datafile['devices'].append('run')
+        return Passed
+
+
+class test_run_trigger(unittest.TestCase):
+
+    def setUp(self):
+        self.robot = GenieRobot()
+        self.robot._convert_result = Mock()
+
+        self.device = Mock()
+        self.device.name = 'PE1'
+        self.device.alias = 'uut'
+        self.robot.testbed = Mock()
+        self.robot.testbed.devices = {'PE1': self.device}
+        self.robot.trigger_datafile = {
+            'global_processors': {'pre': {}},
+            'TriggerClearBgp': {
+                'source': {'class': 'genie.libs.sdk.triggers.TriggerClearBgp'},
+                'devices': ['uut', 'PE2'],
+            },
+            'TriggerShutNoShutBgp': {
+                'source': {'class':
+                           'genie.libs.sdk.triggers.TriggerShutNoShutBgp'},
+                'devices': ['uut'],
+            },
+        }
+
+        self.discovered = []
+        self.datafiles = []
+        patcher = patch.object(genie_robot, 'GenieScriptDiscover',
+                               side_effect=self.discover)
+        self.discover_ = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def discover(self, testscript):
+        # A new testcase per trigger and device of the datafile
+        datafile = testscript.triggers
+        self.datafiles.append(datafile)
+        sections = [Section('common_setup')]
+        for name, trigger in datafile.items():
+            if 'source' not in trigger:
+                continue
+            for dev in trigger['devices']:
+                device = self.device if dev == 'uut' else dev
+                sections.append(Trigger('{}.{}'.format(name, dev), device,
+                                        trigger))
+        sections.append(Section('common_cleanup'))
+        self.discovered.append(sections[1:-1])
+        return sections
+
+    def test_run_twice(self):
+        for i in range(2):
+            self.robot.genie_run_trigger(name='TriggerClearBgp',
+                                         device='PE1')
+
+        # Each run gets a new testcase from the discovery, nothing carried
+        # over from the previous run
+        first, second = [[tc for tc in testcases
+                          if tc.uid == 'TriggerClearBgp.uut']
+                         for testcases in self.discovered]
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(first[0].state, 'ran')
+        self.assertIsNone(second[0].leftover)
+        self.assertEqual(second[0].parameters,
+                         {'uut': self.device, 'learnt': 'bgp'})
+        self.assertEqual(self.robot._convert_result.call_count, 2)
+
+        # The second discovery only holds that trigger, on that device
+        self.assertEqual(sorted(self.datafiles[0]),
+                         ['TriggerClearBgp', 'TriggerShutNoShutBgp',
+                          'global_processors'])
+        self.assertEqual(sorted(self.datafiles[1]),
+                         ['TriggerClearBgp', 'global_processors'])
+        self.assertEqual(self.datafiles[1]['TriggerClearBgp']['devices'],
+                         ['uut', 'run'])
+        self.assertEqual(self.datafiles[1]['TriggerClearBgp']['abstraction'],
+                         {'context': 'cli', 'order': ['context']})
+
+        # The loaded datafile is left untouched
+        self.assertEqual(
+            self.robot.trigger_datafile['TriggerClearBgp']['devices'],
+            ['uut', 'PE2'])
+        self.assertNotIn('abstraction',
+                         self.robot.trigger_datafile['TriggerClearBgp'])
+
+    def test_context(self):
+        self.robot.genie_run_trigger(name='TriggerClearBgp', device='PE1')
+        self.robot.genie_run_trigger_context(name='TriggerClearBgp',
+                                             device='PE1', context='yang')
+        # Discovered per context
+        self.assertEqual(len(self.datafiles[1]), 3)
+        self.assertEqual(
+            self.datafiles[1]['TriggerClearBgp']['abstraction']['context'],
+            'yang')
+        self.robot.genie_run_trigger_context(name='TriggerClearBgp',
+                                             device='PE1', context='yang')
+        self.assertEqual(len(self.datafiles[2]), 2)
+
+    def test_not_found(self):
+        with self.assertRaises(Exception):
+            self.robot.genie_run_trigger(name='TriggerUnknown', device='PE1')
+        self.assertEqual(self.robot._testcases, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
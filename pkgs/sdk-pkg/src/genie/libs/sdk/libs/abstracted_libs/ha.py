@@ -7,6 +7,7 @@ import logging
 # genie
 from genie.utils.timeout import TempResult
 from genie.harness.utils import connect_device, disconnect_device
+from genie.libs.sdk.libs.utils.cache import invalidate_output_cache
 
 # unicon
 from unicon.core.errors import SubCommandFailure
@@ -61,6 +62,7 @@ class HA(object):
                               interval=15))
         """
         with steps.start('Switchover', continue_=True) as step:
+            invalidate_output_cache(self.device)
             try:
                 self._switchover()
             except SubCommandFailure:
@@ -116,6 +118,7 @@ class HA(object):
             # TODO - update more with issues when seeing
             # update the error pattern
             self.device.settings.ERROR_PATTERN.append("Write failed: Broken pipe")
+            invalidate_output_cache(self.device)
             try:
                 self.device.reload(dialog=dialog)
             except SubCommandFailure:
@@ -165,6 +168,7 @@ class HA(object):
         """
 
         with steps.start('Reload LC {}'.format(lc), continue_=True) as step:
+            invalidate_output_cache(self.device)
             try:
                 self._reloadLc(lc=lc)
             except SubCommandFailure:
@@ -274,6 +278,7 @@ class HA(object):
         """
         with steps.start('Disconnecting device {}'.format(self.device.name),
                          continue_=True) as step:
+            invalidate_output_cache(self.device)
             disconnect_device(self.device)
             time.sleep(sleep_disconnect)
 
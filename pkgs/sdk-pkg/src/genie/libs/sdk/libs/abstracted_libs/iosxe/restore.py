@@ -13,6 +13,9 @@ from ats.utils.fileutils import FileUtils
 # Metaparser
 from genie.metaparser.util.exceptions import SchemaEmptyParserError
 
+# Configuration delta
+from genie.libs.sdk.libs.utils.configdiff import restore_config_delta
+
 log = logging.getLogger(__name__)
 
 
@@ -29,7 +32,7 @@ class Restore(object):
             # Check if checkpoint is successfully created
             self.check_checkpoint_status(device=device, name=self.ckname,
                                          abstract=abstract)
-        elif method == 'local':
+        elif method in ['local', 'delta']:
             self.run_config = device.execute('show running-config')
 
         elif method == 'config_replace':
@@ -85,6 +88,10 @@ class Restore(object):
         elif method == 'local':
             # reover the deivce with whole running-config
             device.configure(self.run_config)
+        elif method == 'delta':
+            # only configure the lines which differ from the saved
+            # running-config
+            restore_config_delta(device, self.run_config)
         elif method == 'config_replace':
             # delete the archive file
             dialog = Dialog([
@@ -12,6 +12,9 @@ from ats.utils.fileutils import FileUtils
 # Metaparser
 from genie.metaparser.util.exceptions import SchemaEmptyParserError
 
+# Configuration delta
+from genie.libs.sdk.libs.utils.configdiff import restore_config_delta
+
 log = logging.getLogger(__name__)
 
 
@@ -27,7 +30,7 @@ class Restore(object):
             device.execute('show running-config | file '\
                            'disk0:{name}'.format(name=self.ckname))
 
-        elif method == 'local':
+        elif method in ['local', 'delta']:
             self.run_config = device.execute('show running-config')
 
         elif method == 'config_replace':
@@ -92,6 +95,10 @@ class Restore(object):
         # Keeping them for later enhancement
         elif method == 'local':
             pass
+        elif method == 'delta':
+            # only configure the lines which differ from the saved
+            # running-config
+            restore_config_delta(device, self.run_config)
         elif method == 'config_replace':
             for i in range(1,iteration):
                 # Execute commit replace
@@ -5,6 +5,8 @@ import time
 import yaml
 import copy
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Ats
 from ats.log.utils import banner
@@ -280,6 +282,234 @@ def load_config_precessor(section, configs, unconfig=False, sleep=None):
         # can change it from trigger yaml
         time.sleep(sleep) if sleep else None
 
+# Ping output success rate, per os
+_re_success_rate = re.compile(r'Success +rate +is +(\d+) +percent')
+_re_packet_loss = re.compile(r'([\d.]+)% +packet +loss')
+
+
+def _ping_success_rate(output):
+    '''Return the success rate percentage of a ping output, or None'''
+    m = _re_success_rate.search(output)
+    if m:
+        return int(m.group(1))
+    m = _re_packet_loss.search(output)
+    if m:
+        return int(round(100 - float(m.group(1))))
+    return None
+
+
+class PingSweep(object):
+    '''Ping the peer addresses of many src/dest device pairs at once
+
+    The routing of each device is learnt once for the whole sweep, and only
+    learnt again when it failed or when no peer route was found for a pair.
+    The devices are learnt concurrently, one worker per device learning its
+    address families one after another. The pings of each round are issued
+    concurrently, one worker per source device; The pings of the same device
+    are sent one after another on its connection.
+
+    Args:
+        testbed (`obj`): Testbed object
+        ping_parameters (`list`): list of ping needed parameters, as for
+                                  ping_devices
+        expect_result (`str`): 'passed' or 'failed'
+
+    Attributes:
+        results (`OrderedDict`): (src, dest, af) -> list of ping results of
+                                 the last round, dictionaries with the keys
+                                 addr, vrf, success_rate, error and passed
+    '''
+
+    # routing path for getting desired routes
+    PATHS = [['info', 'vrf', '(?P<vrf>.*)', 'address_family',
+              '{af}', 'routes', '(?P<route>.*)',
+              'source_protocol', 'connected'],
+             ['info', 'vrf', '(?P<vrf>.*)', 'address_family',
+              '{af}', 'routes', '(?P<route>.*)', 'next_hop',
+              'outgoing_interface', '(?P<intf>.*)',
+              'outgoing_interface', '(?P<intf>.*)']]
+
+    def __init__(self, testbed, ping_parameters, expect_result='passed'):
+        self.testbed = testbed
+        self.items = ping_parameters
+        self.expect_result = expect_result
+        # af -> device name -> routing ops
+        self.routing_opses = {}
+        # af -> peer groups, as learn_routing returns them
+        self.peers = {}
+        # (device name, af) already learnt
+        self.learnt = set()
+        self.results = OrderedDict()
+
+    @staticmethod
+    def address_family(item):
+        return 'ipv4' if item['ping']['proto'] == 'ip' else 'ipv6'
+
+    def key(self, item):
+        '''Return the results key of an item'''
+        return (item['src'], item['dest'], self.address_family(item))
+
+    def _devices(self, item):
+        return [self.testbed.devices[item['src']],
+                self.testbed.devices[item['dest']]]
+
+    def learn(self, items):
+        '''Learn the routing of the devices of items not learnt yet'''
+        # device name -> (device, [af])
+        todo = OrderedDict()
+        for item in items:
+            af = self.address_family(item)
+            for dev in self._devices(item):
+                if (dev.name, af) not in self.learnt:
+                    afs = todo.setdefault(dev.name, (dev, []))[1]
+                    if af not in afs:
+                        afs.append(af)
+                    # created here, not by the workers
+                    self.routing_opses.setdefault(af, {})
+                    self.peers.setdefault(af, {})
+
+        def learn_routing(dev, afs):
+            # one command at a time on the device connection
+            lookup = Lookup.from_device(dev)
+            for af in afs:
+                paths = [[elem.format(af=af) for elem in path]
+                         for path in self.PATHS]
+                try:
+                    lookup.sdk.libs.abstracted_libs.processors.learn_routing(
+                        dev, af, paths,
+                        ops_container=self.routing_opses[af],
+                        ret_container=self.peers[af])
+                except Exception as e:
+                    log.warning('Cannot learn routing information on {d}\n{e}'
+                                .format(d=dev.name, e=e))
+                    continue
+                self.learnt.add((dev.name, af))
+
+        if not todo:
+            return
+        with ThreadPoolExecutor(max_workers=len(todo)) as executor:
+            for dev, afs in todo.values():
+                executor.submit(learn_routing, dev, afs)
+
+        # trim the ones not a peer
+        for peers in self.peers.values():
+            for group in [group for group in peers
+                          if len(peers[group]) != 2]:
+                peers.pop(group)
+
+    def targets(self, item):
+        '''Return the (vrf, ping arguments) to reach the peers of dest from
+        src'''
+        src, dest = item['src'], item['dest']
+        peers = self.peers.get(self.address_family(item), {})
+        targets = []
+        for group in peers.values():
+            if len(targets) >= item['peer_num']:
+                break
+            src_route = dest_route = None
+            for route, devices in group.items():
+                if src in devices:
+                    src_route = (route, devices[src])
+                elif dest in devices:
+                    dest_route = route
+            if not src_route or not dest_route:
+                continue
+            ping = dict(item['ping'], addr=dest_route.split('/')[0])
+            vrf = src_route[1]['vrf']
+            if vrf != 'default':
+                ping['command'] = 'ping vrf {}'.format(vrf)
+            targets.append((vrf, ping))
+        return targets
+
+    def _ping(self, device, pings):
+        results = []
+        for item, vrf, ping in pings:
+            log.info('Ping with args {a} on {d}'.format(a=ping, d=device.name))
+            result = {'addr': ping['addr'],
+                      'vrf': vrf,
+                      'success_rate': None,
+                      'error': None}
+            try:
+                out = device.ping(**ping)
+            except SubCommandFailure as e:
+                result['error'] = str(e)
+                result['passed'] = 'pass' not in self.expect_result
+            else:
+                result['success_rate'] = _ping_success_rate(out)
+                result['passed'] = \
+                    result['success_rate'] == int(item['exp_succ_perc'])
+            results.append((item, result))
+        return results
+
+    def ping(self, items):
+        '''Ping the targets of items, concurrently across source devices
+
+        Returns:
+            `list` of the items whose pings did not all pass
+        '''
+        # source device -> [(item, vrf, ping arguments)]
+        jobs = OrderedDict()
+        failed = []
+        for item in items:
+            targets = self.targets(item)
+            self.results[self.key(item)] = []
+            if not targets:
+                log.warning('No peer routes learned between {s} and {d}, '
+                            'try again'.format(s=item['src'], d=item['dest']))
+                # the routing changed, do not reuse it
+                af = self.address_family(item)
+                self.learnt.discard((item['src'], af))
+                self.learnt.discard((item['dest'], af))
+                failed.append(item)
+                continue
+            for vrf, ping in targets:
+                jobs.setdefault(item['src'], []).append((item, vrf, ping))
+
+        if jobs:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = [executor.submit(self._ping,
+                                           self.testbed.devices[name], pings)
+                           for name, pings in jobs.items()]
+            for future in futures:
+                for item, result in future.result():
+                    self.results[self.key(item)].append(result)
+                    if not result['passed'] and \
+                       not any(item is f for f in failed):
+                        failed.append(item)
+        return failed
+
+    def run(self):
+        '''Ping until every pair passes or its timeout expires
+
+        Returns:
+            `bool`: True if all the pairs passed
+        '''
+        timeouts = [Timeout(max_time=item['timeout_max_time'],
+                            interval=item['timeout_interval'])
+                    for item in self.items]
+        pending = list(range(len(self.items)))
+        while pending:
+            items = [self.items[i] for i in pending]
+            self.learn(items)
+            failed = self.ping(items)
+            pending = [i for i in pending
+                       if any(self.items[i] is f for f in failed) and
+                       timeouts[i].iterate()]
+            if pending:
+                timeouts[pending[0]].sleep()
+
+        for (src, dest, af), results in self.results.items():
+            for result in results:
+                log.info('{s} -> {d} {af} {a} (vrf {v}): {r}'.format(
+                    s=src, d=dest, af=af, a=result['addr'], v=result['vrf'],
+                    r='{}%'.format(result['success_rate'])
+                      if result['error'] is None else result['error']))
+        return all(result['passed']
+                   for results in self.results.values()
+                   for result in results) and \
+            all(self.results.values())
+
+
 def ping_devices(section, ping_parameters, expect_result='passed'):
     '''PING prepostprocessor. Will ping two ends ip addresses 
     from given devices ( learned by alias )
@@ -287,6 +517,9 @@ def ping_devices(section, ping_parameters, expect_result='passed'):
     Can be controlled via sections parameters which is provided by the
     triggers/verification datafile
 
+    The pairs are pinged at the same time with a PingSweep, the result
+    matrix is stored in the section parameters as 'ping_results'.
+
     Args:
       Mandatory:
         section (`obj`): Aetest Subsection object.
@@ -309,127 +542,12 @@ def ping_devices(section, ping_parameters, expect_result='passed'):
     # get testbed object
     testbed = section.parameters.get('testbed', {})
 
-    # store the learned routing ops
-    routing_opses = {}
-    peers = {}
-
-    # ping roll up result
-    ping_pass = True
-    relearn = False
-
-    for item in ping_parameters:
-        src = testbed.devices[item['src']]
-        dest = testbed.devices[item['dest']]
-        log.info(banner(
-            "Get sorce device {s} and destnation device {d}"
-                .format(s=src.name, d=dest.name)))
-        lookup = Lookup.from_device(src)
-
-        # create timeout for looping the ping
-        timeout = Timeout(max_time=item['timeout_max_time'],
-            interval=item['timeout_interval'])
-
-        # determine af
-        af = 'ipv4' if item['ping']['proto'] == 'ip' else 'ipv6'
-
-        # routing path for getting desired routes
-        paths = [['info', 'vrf', '(?P<vrf>.*)', 'address_family',
-                  af, 'routes', '(?P<route>.*)',
-                  'source_protocol', 'connected'],
-                 ['info', 'vrf', '(?P<vrf>.*)', 'address_family',
-                  af, 'routes', '(?P<route>.*)', 'next_hop',
-                  'outgoing_interface', '(?P<intf>.*)',
-                  'outgoing_interface', '(?P<intf>.*)']]
-
-        while timeout.iterate():
-            for dev in [src, dest]:
-                if dev.name  not in routing_opses or relearn:
-
-                    # learn the routing ops
-                    try:
-                        ret = lookup.sdk.libs.abstracted_libs.processors.learn_routing(
-                                    dev, af, paths, ops_container=routing_opses, ret_container=peers)
-                    except Exception as e:
-                        log.warning('Cannot learn routing information on {d}\n{e}'
-                            .format(d=dev.name, e=e)) 
-                        relearn = True
-                        ping_pass = False
-                        timeout.sleep()
-                        continue
+    sweep = PingSweep(testbed, ping_parameters, expect_result=expect_result)
+    ping_pass = sweep.run()
+    section.parameters['ping_results'] = sweep.results
 
-
-            # trim the ones not a peer
-            trim_item = []
-            for group in peers:
-                if len(peers[group].keys()) != 2:
-                    trim_item.append(group)
-            for group in trim_item:
-                peers.pop(group)
-
-            if not peers:
-                log.warning('No peer routes learned, Try again')
-                relearn = True
-                ping_pass = False
-                timeout.sleep()
-                continue
-            else:
-                # has the routes, no need relearn it again
-                relearn = False
-
-            log.info('Get the routing group information as {}'.format(peers))
-
-            ping_values = []
-
-            # select ip and vrf to ping
-            for key in list(peers.keys())[:item['peer_num']]:
-                routes = list(peers[key].keys())
-                for route in peers[key]:
-                    if src.name in peers[key][route]:
-                        # ping during peer devices
-                        routes.remove(route)
-                        peer_route = routes[0]
-                        if peers[key][route][src.name]['vrf'] == 'default':
-                            ping_values.append({'addr': peer_route.split('/')[0]})
-                        else:
-                            ping_values.append({'addr': peer_route.split('/')[0],
-                                           'command': 'ping vrf {}'.format(peers[key][route][src.name]['vrf'])})
-                        break
-
-            for ping_item in ping_values:
-                item['ping'].update(ping_item)
-                log.info(banner('Ping with args {a} on {d}'.format(a=item['ping'], d=src.name)))
-                try:
-                    out = src.ping(**item['ping'])
-                except SubCommandFailure as e:
-                    if 'pass' in expect_result:
-                        log.warning('ping failed\n{}, try again.'.format(e))
-                        ping_pass = False
-                        break
-                    else:
-                        log.info('ping failed as expected')
-                        ping_pass = True
-                        break
-
-                ret = re.search('Success +rate +is +(\d+) +percent', out)
-                perc = ret.groups()[0]
-                if perc == str(item['exp_succ_perc']):
-                    log.info('ping successed with {}% percent'.format(item['exp_succ_perc']))
-                    ping_pass = True
-                    break
-                else:
-                    log.warning('ping failed. Expected percent: {e} But got: {r}'
-                        .format(e=item['exp_succ_perc'], r=perc))
-                    ping_pass = False
-                    break
-
-            if ping_pass:
-                break
-            else:
-                timeout.sleep()
-                continue
-
-        if not ping_pass:
-            section.passx('PING PRE POST PROCESSOR FAILED, SKIPPED THE TRIGGER')
+    if not ping_pass:
+        section.passx('PING PRE POST PROCESSOR FAILED, SKIPPED THE TRIGGER')
 
 def debug_dumper(section, commands):
     '''debug_dumper prepostprocessor. Execute user specified show commands
@@ -1,6 +1,6 @@
 # python
 import logging
-from copy import deepcopy
+from collections import OrderedDict
 from operator import attrgetter
 from json import dumps
 
@@ -37,6 +37,7 @@ from genie.ops.base import Base as OpsBase
 from genie.libs import ops
 from genie.libs import conf
 from genie.libs.sdk.libs.abstracted_libs.processors import load_config_precessor
+from genie.libs.conf.utils.running_config import learn_config
 from genie.libs.sdk.libs.utils.normalize import _to_dict
 from genie.libs.sdk.libs.utils.normalize import merge_dict
 
@@ -174,20 +175,13 @@ def learn_the_system_from_conf_ops(self, testbed, steps, features=None):
            pyATS Results
     """
     def remove_parent_from_conf_dict(conf_dict):
-        temp_dict = deepcopy(conf_dict)
-        for key, val in temp_dict.items():
-            if key == 'parent':
-                conf_dict.pop('parent')
+        # In place, the parent objects are the only ones to copy otherwise
+        conf_dict.pop('parent', None)
+        for val in conf_dict.values():
             if isinstance(val, dict):
-                remove_parent_from_conf_dict(conf_dict[key])
+                remove_parent_from_conf_dict(val)
 
-    def store_structure(device, feature):
-
-       # get feature and attributes
-        [(ft, attr)] = feature.items()
-        log.info(banner("Learning '{n}' feature with "
-                        "attribues {a} on device {d}"
-                        .format(n=ft, a=attr, d=device)))
+    def store_structure(device, features):
 
         # perform lookup per device
         lib = Lookup.from_device(device)
@@ -196,33 +190,49 @@ def learn_the_system_from_conf_ops(self, testbed, steps, features=None):
         lib.conf = getattr(lib, 'conf', conf)
         lib.ops = getattr(lib, 'ops', ops)
 
-        # create the ops/conf instance
-        try:
-            obj = attrgetter(ft)(lib)
-        except Exception:
-            raise AttributeError('Cannot load %s for '
-                               'device %s.' % (ft, device.name))
-        # conf learn_config
-        if issubclass(obj, ConfBase):
-            ret = obj.learn_config(device=device, attributes=attr)
-            ret = _to_dict(ret[0])
+        ret_dict = {}
+        # Conf features are learnt together from one show running-config
+        conf_features = OrderedDict()
+        for ft, attr in features.items():
+            log.info(banner("Learning '{n}' feature with "
+                            "attribues {a} on device {d}"
+                            .format(n=ft, a=attr, d=device)))
+
+            # create the ops/conf instance
+            try:
+                obj = attrgetter(ft)(lib)
+            except Exception:
+                raise AttributeError('Cannot load %s for '
+                                   'device %s.' % (ft, device.name))
+            # conf learn_config
+            if issubclass(obj, ConfBase):
+                conf_features[ft] = obj
+                continue
+
+            elif issubclass(obj, OpsBase):
+                ret = obj(device, attributes=attr)
+                ret.learn()
+                temp = AttrDict()
+                temp.info = getattr(ret, 'info', {})
+                ret = temp
+
+            ret_dict.setdefault('lts', {}).\
+                setdefault(ft, {}).setdefault(device.name, ret)
+
+        if conf_features:
+            learnt = learn_config(device, OrderedDict(
+                (obj, {'attributes': features[ft]})
+                for ft, obj in conf_features.items()))
+        for ft, obj in conf_features.items():
+            ret = _to_dict(learnt[obj][0])
             # delete the non-used objects for pcall to retrun
             ret.pop('__testbed__')
             ret.pop('devices')
             ret.pop('interfaces')
             remove_parent_from_conf_dict(ret['device_attr'][device.name])
 
-        elif issubclass(obj, OpsBase):
-            ret = obj(device, attributes=attr)
-            ret.learn()
-            temp = AttrDict()
-            temp.info = getattr(ret, 'info', {})
-            ret = temp
-
-        ret_dict = {}
-
-        ret_dict.setdefault('lts', {}).\
-            setdefault(ft, {}).setdefault(device.name, ret)
+            ret_dict.setdefault('lts', {}).\
+                setdefault(ft, {}).setdefault(device.name, ret)
 
         # return the dictionary
         return ret_dict
@@ -237,15 +247,10 @@ def learn_the_system_from_conf_ops(self, testbed, steps, features=None):
 
     # create the abstract object list
     merged_dict = {}
-    for ft in features:
-        worker_devs = []
-        worker_features = []
-        for device in devices:
-            worker_devs.append(device)
-            worker_features.append({ft: features[ft]})
-        # pcall for each feature
-        ret = pcall(store_structure, device=worker_devs, feature=worker_features)
-        [merge_dict(merged_dict, i) for i in ret]
+    # one worker per device, learning all the features
+    ret = pcall(store_structure, device=devices,
+                features=[features] * len(devices))
+    [merge_dict(merged_dict, i) for i in ret]
 
 
     self.parent.parameters.update(merged_dict)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from unicon.core.errors import SubCommandFailure
+
+from genie.libs.sdk.libs.abstracted_libs import processors
+from genie.libs.sdk.libs.abstracted_libs.processors import PingSweep,\
+                                                           _ping_success_rate
+
+# network -> address -> device name
+ROUTES = {
+    'ipv4': {'10.0.0.0/24': {'10.0.0.1': 'R1', '10.0.0.2': 'R2'}},
+    'ipv6': {'2001:db8::/64': {'2001:db8::1': 'R1', '2001:db8::2': 'R2'}},
+}
+
+
+class Device(object):
+
+    def __init__(self, name, outputs):
+        self.name = name
+        self.ping = Mock(side_effect=lambda **kwargs:
+                         outputs[kwargs['addr']])
+        # Commands in progress on the device connection
+        self.busy = 0
+        self.overlapped = False
+
+
+class test_ping_success_rate(unittest.TestCase):
+
+    def test_success_rate(self):
+        self.assertEqual(_ping_success_rate(
+            'Success rate is 80 percent (4/5), '
+            'round-trip min/avg/max = 1/1/2 ms'), 80)
+
+    def test_packet_loss(self):
+        self.assertEqual(_ping_success_rate(
+            '5 packets transmitted, 5 packets received, 0.00% packet loss'),
+            100)
+        self.assertEqual(_ping_success_rate(
+            '5 packets transmitted, 3 packets received, 40% packet loss'),
+            60)
+
+    def test_unknown(self):
+        self.assertIsNone(_ping_success_rate('% Unrecognized host'))
+
+
+class test_ping_sweep(unittest.TestCase):
+
+    def setUp(self):
+        outputs = {
+            '10.0.0.1': 'Success rate is 100 percent (5/5)',
+            '10.0.0.2': 'Success rate is 100 percent (5/5)',
+            '2001:db8::1': 'Success rate is 0 percent (0/5)',
+            '2001:db8::2': 'Success rate is 0 percent (0/5)',
+        }
+        self.testbed = Mock()
+        self.testbed.devices = {name: Device(name, outputs)
+                                for name in ('R1', 'R2')}
+        self.learn_routing = Mock(side_effect=self._learn_routing)
+        lookup = Mock()
+        lookup.sdk.libs.abstracted_libs.processors.learn_routing = \
+            self.learn_routing
+        patcher = patch.object(processors.Lookup, 'from_device',
+                               return_value=lookup)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _learn_routing(self, device, address_family, paths,
+                       ops_container, ret_container):
+        if device.busy:
+            device.overlapped = True
+        device.busy += 1
+        try:
+            time.sleep(0.02)
+            ops_container[device.name] = Mock()
+            for network, addresses in ROUTES[address_family].items():
+                for address, name in addresses.items():
+                    if name == device.name:
+                        ret_container.setdefault(network, {})\
+                            .setdefault(address, {})\
+                            .update({name: {'route': network,
+                                            'intf': 'Gi0/0/0/0',
+                                            'vrf': 'default'}})
+        finally:
+            device.busy -= 1
+
+    def item(self, src, dest, proto='ip', exp_succ_perc=100):
+        return {'src': src,
+                'dest': dest,
+                'peer_num': 1,
+                'exp_succ_perc': exp_succ_perc,
+                'timeout_max_time': 0,
+                'timeout_interval': 0,
+                'ping': {'proto': proto}}
+
+    def test_learn_per_device(self):
+        sweep = PingSweep(self.testbed, [])
+        sweep.learn([self.item('R1', 'R2', 'ip'),
+                     self.item('R1', 'R2', 'ipv6')])
+
+        self.assertEqual(self.learn_routing.call_count, 4)
+        self.assertEqual(sweep.learnt, {('R1', 'ipv4'), ('R1', 'ipv6'),
+                                        ('R2', 'ipv4'), ('R2', 'ipv6')})
+        # The address families of a device are learnt one after another
+        for device in self.testbed.devices.values():
+            self.assertFalse(device.overlapped)
+        self.assertEqual(set(sweep.routing_opses['ipv6']), {'R1', 'R2'})
+
+        # Learnt once
+        sweep.learn([self.item('R2', 'R1', 'ip')])
+        self.assertEqual(self.learn_routing.call_count, 4)
+
+    def test_learn_failure(self):
+        self.learn_routing.side_effect = Exception('No routes')
+        sweep = PingSweep(self.testbed, [])
+        sweep.learn([self.item('R1', 'R2')])
+        self.assertEqual(sweep.learnt, set())
+        self.assertEqual(sweep.peers, {'ipv4': {}})
+
+    def test_results_per_af(self):
+        sweep = PingSweep(self.testbed,
+                          [self.item('R1', 'R2', 'ip'),
+                           self.item('R1', 'R2', 'ipv6', exp_succ_perc=0)])
+        self.assertTrue(sweep.run())
+
+        self.assertEqual(list(sweep.results),
+                         [('R1', 'R2', 'ipv4'), ('R1', 'R2', 'ipv6')])
+        ipv4, = sweep.results[('R1', 'R2', 'ipv4')]
+        self.assertEqual((ipv4['addr'], ipv4['success_rate']),
+                         ('10.0.0.2', 100))
+        ipv6, = sweep.results[('R1', 'R2', 'ipv6')]
+        self.assertEqual((ipv6['addr'], ipv6['success_rate']),
+                         ('2001:db8::2', 0))
+        self.testbed.devices['R2'].ping.assert_not_called()
+
+    def test_failed(self):
+        sweep = PingSweep(self.testbed, [self.item('R1', 'R2', 'ipv6')])
+        self.assertFalse(sweep.run())
+        result, = sweep.results[('R1', 'R2', 'ipv6')]
+        self.assertFalse(result['passed'])
+
+    def test_ping_error(self):
+        self.testbed.devices['R1'].ping.side_effect = \
+            SubCommandFailure('Timeout')
+        sweep = PingSweep(self.testbed, [self.item('R1', 'R2')],
+                          expect_result='failed')
+        self.assertTrue(sweep.run())
+        result, = sweep.results[('R1', 'R2', 'ipv4')]
+        self.assertIsNone(result['success_rate'])
+        self.assertTrue(result['passed'])
+
+    def test_no_peer_routes(self):
+        self.learn_routing.side_effect = None
+        sweep = PingSweep(self.testbed, [self.item('R1', 'R2')])
+        self.assertFalse(sweep.run())
+        self.assertEqual(sweep.results[('R1', 'R2', 'ipv4')], [])
+        # Learnt again on the next round
+        self.assertEqual(sweep.learnt, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
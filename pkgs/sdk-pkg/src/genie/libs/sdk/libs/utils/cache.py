@@ -0,0 +1,239 @@
+'''Per device cache of the show commands output
+
+Triggers, verifications, the PTS update and the Robot keywords send the same
+show commands to the same device within seconds of each other. Once enabled
+on a device, the output of the `show` commands is kept for `ttl` seconds and
+reused by every parser and Ops object executing the same command.
+
+Any other command executed on the device (clear, reload, copy, ...) and any
+configuration invalidates the cache of that device. Triggers also invalidate
+it explicitly when they reload or switchover the device. While polling the
+device for a state change, bypass_output_cache sends every command again.
+
+Example:
+
+    >>> enable_output_cache(device, ttl=30, max_size=500)
+    >>> ShowVersion(device).parse()   # Sent to the device
+    >>> ShowVersion(device).parse()   # From the cache
+    >>> device.configure('hostname R1')
+    >>> ShowVersion(device).parse()   # Sent to the device
+    >>> with bypass_output_cache(device):
+    ...     ShowVersion(device).parse()   # Sent to the device
+    >>> disable_output_cache(device)
+'''
+
+# Python
+import time
+import contextlib
+import logging
+import threading
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# device name -> OutputCache
+_caches = {}
+
+
+class OutputCache(object):
+    '''Cache of the show commands output of one device
+
+    Args:
+        device (`Device`): Device to cache the output of
+        ttl (`int`): Number of seconds an output is valid
+        max_size (`int`): Maximum number of outputs kept, the least recently
+                          used are evicted first
+    '''
+
+    # Methods of the device which are wrapped
+    WRAPPED = ('execute', 'configure')
+
+    def __init__(self, device, ttl=30, max_size=1000):
+        self.device = device
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # key -> (timestamp, output)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Number of bypass_output_cache in progress
+        self._bypass = 0
+        # Methods set directly on the device object, restored on disable
+        self._originals = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def cacheable(command):
+        '''Only show commands are cached'''
+        return isinstance(command, str) and \
+            command.strip().lower().startswith('show ')
+
+    @staticmethod
+    def key(command, **kwargs):
+        '''Key of an output; the command and the execute arguments'''
+        return (' '.join(command.split()),
+                tuple(sorted((k, str(v)) for k, v in kwargs.items()
+                             if k != 'timeout')))
+
+    def get(self, key):
+        '''Return the output of key, or None if missing or expired'''
+        with self._lock:
+            try:
+                if self._bypass:
+                    raise KeyError(key)
+                timestamp, output = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if time.time() - timestamp > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return output
+
+    def put(self, key, output):
+        with self._lock:
+            self._entries[key] = (time.time(), output)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        '''Remove every output of the device'''
+        with self._lock:
+            if self._entries:
+                log.debug("Invalidating {n} cached outputs of '{d}'".format(
+                    n=len(self._entries), d=self.device.name))
+            self._entries.clear()
+
+    @contextlib.contextmanager
+    def bypass(self):
+        '''Send every command to the device; The outputs are still kept for
+        after'''
+        with self._lock:
+            self._bypass += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._bypass -= 1
+
+    def _original(self, name):
+        if name in self._originals:
+            return self._originals[name]
+        # Resolved on the current connection every time, connections can be
+        # replaced (reconnect after a reload)
+        getattr_ = getattr(type(self.device), '__getattr__', None)
+        if getattr_ is None:
+            raise AttributeError("'{d}' has no attribute '{n}'".format(
+                d=self.device.name, n=name))
+        return getattr_(self.device, name)
+
+    def _execute(self, command, *args, **kwargs):
+        execute = self._original('execute')
+        if args or not self.cacheable(command):
+            output = execute(command, *args, **kwargs)
+            self.invalidate()
+            return output
+
+        key = self.key(command, **kwargs)
+        output = self.get(key)
+        if output is None:
+            output = execute(command, **kwargs)
+            self.put(key, output)
+        return output
+
+    def _configure(self, *args, **kwargs):
+        try:
+            return self._original('configure')(*args, **kwargs)
+        finally:
+            self.invalidate()
+
+    def enable(self):
+        for name in self.WRAPPED:
+            if name in self.device.__dict__:
+                self._originals[name] = self.device.__dict__[name]
+        self.device.execute = self._execute
+        self.device.configure = self._configure
+
+    def disable(self):
+        self.invalidate()
+        for name in self.WRAPPED:
+            if name in self._originals:
+                setattr(self.device, name, self._originals[name])
+            else:
+                self.device.__dict__.pop(name, None)
+
+
+def enable_output_cache(device, ttl=30, max_size=1000):
+    '''Cache the show commands output of a device
+
+    Args:
+        device (`Device`): Device to cache the output of
+        ttl (`int`): Number of seconds an output is valid. Default: 30
+        max_size (`int`): Maximum number of outputs kept. Default: 1000
+
+    Returns:
+        `OutputCache`: cache of the device
+    '''
+    cache = _caches.get(device.name)
+    if cache is not None and cache.device is device:
+        cache.ttl = ttl
+        cache.max_size = max_size
+        return cache
+    if cache is not None:
+        # Same name, but a different device object
+        cache.disable()
+
+    cache = OutputCache(device, ttl=ttl, max_size=max_size)
+    cache.enable()
+    _caches[device.name] = cache
+    log.info("Output cache enabled on '{d}' (ttl {t}s, {m} outputs)".format(
+        d=device.name, t=ttl, m=max_size))
+    return cache
+
+
+def disable_output_cache(device):
+    '''Stop caching the show commands output of a device'''
+    cache = _caches.pop(device.name, None)
+    if cache is not None:
+        cache.disable()
+        log.info("Output cache disabled on '{d}' ({h} hits, {m} misses)"
+                 .format(d=device.name, h=cache.hits, m=cache.misses))
+
+
+def get_output_cache(device):
+    '''Return the cache of the device, or None if not enabled'''
+    return _caches.get(getattr(device, 'name', None))
+
+
+@contextlib.contextmanager
+def bypass_output_cache(device):
+    '''Send every show command to the device within the block, if cache is
+    enabled
+
+    To be used while polling the device for a state change, where each
+    attempt must see the current outputs.
+    '''
+    cache = get_output_cache(device)
+    if cache is None:
+        yield
+        return
+    with cache.bypass():
+        yield
+
+
+def invalidate_output_cache(device):
+    '''Invalidate the cached outputs of a device, if cache is enabled
+
+    To be called whenever the device is configured, cleared, reloaded or
+    switched over.
+    '''
+    cache = get_output_cache(device)
+    if cache is not None:
+        cache.invalidate()
@@ -13,6 +13,7 @@ from prettytable import PrettyTable as ptable
 # import genie
 from genie.ops.utils import get_ops
 from genie.utils.diff import Diff
+from genie.libs.sdk.libs.utils.hashdiff import snapshot_diff
 from genie.conf.base.attributes import SubAttributesDict
 from genie.libs.sdk.libs.utils.normalize import GroupKeys
 from genie.libs.conf.base import IPv4Network
@@ -551,8 +552,9 @@ class LearnPollDiff():
                     pass
 
 
-        diff = Diff(ops_compare, ops_learn, exclude=exclude)
-        diff.findDiff()
+        # ops_compare is the same snapshot on every poll, it is only hashed
+        # once; ops_learn is relearnt and modified in place, hashed each time
+        diff = snapshot_diff(ops_compare, ops_learn, exclude=exclude)
 
         if str(diff):
             log.info("The output is not same with diff\n{}".format(str(diff)))
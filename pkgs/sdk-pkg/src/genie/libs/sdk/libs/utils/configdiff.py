@@ -0,0 +1,154 @@
+'''Configuration delta between two running-configs
+
+Restoring a saved running-config by configuring it again sends every line of
+it, even though a trigger only modified a few of them. `config_delta` compares
+the saved and the current running-config trees and returns the commands
+needed to go back to the saved one:
+
+* Lines only in the current config are removed ("no <line>"), the last
+  configured first; Removing a sub-mode removes all its children.
+* Lines only in the saved config are configured, with their children.
+* Sub-modes in both are entered and compared recursively.
+* Policy blocks (route-policy, prefix-set, ...) are configured as a whole
+  when they differ, as they are replaced and not merged.
+
+Example:
+
+    >>> saved = device.execute('show running-config')
+    >>> # ... modify the device ...
+    >>> current = device.execute('show running-config')
+    >>> delta = config_delta(saved, current)
+    >>> if delta:
+    ...     device.configure(delta)
+'''
+
+# Python
+import re
+import logging
+from collections import OrderedDict
+
+# Genie Libs
+from genie.libs.conf.topology_mapper.cli import config_cli_to_tree, \
+                                               cli_tree_to_config
+
+log = logging.getLogger(__name__)
+
+# Blocks which are replaced as a whole, and the line ending them
+BLOCK_TERMINATORS = {
+    'route-policy': 'end-policy',
+    'prefix-set': 'end-set',
+    'as-path-set': 'end-set',
+    'community-set': 'end-set',
+    'extcommunity-set': 'end-set',
+    'large-community-set': 'end-set',
+    'rd-set': 'end-set',
+}
+
+# Lines which are never compared
+IGNORED_LINES = ('end', 'end-policy', 'end-set')
+IGNORED_PREFIXES = ('version ', 'ntp clock-period ')
+
+
+def _keyword(line):
+    m = re.match(r'\S+', line)
+    return m.group(0) if m else ''
+
+
+def _level(tree):
+    '''{line: children} of one level of a config tree'''
+    level = OrderedDict()
+    for line, children in tree or ():
+        if line in IGNORED_LINES or line.startswith(IGNORED_PREFIXES):
+            continue
+        # Same line configured twice, keep the children of both
+        level[line] = (level.get(line) or ()) + (children or ())
+    return level
+
+
+def _negate(line):
+    if line.startswith('no '):
+        return line[3:]
+    return 'no ' + line
+
+
+def _render(line, children):
+    '''Lines to configure a line with all its children'''
+    lines = cli_tree_to_config(((line, children),)).splitlines()
+    terminator = BLOCK_TERMINATORS.get(_keyword(line))
+    if terminator and children:
+        # Ended by its terminator, not by exit
+        if lines[-1] == ' exit':
+            del lines[-1]
+        lines.append(terminator)
+    return lines
+
+
+def _diff(saved, current):
+    lines = []
+    for line in reversed(current):
+        if line not in saved:
+            lines.append(_negate(line))
+    for line, children in saved.items():
+        if line not in current:
+            lines.extend(_render(line, children))
+        elif children != current[line]:
+            if _keyword(line) in BLOCK_TERMINATORS:
+                lines.extend(_render(line, children))
+                continue
+            sub_lines = _diff(_level(children), _level(current[line]))
+            if sub_lines:
+                lines.append(line)
+                lines.extend(' ' + sub_line for sub_line in sub_lines)
+                lines.append(' exit')
+    return lines
+
+
+def config_delta(saved_config, current_config):
+    '''Return the configuration going from current_config to saved_config
+
+    Args:
+        saved_config (`str`): Running-config to go back to
+        current_config (`str`): Running-config of the device now
+
+    Returns:
+        `str`: Lines to configure, empty if both configs are the same
+    '''
+    saved = _level(config_cli_to_tree(saved_config, strip=True))
+    current = _level(config_cli_to_tree(current_config, strip=True))
+    return '\n'.join(_diff(saved, current))
+
+
+def restore_config_delta(device, saved_config):
+    '''Configure the device back to a saved running-config, only sending the
+    lines which differ
+
+    The running-config is compared again once configured; Lines which still
+    differ are sent once more, as some commands depend on others configured
+    later in the delta.
+
+    Args:
+        device (`obj`): Device object
+        saved_config (`str`): Running-config to go back to
+
+    Returns:
+        `str`: Lines still differing, empty if fully restored
+    '''
+    delta = ''
+    for attempt in range(2):
+        current_config = device.execute('show running-config')
+        delta = config_delta(saved_config, current_config)
+        if not delta:
+            log.info("The running-config of '{d}' is restored".format(
+                d=device.name))
+            return delta
+        log.info("Configuring the {n} lines which differ from the saved "
+                 "running-config of '{d}'".format(n=len(delta.splitlines()),
+                                                  d=device.name))
+        device.configure(delta)
+
+    delta = config_delta(saved_config,
+                         device.execute('show running-config'))
+    if delta:
+        log.warning("The running-config of '{d}' still differs from the "
+                    "saved one:\n{delta}".format(d=device.name, delta=delta))
+    return delta
@@ -0,0 +1,176 @@
+'''Hash tree of a snapshot, to diff only the branches which changed
+
+Diff walks both snapshots entirely, even when nothing changed between them.
+A HashTree holds a digest for every dictionary of a snapshot, computed
+bottom-up with the exclude list applied: two branches with the same digest
+are equal for Diff, and are removed from both snapshots before calling it.
+Diff then only walks the branches which differ and reports the same diffs.
+
+The tree of a snapshot object (Ops, Conf, ...) compared many times (initial
+snapshot of a learn_poll, system profile) can be kept as long as the object
+lives, once per exclude list, so that it is only hashed once. Such a
+snapshot must not be modified once hashed. The other snapshot of a diff,
+which may be relearnt or modified in place between two diffs, is hashed
+again on every diff by default.
+
+Example:
+
+    >>> hash_tree(ops_before, exclude=['maker', 'up_time'])
+    >>> diff = snapshot_diff(ops_before, ops_after,
+    ...                      exclude=['maker', 'up_time'])
+    >>> str(diff)
+'''
+
+# Python
+import re
+import hashlib
+import weakref
+import functools
+
+# Genie
+from genie.utils.diff import Diff
+
+# snapshot object -> {exclude: HashTree}
+_trees = weakref.WeakKeyDictionary()
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(exclude):
+    return tuple(re.compile(item) for item in exclude)
+
+
+class HashTree(object):
+    '''Digest of a value, and of each of its items for a dictionary
+
+    Lists, tuples and any other values are leaves, digested from their
+    type and repr; A value whose repr is not stable (default object repr)
+    is never equal to another one and is always left to Diff.
+
+    Args:
+        value (`obj`): Dictionary, snapshot object or leaf value
+        exclude (`list`): Keys to ignore, as for Diff
+        top (`bool`): Digest the attributes of an object value
+    '''
+
+    __slots__ = ('digest', 'children')
+
+    def __init__(self, value, exclude=None, top=False, _regexes=None):
+        if _regexes is None:
+            _regexes = _compile(tuple(exclude or ()))
+        items = _items(value, top=top)
+        if items is None:
+            self.children = None
+            self.digest = hashlib.sha1('{t}:{r}'.format(
+                t=type(value).__name__, r=repr(value)).encode()).digest()
+            return
+
+        self.children = {}
+        digests = []
+        for key, item in items:
+            if _excluded(key, _regexes):
+                continue
+            child = HashTree(item, _regexes=_regexes)
+            self.children[key] = child
+            digests.append((repr(key), child.digest))
+        sha = hashlib.sha1(b'{')
+        for key, digest in sorted(digests):
+            sha.update(key.encode())
+            sha.update(digest)
+        self.digest = sha.digest()
+
+
+def _items(value, top=False):
+    if isinstance(value, dict):
+        return value.items()
+    if top and hasattr(value, '__dict__'):
+        return vars(value).items()
+    return None
+
+
+def _excluded(key, regexes):
+    key = str(key)
+    return any(regex.fullmatch(key) for regex in regexes)
+
+
+def hash_tree(snapshot, exclude=None, cache=True):
+    '''Return the HashTree of a snapshot, computed once per exclude list
+
+    Args:
+        snapshot (`obj`): Ops object, Conf object or dictionary
+        exclude (`list`): Keys to ignore, as for Diff
+        cache (`bool`): Keep the tree as long as the snapshot lives, and
+                        reuse it; The snapshot must not be modified anymore.
+                        Default: True
+
+    Returns:
+        `HashTree`
+    '''
+    key = tuple(exclude or ())
+    if not cache:
+        return HashTree(snapshot, exclude=key, top=True)
+    try:
+        return _trees[snapshot][key]
+    except (KeyError, TypeError):
+        # Not hashed yet, or cannot be weak referenced (dict, ...)
+        pass
+
+    tree = HashTree(snapshot, exclude=key, top=True)
+    try:
+        _trees.setdefault(snapshot, {})[key] = tree
+    except TypeError:
+        pass
+    return tree
+
+
+def _prune(value1, value2, tree1, tree2, top=False):
+    '''Return value1 and value2 without the branches equal in both'''
+    items1 = dict(_items(value1, top=top))
+    items2 = dict(_items(value2, top=top))
+    pruned1 = {}
+    pruned2 = {}
+    for key in list(items1) + [k for k in items2 if k not in items1]:
+        child1 = tree1.children.get(key)
+        child2 = tree2.children.get(key)
+        if child1 is not None and child2 is not None:
+            if child1.digest == child2.digest:
+                continue
+            if child1.children is not None and child2.children is not None:
+                pruned1[key], pruned2[key] = _prune(items1[key], items2[key],
+                                                    child1, child2)
+                continue
+        # Only on one side, a leaf, or excluded; Diff decides
+        if key in items1:
+            pruned1[key] = items1[key]
+        if key in items2:
+            pruned2[key] = items2[key]
+    return pruned1, pruned2
+
+
+def snapshot_diff(snapshot1, snapshot2, exclude=None, cache1=True,
+                  cache2=False):
+    '''Diff two snapshots, only walking the branches which differ
+
+    Args:
+        snapshot1 (`obj`): Ops object, Conf object or dictionary
+        snapshot2 (`obj`): Ops object, Conf object or dictionary
+        exclude (`list`): Keys to ignore
+        cache1 (`bool`): Cache the tree of snapshot1, see hash_tree.
+                         Default: True
+        cache2 (`bool`): Cache the tree of snapshot2, see hash_tree.
+                         Default: False, snapshot2 is hashed on every diff
+
+    Returns:
+        `Diff`, on which findDiff was called
+    '''
+    tree1 = hash_tree(snapshot1, exclude=exclude, cache=cache1)
+    tree2 = hash_tree(snapshot2, exclude=exclude, cache=cache2)
+    if tree1.children is None or tree2.children is None:
+        # Not a dictionary nor an object
+        diff = Diff(snapshot1, snapshot2, exclude=exclude)
+    elif tree1.digest == tree2.digest:
+        diff = Diff({}, {}, exclude=exclude)
+    else:
+        diff = Diff(*_prune(snapshot1, snapshot2, tree1, tree2, top=True),
+                    exclude=exclude)
+    diff.findDiff()
+    return diff
@@ -6,6 +6,7 @@ import importlib
 import functools
 from operator import attrgetter
 from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from genie.utils.diff import Diff
 from ats.utils.objects import find, R, Operator, NotExists, Not
@@ -16,7 +17,13 @@ from genie.ops.base import Base as OpsBase
 from genie.utils.timeout import Timeout
 
 from genie.libs import ops
+from genie.libs.ops.utils.planner import SessionDevice
+from genie.libs.conf.utils.running_config import RunningConfigSections
 from genie.libs.sdk.libs.utils.triggeractions import Configure
+from genie.libs.sdk.libs.utils.cache import invalidate_output_cache,\
+                                            bypass_output_cache
+from genie.libs.sdk.libs.utils.pathindex import compile_regex,\
+                                                find_requirements
 from genie.libs.sdk.libs.utils.normalize import GroupKeys, _to_dict
 
 from genie.abstract import Lookup
@@ -232,6 +239,18 @@ class Mapping(object):
                     if base not in self._ops_ret:
                         return o
 
+                    # Polling the device, every attempt sends the
+                    # commands again
+                    with bypass_output_cache(device):
+                        if getattr(self, 'incremental', False):
+                            return self._learn_poll_incremental(
+                                ops=functools.partial(abstracted_base,
+                                                      device=device,
+                                                      **kwargs),
+                                **learn_poll)
+                        o.learn_poll(**learn_poll)
+                    return o
+
                 # Learn and verify the ops
                 o.learn_poll(**learn_poll)
                 return o
@@ -250,7 +269,7 @@ class Mapping(object):
                             return
 
                     # learn conf with show running-config
-                    o = cls.learn_config(device=device, attributes=kwargs.get('attributes', None))
+                    o = self._learn_config(cls, device, attributes=kwargs.get('attributes', None))
                     # convert from conf instance to dictionary
                     o = [_to_dict(item) for item in o]
                     if verify:
@@ -285,16 +304,180 @@ class Mapping(object):
         except Exception as e:
             raise
 
-    def learn_ops(self, device, abstract, steps, timeout, **kwargs):
-        '''Learn Ops object and populate the keys'''
+    def _learn_config(self, cls, device, **kwargs):
+        '''Learn a Conf class; All the Conf bases learnt in the same
+        learn_ops or verify_with_initial share one show running-config'''
+        sections = getattr(self, '_running_config', None)
+        if sections is None or sections.device is not device:
+            return cls.learn_config(device=device, **kwargs)
+        with sections:
+            return cls.learn_config(device=device, **kwargs)
+
+    def _learn_poll_incremental(self, ops, initial, verify, timeout,
+                                exclude, **kwargs):
+        '''Learn and verify an Ops object until it is equal to initial
+
+        Same as Ops.learn_poll, but the commands whose output is back to the
+        output of the initial snapshot are not sent again on the next
+        attempts; their output is reused. Once the reused outputs make the
+        verification pass, a full learn confirms it.
+
+        Args:
+            ops (`callable`): Return a new Ops object to learn
+            initial (`obj`): Initial Ops snapshot
+            verify (`callable`): Verification function, raise on failure
+            timeout (`Timeout`): Maximum time and interval between attempts
+            exclude (`list`): Keys to ignore in the comparison
+
+        Raises:
+            StopIteration: Not equal to initial within the timeout
+        '''
+        initial_outputs = getattr(getattr(initial, 'maker', None),
+                                  'outputs', {})
+        timeout = Timeout(max_time=timeout.max_time, interval=timeout.interval)
+        stable = {}
+        while True:
+            o = ops()
+            for cmd, outputs in stable.items():
+                o.maker.outputs.setdefault(cmd, {}).update(outputs)
+            o.learn()
+            try:
+                verify(o, initial=initial, exclude=exclude, **kwargs)
+            except Exception as e:
+                error = e
+            else:
+                if not stable:
+                    return o
+                # Reused outputs might be outdated, confirm with a full learn
+                log.info('Snapshot is equal to the initial one, confirming '
+                         'with a full learn')
+                stable = {}
+                continue
+
+            # Keep the outputs which are back to their initial value
+            stable = {}
+            reused = executed = 0
+            for cmd, outputs in o.maker.outputs.items():
+                for key, output in outputs.items():
+                    executed += 1
+                    try:
+                        before = initial_outputs[cmd][key]
+                    except KeyError:
+                        continue
+                    if output != before:
+                        diff = Diff(before, output, exclude=exclude)
+                        diff.findDiff()
+                        if diff.diffs:
+                            continue
+                    stable.setdefault(cmd, {})[key] = output
+                    reused += 1
+            log.info('{r} out of {e} commands are back to their initial '
+                     'output and will not be sent again'.format(r=reused,
+                                                               e=executed))
+
+            if not timeout.iterate():
+                raise StopIteration(str(error)) from error
+            timeout.sleep()
+
+    def _learn_parallel(self, device, abstract, sessions, lts=None):
+        '''Learn all the requirement bases at the same time
+
+        Each worker learns through its own connection alias, so the number
+        of workers is the number of sessions. Returns a dictionary of
+        base -> Future; the bases already satisfied by the LTS are not
+        learnt.
+        '''
+        connections = []
+        for alias in sessions or []:
+            if alias in device.connectionmgr.connections:
+                connections.append(device.connectionmgr.connections[alias])
+            else:
+                log.warning("Connection '{a}' does not exists on '{d}', it "
+                            "will not be used".format(a=alias, d=device.name))
+
+        if len(connections) < 2:
+            log.info('Less than 2 sessions available, the features are '
+                     'learnt one after another')
+            return {}
+
+        # A connection is used by one worker at a time
+        free = list(connections)
+
+        def learn(base, abstracted_base, is_ops, req):
+            connection = free.pop()
+            try:
+                o = self._learn_base(SessionDevice(device, connection),
+                                     base.split('.')[-1], None,
+                                     abstracted_base, is_ops, base, req)
+            finally:
+                free.append(connection)
+            # Snapshots are compared later on, keep the real device on them
+            if is_ops:
+                o.device = device
+            return o
+
+        futures = {}
+        executor = ThreadPoolExecutor(max_workers=len(connections))
+        for base, requirements in self.requirements.items():
+            if self._lts_learnt(device, base, requirements, lts or {}):
+                continue
+            abstracted_base = attrgetter(base)(abstract)
+            is_ops = issubclass(abstracted_base, OpsBase)
+            req = requirements.copy()
+            req.pop('requirements', None)
+            futures[base] = executor.submit(learn, base, abstracted_base,
+                                            is_ops, req)
+        # Workers keep running, the results are collected in order and
+        # _stop_parallel must be called once done with them
+        executor.shutdown(wait=False)
+        log.info('Learning {f} in parallel over {n} sessions'.format(
+            f=', '.join(futures), n=len(connections)))
+        return futures
+
+    @staticmethod
+    def _stop_parallel(futures):
+        '''Cancel the bases not being learnt yet and wait for the ones being
+        learnt, so no worker is left using the device connections'''
+        for future in futures.values():
+            future.cancel()
+        wait(futures.values())
+
+    def _lts_learnt(self, device, base, requirements, lts):
+        '''Return the LTS object of the base if it satisfies the requirements
+        '''
+        if not lts.get(base, {}).get(device.name, {}):
+            return
+        o = [lts[base][device.name]]
+        # check if can get required value from the lts
+        # if not, need to learn device again
+        reqs = self._populate_path(requirements['requirements'],
+                    device, keys=self.keys, device_only=True)
+        all_keys = requirements.get('all_keys', False)
+        if find_requirements(o[0], reqs, filter_=False, all_keys=all_keys):
+            return o
+
+    def learn_ops(self, device, abstract, steps, timeout, parallel=False,
+                  sessions=None, **kwargs):
+        '''Learn Ops object and populate the keys
+
+        When `parallel` is True, all the requirement bases are learnt at the
+        same time, one base per connection alias provided with `sessions`,
+        and the requirements are verified once all of them are learnt.
+        '''
 
         # Holds Ops object
         self._ops_ret = {}
         # Holds Conf object
         self._conf_ret = {}
+        # Running-config shared by the Conf bases
+        self._running_config = RunningConfigSections(device)
 
         # How the keys learnt - Those are the regex values
         self.keys = []
+        # Keys merged from the last requirements verified; Listed into
+        # self.keys when other requirements follow, otherwise only generated
+        # by GroupKeys.max_amount until num_values is satisfied
+        merged = None
         # TODO: Remove this
         self.req_list_flag = {}
 
@@ -308,181 +491,190 @@ class Mapping(object):
         provided_values = self.requirements.pop('provided_values') \
             if 'provided_values' in self.requirements else {}
 
-        for base, requirements in self.requirements.items():
-            # enable learn on device for each feature
-            learn_on_device = True
+        # Learn every base first, requirements are verified below
+        learnt = {}
+        if parallel or getattr(self, 'parallel', False):
+            learnt = self._learn_parallel(
+                device, abstract, sessions or getattr(self, 'sessions', None),
+                lts=kwargs.get('lts', {}))
 
-            name = base.split('.')[-1]
+        try:
+            for base, requirements in self.requirements.items():
+                if merged is not None:
+                    self.keys, merged = list(merged), None
 
-            # Instantiate the abstracted base object
-            # Create attrgetter for abstract which would find the right base
-            # object
-            abstracted_base = attrgetter(base)(abstract)
-            is_ops = issubclass(abstracted_base, OpsBase)
-            type_ = 'Ops' if is_ops else 'Conf'
+                # enable learn on device for each feature
+                learn_on_device = True
+
+                name = base.split('.')[-1]
+
+                # Instantiate the abstracted base object
+                # Create attrgetter for abstract which would find the right base
+                # object
+                abstracted_base = attrgetter(base)(abstract)
+                is_ops = issubclass(abstracted_base, OpsBase)
+                type_ = 'Ops' if is_ops else 'Conf'
 
-            with steps.start("Learning '{n}' {t}".format(n=name,
-                                                         t=type_)) as step:
+                with steps.start("Learning '{n}' {t}".format(n=name,
+                                                             t=type_)) as step:
 
-                # Is is a or an
-                a = 'an' if name[0].lower() in VOWEL else 'a'
+                    # Is is a or an
+                    a = 'an' if name[0].lower() in VOWEL else 'a'
 
-                log.info("Find {} '{}' that satisfy the following requirements:"
-                         .format(a, base))
-                msgs = self._requirements_printer(name, requirements, device,
-                                                  populate=False)
-                log.info('\n'.join(msgs))
+                    log.info("Find {} '{}' that satisfy the following requirements:"
+                             .format(a, base))
+                    msgs = self._requirements_printer(name, requirements, device,
+                                                      populate=False)
+                    log.info('\n'.join(msgs))
 
-                # if LTS has value, get from LTS, don't learn
-                if kwargs.get('lts', {}).get(base, {}).get(device.name, {}):
-                    o = [kwargs['lts'][base][device.name]]
-                    # check if can get required value from the lts
-                    # if not, need to learn device again                    
-                    reqs = self._populate_path(requirements['requirements'],
-                                device, keys=self.keys, device_only=True)
-                    all_keys = requirements.get('all_keys', False)
-                    rs = [R(requirement) for requirement in reqs]
-                    ret = find(o, *rs, filter_=False, all_keys=all_keys)
-                    if ret:
+                    # if LTS has value, get from LTS, don't learn
+                    lts_o = self._lts_learnt(device, base, requirements,
+                                             kwargs.get('lts', {}))
+                    if lts_o:
+                        o = lts_o
                         learn_on_device = False
-                        log.info('LTS from subsection already learned the %s object,'
+                        log.info('LTS from subsection already learned the {n} object,'
                             'read from LTS instead of executing commands'.format(n=name))
 
-                # Modify requirements so everything is learn
-                if learn_on_device:
-                    if 'requirements' in requirements:
-                        req = requirements.copy()
-                        del req['requirements']
-                    try:
-                        o = self._learn_base(device, name, step, abstracted_base,
-                                             is_ops, base, req)
-                    except StopIteration as e:
-                        step.failed("Could not learn '{n}'".format(n=name),
-                                    from_exception=e)
-                if o:
-                    # process ops requirements
-                    if is_ops:
-                        self._ops_ret[base] = o
-                    # process conf requirements
-                    else:
-                        self._conf_ret[base] = o
-
-            with steps.start('Verifying requirements') as step:
-
-                # print out the log to show which are the hardcode values
-                if provided_values:
-                    log.info('Updating the requirements with the information provided: {}'
-                        .format(provided_values))
+                    # Modify requirements so everything is learn
+                    if learn_on_device:
+                        if 'requirements' in requirements:
+                            req = requirements.copy()
+                            del req['requirements']
+                        try:
+                            if base in learnt:
+                                # Already learning in parallel, wait for it
+                                o = learnt[base].result()
+                            else:
+                                o = self._learn_base(device, name, step,
+                                                     abstracted_base, is_ops,
+                                                     base, req)
+                        except StopIteration as e:
+                            step.failed("Could not learn '{n}'".format(n=name),
+                                        from_exception=e)
+                    if o:
+                        # process ops requirements
+                        if is_ops:
+                            self._ops_ret[base] = o
+                        # process conf requirements
+                        else:
+                            self._conf_ret[base] = o
 
-                reqs = requirements['requirements']
+                with steps.start('Verifying requirements') as step:
 
-                if not any(isinstance(el, list) for el in reqs[0]):
-                    reqs_list = [reqs]
-                    self.req_list_flag[base] = False
-                else:
-                    reqs_list = reqs
-                    self.req_list_flag[base] = True
-
-                ret_reqs = []
-
-                for reqs in reqs_list:
-                    # Needed for [[ ]] requirements
-
-                    if isinstance(reqs[0], list):
-                        all_requirements.extend(reqs)
-                    req_msg = '\n'.join([str(re) for re in reqs])
-                    log.info("Requirements pattern to "
-                             "verify:\n{r}\n\n".format(r=req_msg))
-
-                    # To populate the path first with hardcode values
-                    # to only store the attributes that contains the hardcoded values
-                    reqs = self._populate_path(reqs, device, keys=[provided_values])
-
-                    # Populate the keys into R object
-                    # Useful if want to learn from previously learnt requirements
-                    reqs = self._populate_path(reqs, device, keys=self.keys, device_only=True)
-
-                    all_keys = requirements.get('all_keys', False)
-
-                    # Check if the requirements is [Operator('info')]
-                    # if so, it will check if the ops output is empty
-                    # TODO - this particular case will be enhanced in find
-                    expect_empty = False
-                    for i in reqs:
-                        if len(i) < 2:
-                            attr = i[0] if isinstance(i[0], str) else i[0].value
-                            if not hasattr(o, attr):
-                                expect_empty = True
-                                step.passed('The ops attribute {} is empty as expected'
-                                    .format(attr))
-
-                    rs = [R(requirement) for requirement in reqs]
-
-                    if not isinstance(o, list):
-                        o = [o]
-
-                    failed_list = []
-                    ret = []
-                    for item in o:
-                        # exclude the managemnet interface from the selected
-                        # interfaces
-                        find_obj = self.exclude_management_interface(device,
-                            requirements, item)
-                        ret1 = find([find_obj], *rs, filter_=False, all_keys=all_keys)
-
-                        if not ret1:
-                            failed_list.append("0")
-                        else:
-                            ret.extend([ret1])
-
-
-                    if len(failed_list) == len(o):
-                        # Requirements are not satisfied
-                        err_msg = '\n'.join([str(re) for re in reqs])
-                        # If static then it should fail - what they
-                        # provided couldnt be found
-                        if self._static:
-                            step.failed("Could not find a '{n}' which "
-                                        "satisfies the requirement:\n{e}"
-                                        .format(n=name, e=err_msg))
-                        else:
-                            step.skipped("Following requirements were not "
-                                         "satisfied for '{n}':\n{e}"
-                                         .format(n=name, e=err_msg))
+                    # print out the log to show which are the hardcode values
+                    if provided_values:
+                        log.info('Updating the requirements with the information provided: {}'
+                            .format(provided_values))
 
-                    if not self._static_learn:
-                        continue
+                    reqs = requirements['requirements']
 
-                    temp_keys = []
-                    key_list = []
-                    for ret1 in ret:
-                        group_keys = GroupKeys.group_keys(
-                                        reqs=reqs,
-                                        ret_num={},
-                                        source=ret1,
-                                        all_keys=all_keys)
+                    if not any(isinstance(el, list) for el in reqs[0]):
+                        reqs_list = [reqs]
+                        self.req_list_flag[base] = False
+                    else:
+                        reqs_list = reqs
+                        self.req_list_flag[base] = True
+
+                    ret_reqs = []
+
+                    for reqs in reqs_list:
+                        if merged is not None:
+                            self.keys, merged = list(merged), None
+
+                        # Needed for [[ ]] requirements
+
+                        if isinstance(reqs[0], list):
+                            all_requirements.extend(reqs)
+                        req_msg = '\n'.join([str(re) for re in reqs])
+                        log.info("Requirements pattern to "
+                                 "verify:\n{r}\n\n".format(r=req_msg))
+
+                        # To populate the path first with hardcode values
+                        # to only store the attributes that contains the hardcoded values
+                        reqs = self._populate_path(reqs, device, keys=[provided_values])
+
+                        # Populate the keys into R object
+                        # Useful if want to learn from previously learnt requirements
+                        reqs = self._populate_path(reqs, device, keys=self.keys, device_only=True)
+
+                        all_keys = requirements.get('all_keys', False)
+
+                        # Check if the requirements is [Operator('info')]
+                        # if so, it will check if the ops output is empty
+                        # TODO - this particular case will be enhanced in find
+                        expect_empty = False
+                        for i in reqs:
+                            if len(i) < 2:
+                                attr = i[0] if isinstance(i[0], str) else i[0].value
+                                if not hasattr(o, attr):
+                                    expect_empty = True
+                                    step.passed('The ops attribute {} is empty as expected'
+                                        .format(attr))
+
+                        if not isinstance(o, list):
+                            o = [o]
+
+                        failed_list = []
+                        ret = []
+                        for item in o:
+                            # exclude the managemnet interface from the selected
+                            # interfaces
+                            find_obj = self.exclude_management_interface(device,
+                                requirements, item)
+                            ret1 = find_requirements(find_obj, reqs,
+                                                     filter_=False,
+                                                     all_keys=all_keys)
+
+                            if not ret1:
+                                failed_list.append("0")
+                            else:
+                                ret.extend([ret1])
+
+
+                        if len(failed_list) == len(o):
+                            # Requirements are not satisfied
+                            err_msg = '\n'.join([str(re) for re in reqs])
+                            # If static then it should fail - what they
+                            # provided couldnt be found
+                            if self._static:
+                                step.failed("Could not find a '{n}' which "
+                                            "satisfies the requirement:\n{e}"
+                                            .format(n=name, e=err_msg))
+                            else:
+                                step.skipped("Following requirements were not "
+                                             "satisfied for '{n}':\n{e}"
+                                             .format(n=name, e=err_msg))
 
-                        for key in group_keys:
-                            temp_keys.extend(GroupKeys.merge_all_keys(self.keys, [], key))
-                        tmp_keys = temp_keys.copy()
+                        if not self._static_learn:
+                            continue
 
-                        key_list.extend(tmp_keys)
-                    self.keys = key_list
+                        merged = GroupKeys.iter_merge_keys(self.keys, ret,
+                                                           reqs,
+                                                           all_keys=all_keys)
+        finally:
+            # When a base failed, do not leave the other workers learning
+            self._stop_parallel(learnt)
 
         with steps.start('Merge requirements') as step:
             # update the self.keys with hardcode values for following needs
-            if not self.keys:
-                self.keys.append(provided_values)
-            else:
-                for item in self.keys:
+            def update_keys(keys):
+                for item in keys:
                     if not isinstance(item,list):
                        item.update(provided_values)
                     else:
                         for i in item:
                             i.update(provided_values)
+                    yield item
 
+            keys = iter(self.keys if merged is None else merged)
+            first = next(keys, None)
+            if first is None:
+                keys = [provided_values]
+            else:
+                keys = update_keys(itertools.chain([first], keys))
 
-            self.keys = GroupKeys.max_amount(self.keys, self.num_values)
+            self.keys = GroupKeys.max_amount(keys, self.num_values)
 
             # update mapping.keys with static values
             if self._static:
@@ -519,14 +711,25 @@ class Mapping(object):
 
         return self._ops_ret
 
-    def verify_with_initial(self, device, abstract, steps,
+    def verify_with_initial(self, device, abstract, steps, incremental=None,
                             **kwargs):
-        '''Verify a snapshot with initial snapshot'''
+        '''Verify a snapshot with initial snapshot
+
+        With `incremental`, only the commands whose output still differs
+        from the initial snapshot are sent again on each attempt.
+        '''
         # For each ops object, take a new snapshot
         # And compare with initial one taken in learn_ops
         # Store the new ops object
         current_ops = {}
 
+        if incremental is not None:
+            self.incremental = incremental
+
+        # The trigger changed the device state, do not use older outputs
+        invalidate_output_cache(device)
+        self._running_config = RunningConfigSections(device)
+
         # Get Timeout Object for recovery section
         if isinstance(kwargs.get('timeout_recovery', None), Timeout):
             self.timeout = kwargs['timeout_recovery']
@@ -589,8 +792,8 @@ class Mapping(object):
            not getattr(ops, requirements[0][0].value, {}):
             return
 
-        rs = [R(requirement) for requirement in requirements]
-        ret = find([ops], *rs, filter_=False, all_keys=all_keys)
+        ret = find_requirements(ops, requirements, filter_=False,
+                                all_keys=all_keys)
         # If missing is True, then we expect it to be missing, aka ret empty
         if not ret and not missing:
             raise Exception("'{req}' does not exists in "
@@ -809,30 +1012,32 @@ class Mapping(object):
 
     def _verify_ops(self, device, o, reqs, missing, ops, requirements):
 
-        # verify callable if requirements path
-        # contains customized verify functions
-        if reqs.get('callable', None):
-            for item in reqs['callable']:
-                try:
-                    o.learn_poll(verify=item[0].func,
-                                 mapping=self, local_reqs=reqs,
-                                 timeout=self.timeout, **item[0].keywords)
-                except Exception as e:
-                    raise e
+        # Polling the device, every attempt sends the commands again
+        with bypass_output_cache(device):
+            # verify callable if requirements path
+            # contains customized verify functions
+            if reqs.get('callable', None):
+                for item in reqs['callable']:
+                    try:
+                        o.learn_poll(verify=item[0].func,
+                                     mapping=self, local_reqs=reqs,
+                                     timeout=self.timeout, **item[0].keywords)
+                    except Exception as e:
+                        raise e
 
-        # verify the ops paths values
-        try:
-            o.learn_poll(verify=self._verify_finds_ops,
-                         requirements=reqs['list'],
-                         timeout=self.timeout,
-                         missing=missing,
-                         obj_mod=ops,
-                         org_req=requirements)
-            # add to self to provide access for parent 
-            # that can get information from the learned ops object
-            self.verify_ops_object = o
-        except Exception as e:
-            raise e
+            # verify the ops paths values
+            try:
+                o.learn_poll(verify=self._verify_finds_ops,
+                             requirements=reqs['list'],
+                             timeout=self.timeout,
+                             missing=missing,
+                             obj_mod=ops,
+                             org_req=requirements)
+                # add to self to provide access for parent 
+                # that can get information from the learned ops object
+                self.verify_ops_object = o
+            except Exception as e:
+                raise e
 
     def _modify_ops_snapshot(self, original, current, path, obj=None):
         # Handling the case of 'NotExists' in the trigger prerequisites
@@ -855,8 +1060,8 @@ class Mapping(object):
                 pass
             return
 
-        r = R(path[:-1] + ['(.*)'])
-        ret = find([original], r, filter_=False)
+        ret = find_requirements(original, [path[:-1] + ['(.*)']],
+                                filter_=False)
         if not ret:
             if not required_key:
                 raise Exception("'{p}' does not exist on original "
@@ -972,7 +1177,7 @@ class Mapping(object):
                     elif item.startswith('(?P<'):
                         # Modify it with an item of key
                         try:
-                            com = re.compile(item)
+                            com = compile_regex(item)
                         except Exception as e:
                             raise ValueError("'{item}' is not a valid regex "
                                              "expression".format(item=item))\
@@ -1076,7 +1281,7 @@ class Mapping(object):
                     continue
                 # Modify it with an item of key
                 try:
-                    com = re.compile(item)
+                    com = compile_regex(item)
                 except Exception as e:
                     raise ValueError("'{item}' is not a valid regex "
                                      "expression".format(item=item)) from e
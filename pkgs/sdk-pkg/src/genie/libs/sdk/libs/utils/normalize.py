@@ -11,6 +11,7 @@ from collections import defaultdict, Iterable
 
 # import genie
 from genie.utils.diff import Diff
+from genie.libs.sdk.libs.utils.hashdiff import snapshot_diff
 from genie.conf.base.attributes import SubAttributesDict
 from genie.conf.base.base import ConfigurableBase
 
@@ -27,6 +28,9 @@ class GroupKeys():
           from the source corresponding keys
     '''
 
+    # Number of key combinations above which a warning is logged
+    COMBINATIONS_WARNING = 10000
+
     @classmethod
     def group_keys(cls, source, reqs, ret_num=None, all_keys=False):
         ''' Compose the dict which contains the headers as keys, and values
@@ -206,11 +210,41 @@ class GroupKeys():
 
         return ret
 
+    @classmethod
+    def iter_merge_keys(cls, keys, sources, reqs, all_keys=False):
+        ''' Lazily merge the keys found in each find output with keys
+
+            Args:
+                keys (`list`): Keys learnt from the previous requirements
+                sources (`list`): Function ats.utils.objects.find outputs
+                reqs (`list`): List of requirements
+                all_keys (`bool`): find was called with all_keys
+
+            Returns:
+                Generator of the merged keys dictionaries
+        '''
+        for source in sources:
+            for key in cls.group_keys(reqs=reqs, ret_num={}, source=source,
+                                      all_keys=all_keys):
+                yield from cls.merge_all_keys(keys, [], key)
+
     @classmethod
     def max_amount(cls, temp_ret, ret_num):
+        ''' Keep the keys combinations within the num_values limits
+
+            temp_ret can be any iterable, it is consumed lazily. When every
+            key of the combinations is limited to a single value, it stops
+            as soon as that combination is kept.
+        '''
         ret = []
         counter = {}
+        produced = 0
         for temp in temp_ret:
+            produced += 1
+            if produced == cls.COMBINATIONS_WARNING + 1:
+                log.warning('More than {n} combinations of keys were '
+                            'generated, limit the keys with num_values to '
+                            'reduce it'.format(n=cls.COMBINATIONS_WARNING))
             for k in temp:
                 # Make sure we have not reached our limit of those specific keys
                 try:
@@ -235,6 +269,15 @@ class GroupKeys():
                 ret_dict = { k: get_reduced_value(temp[k], ret_num, k) \
                                                             for k in temp }
                 ret.append(ret_dict)
+
+                # The counter only holds the first value of each key, so only
+                # a limit of 1 caps the combinations. When all keys are
+                # capped, no other combination can be kept.
+                if _single_value(ret_dict, ret_num):
+                    break
+
+        log.debug('Kept {k} out of {p} combinations of keys'
+                  .format(k=len(ret), p=produced))
         return ret
 
     @classmethod
@@ -242,7 +285,9 @@ class GroupKeys():
         # Merge all the keys into a group keys that make sense
         # This code...is not optimal
 
-        temp_ret = deepcopy(temp_ret)
+        # Only the dictionaries are modified, no need to copy their values
+        temp_ret = [dict(temp) if isinstance(temp, dict) else deepcopy(temp)
+                    for temp in temp_ret]
         #temp_dict = []
         # temp_ret = previous requirements found information
         skip = {}
@@ -294,6 +339,16 @@ class GroupKeys():
 
         return temp_dict
 
+def _single_value(keys, ret_num):
+    ''' True when ret_num limits every key to a single value '''
+    for key in keys:
+        limit = ret_num.get(key)
+        if limit is None or isinstance(limit, dict):
+            return False
+        if get_num_value(limit) not in (1, '1'):
+            return False
+    return True
+
 def get_num_value(ret_num, key='num', default='all'):
     ''' get num_value information '''
     if isinstance(ret_num, str):
@@ -447,8 +502,9 @@ class LearnPollDiff():
                     learn[r.args[0][-2]] = osnap[r.args[0][-2]]
                     pass
 
-        diff = Diff(ops_compare, ops_learn, exclude=exclude)
-        diff.findDiff()
+        # ops_compare is the same snapshot on every poll, it is only hashed
+        # once; ops_learn is relearnt and modified in place, hashed each time
+        diff = snapshot_diff(ops_compare, ops_learn, exclude=exclude)
 
         if str(diff):
             log.info("The output is not same with diff\n{}".format(str(diff)))
@@ -0,0 +1,144 @@
+'''Requirement index over a learnt Ops or Conf structure
+
+`find` walks every leaf of the object it is given, which takes minutes on
+structures such as the BGP routes_per_peer with 100k routes. The requirements
+only ever look at a few branches of it.
+
+PathIndex compiles the requirements into a trie where each node holds
+precompiled matchers, walks the object once with it and keeps only the
+branches any requirement can reach. `find` is then called on that pruned
+structure and returns the same result as on the full object.
+
+A matcher never rejects a key which `find` could accept: regexes are
+searched anywhere in the key, plain strings are compared as sub-strings and
+any Operator or callable accepts every key.
+
+Example:
+
+    >>> index = PathIndex(bgp_ops)
+    >>> rs = [R(req) for req in reqs]
+    >>> find([index.prune(reqs)], *rs, filter_=False)
+
+    >>> # Or in one call
+    >>> find_requirements(bgp_ops, reqs, filter_=False)
+'''
+
+# Python
+import re
+import functools
+
+# import ats
+from ats.utils.objects import find, R
+
+
+@functools.lru_cache(maxsize=None)
+def compile_regex(pattern):
+    '''re.compile, cached for the whole run'''
+    return re.compile(pattern)
+
+
+@functools.lru_cache(maxsize=4096)
+def _str_matcher(item):
+    if re.escape(item) == item:
+        return lambda key: item in str(key)
+    try:
+        com = compile_regex(item)
+    except re.error:
+        return lambda key: key == item or item in str(key)
+    return lambda key: key == item or bool(com.search(str(key)))
+
+
+def _match_all(key):
+    return True
+
+
+class _TrieNode(object):
+    '''One level of the requirements'''
+
+    __slots__ = ('edges', 'any_edges', 'terminal')
+
+    def __init__(self):
+        # str item -> (matcher, _TrieNode)
+        self.edges = {}
+        # [(matcher, _TrieNode)] for the non string items
+        self.any_edges = []
+        # A requirement ends here, keep the whole branch
+        self.terminal = False
+
+    def child(self, item):
+        if isinstance(item, str):
+            if item not in self.edges:
+                self.edges[item] = (_str_matcher(item), _TrieNode())
+            return self.edges[item][1]
+        if isinstance(item, (int, float)) and not isinstance(item, bool):
+            matcher = _str_matcher(str(item))
+        else:
+            # Operator, callable, ...
+            matcher = _match_all
+        node = _TrieNode()
+        self.any_edges.append((matcher, node))
+        return node
+
+    def matches(self, key):
+        for matcher, node in self.edges.values():
+            if matcher(key):
+                yield node
+        for matcher, node in self.any_edges:
+            if matcher(key):
+                yield node
+
+
+class PathIndex(object):
+    '''Index of a learnt object to resolve requirements
+
+    Args:
+        obj (`obj`): Ops object, Conf dictionary or any nested dictionary
+    '''
+
+    def __init__(self, obj):
+        self.obj = obj
+        if isinstance(obj, dict):
+            self.root = obj
+        else:
+            try:
+                self.root = vars(obj)
+            except TypeError:
+                self.root = None
+
+    @staticmethod
+    def compile(requirements):
+        '''Compile a list of requirements into a trie'''
+        root = _TrieNode()
+        for requirement in requirements:
+            node = root
+            for item in requirement:
+                node = node.child(item)
+            node.terminal = True
+        return root
+
+    def prune(self, requirements):
+        '''Return the branches of the object reachable by the requirements
+
+        Returns the original object when it cannot be indexed.
+        '''
+        if self.root is None or not requirements:
+            return self.obj
+        return self._prune(self.root, [self.compile(requirements)])
+
+    def _prune(self, node, tries):
+        if not isinstance(node, dict) or \
+           any(trie.terminal for trie in tries):
+            return node
+        pruned = {}
+        for key, value in node.items():
+            children = [child for trie in tries for child in trie.matches(key)]
+            if children:
+                pruned[key] = self._prune(value, children)
+        return pruned
+
+
+def find_requirements(obj, requirements, **kwargs):
+    '''Same as find([obj], *[R(req) for req in requirements], **kwargs)
+    but only walks the branches of obj reachable by the requirements'''
+    rs = [R(requirement) for requirement in requirements]
+    return find([PathIndex(obj).prune(requirements)], *rs, **kwargs)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import Mock, patch
+
+from genie.libs.sdk.libs.utils.cache import OutputCache, enable_output_cache,\
+                                            disable_output_cache,\
+                                            get_output_cache,\
+                                            invalidate_output_cache,\
+                                            bypass_output_cache
+
+
+class Device(object):
+
+    def __init__(self, name='PE1'):
+        self.name = name
+        self.execute = Mock(side_effect=lambda command, **kwargs:
+                            'output of {}'.format(command))
+        self.configure = Mock()
+
+
+class test_output_cache(unittest.TestCase):
+
+    def setUp(self):
+        self.device = Device()
+        self.execute = self.device.execute
+        self.configure = self.device.configure
+        self.cache = enable_output_cache(self.device, ttl=30, max_size=3)
+
+    def tearDown(self):
+        disable_output_cache(self.device)
+
+    def test_show_commands_cached(self):
+        self.assertEqual(self.device.execute('show version'),
+                         'output of show version')
+        # Same command, whitespace aside
+        self.assertEqual(self.device.execute('show  version '),
+                         'output of show version')
+        self.assertEqual(self.execute.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        # Arguments are part of the key
+        self.device.execute('show version', reply='x')
+        self.assertEqual(self.execute.call_count, 2)
+
+    def test_ttl(self):
+        with patch('genie.libs.sdk.libs.utils.cache.time') as time_:
+            time_.time.return_value = 100
+            self.device.execute('show version')
+            time_.time.return_value = 130
+            self.device.execute('show version')
+            self.assertEqual(self.execute.call_count, 1)
+            time_.time.return_value = 131
+            self.device.execute('show version')
+            self.assertEqual(self.execute.call_count, 2)
+
+    def test_lru(self):
+        for command in ('show a', 'show b', 'show c'):
+            self.device.execute(command)
+        # show a is used, show b becomes the least recently used
+        self.device.execute('show a')
+        self.device.execute('show d')
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.execute.call_count, 4)
+
+        self.device.execute('show a')
+        self.device.execute('show c')
+        self.device.execute('show d')
+        self.assertEqual(self.execute.call_count, 4)
+        self.device.execute('show b')
+        self.assertEqual(self.execute.call_count, 5)
+
+    def test_invalidate_on_other_commands(self):
+        self.device.execute('show version')
+        self.device.execute('clear counters')
+        self.assertEqual(len(self.cache), 0)
+        self.device.execute('show version')
+        self.assertEqual(self.execute.call_count, 3)
+
+    def test_invalidate_on_configure(self):
+        self.device.execute('show version')
+        self.device.configure('hostname PE2')
+        self.assertEqual(len(self.cache), 0)
+        self.configure.assert_called_once_with('hostname PE2')
+
+    def test_invalidate_output_cache(self):
+        self.device.execute('show version')
+        invalidate_output_cache(self.device)
+        self.device.execute('show version')
+        self.assertEqual(self.execute.call_count, 2)
+        # No cache on this device, nothing to do
+        invalidate_output_cache(Device(name='PE2'))
+
+    def test_bypass(self):
+        self.device.execute('show version')
+        with bypass_output_cache(self.device):
+            self.device.execute('show version')
+            self.device.execute('show version')
+        self.assertEqual(self.execute.call_count, 3)
+        # The last output is kept
+        self.device.execute('show version')
+        self.assertEqual(self.execute.call_count, 3)
+        # No cache on this device, nothing to bypass
+        with bypass_output_cache(Device(name='PE2')):
+            pass
+
+    def test_disable(self):
+        disable_output_cache(self.device)
+        self.assertIsNone(get_output_cache(self.device))
+        self.assertIs(self.device.execute, self.execute)
+        self.device.execute('show version')
+        self.device.execute('show version')
+        self.assertEqual(self.execute.call_count, 2)
+
+    def test_enable_again(self):
+        self.assertIs(enable_output_cache(self.device, ttl=10), self.cache)
+        self.assertEqual(self.cache.ttl, 10)
+
+    def test_cacheable(self):
+        self.assertTrue(OutputCache.cacheable('show version'))
+        self.assertTrue(OutputCache.cacheable(' SHOW version'))
+        self.assertFalse(OutputCache.cacheable('clear counters'))
+        self.assertFalse(OutputCache.cacheable(['show version']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import Mock
+
+from genie.libs.sdk.libs.utils.configdiff import config_delta,\
+                                                 restore_config_delta
+
+
+class test_config_delta(unittest.TestCase):
+
+    def test_same(self):
+        config = '''\
+hostname R1
+interface GigabitEthernet0/0/0/0
+ ipv4 address 1.1.1.1 255.255.255.0
+!
+end
+'''
+        self.assertEqual(config_delta(config, config), '')
+
+    def test_ignored_lines(self):
+        saved = '''\
+version 6.1.2
+hostname R1
+end
+'''
+        current = '''\
+version 6.2.1
+hostname R1
+end
+'''
+        self.assertEqual(config_delta(saved, current), '')
+
+    def test_removal(self):
+        saved = '''\
+hostname R1
+'''
+        current = '''\
+hostname R1
+logging console debugging
+interface GigabitEthernet0/0/0/1
+ shutdown
+!
+'''
+        # The last configured is removed first
+        self.assertEqual(config_delta(saved, current), '''\
+no interface GigabitEthernet0/0/0/1
+no logging console debugging''')
+
+    def test_addition(self):
+        saved = '''\
+hostname R1
+interface GigabitEthernet0/0/0/0
+ ipv4 address 1.1.1.1 255.255.255.0
+ shutdown
+!
+'''
+        current = '''\
+hostname R1
+'''
+        self.assertEqual(config_delta(saved, current), '''\
+interface GigabitEthernet0/0/0/0
+ ipv4 address 1.1.1.1 255.255.255.0
+ shutdown
+ exit''')
+
+    def test_sub_modes(self):
+        saved = '''\
+router bgp 100
+ neighbor 10.0.0.1
+  remote-as 200
+  address-family ipv4 unicast
+   route-policy RP1 in
+  !
+ !
+ neighbor 10.0.0.2
+  remote-as 100
+ !
+!
+'''
+        current = '''\
+router bgp 100
+ neighbor 10.0.0.1
+  remote-as 300
+  address-family ipv4 unicast
+  !
+ !
+ neighbor 10.0.0.2
+  remote-as 100
+ !
+!
+'''
+        self.assertEqual(config_delta(saved, current), '''\
+router bgp 100
+ neighbor 10.0.0.1
+  no remote-as 300
+  remote-as 200
+  address-family ipv4 unicast
+   route-policy RP1 in
+   exit
+  exit
+ exit''')
+
+    def test_policy_blocks(self):
+        saved = '''\
+prefix-set P1
+  10.0.0.0/8,
+  20.0.0.0/8
+end-set
+!
+as-path-set AS1
+  ios-regex '_100$'
+end-set
+!
+route-policy RP1
+  if destination in P1 then
+    pass
+  endif
+end-policy
+!
+'''
+        current = '''\
+prefix-set P1
+  10.0.0.0/8
+end-set
+!
+as-path-set AS1
+  ios-regex '_100$'
+end-set
+!
+route-policy RP1
+  drop
+end-policy
+!
+'''
+        # Replaced as a whole, ended by end-set/end-policy and not exit
+        self.assertEqual(config_delta(saved, current), '''\
+prefix-set P1
+ 10.0.0.0/8,
+ 20.0.0.0/8
+end-set
+route-policy RP1
+ if destination in P1 then
+  pass
+ endif
+end-policy''')
+
+    def test_policy_blocks_added(self):
+        for keyword in ('prefix-set', 'as-path-set', 'community-set',
+                        'extcommunity-set rt', 'large-community-set',
+                        'rd-set'):
+            saved = '''\
+{keyword} S1
+  value1
+end-set
+!
+'''.format(keyword=keyword)
+            delta = config_delta(saved, '')
+            self.assertEqual(delta.splitlines()[-2:], [' value1', 'end-set'],
+                             keyword)
+            self.assertNotIn('exit', delta, keyword)
+
+
+class test_restore_config_delta(unittest.TestCase):
+
+    def test_restore(self):
+        saved = '''\
+hostname R1
+logging console debugging
+'''
+        device = Mock()
+        device.name = 'R1'
+        device.execute = Mock(side_effect=['hostname R1\n', saved])
+        self.assertEqual(restore_config_delta(device, saved), '')
+        device.configure.assert_called_once_with('logging console debugging')
+
+
+if __name__ == '__main__':
+    unittest.main()
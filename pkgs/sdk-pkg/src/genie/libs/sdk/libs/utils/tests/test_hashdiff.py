@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+import copy
+import unittest
+from unittest.mock import patch
+
+from genie.libs.sdk.libs.utils import hashdiff
+from genie.libs.sdk.libs.utils.hashdiff import HashTree, hash_tree,\
+                                               snapshot_diff
+
+
+class Ops(object):
+    '''Snapshot object, as an Ops or Conf object'''
+
+    def __init__(self, info):
+        self.info = info
+
+
+class Diff(object):
+    '''Keep the values given to Diff'''
+
+    def __init__(self, value1, value2, exclude=None):
+        self.value1 = value1
+        self.value2 = value2
+        self.exclude = exclude
+
+    def findDiff(self):
+        pass
+
+
+INFO = {
+    'vrf': {
+        'default': {
+            'neighbor': {
+                '10.0.0.1': {'state': 'up', 'up_time': '1d'},
+                '10.0.0.2': {'state': 'up', 'up_time': '2d'},
+            },
+        },
+        'VRF1': {
+            'neighbor': {
+                '10.1.0.1': {'state': 'up', 'up_time': '3d'},
+            },
+        },
+    },
+}
+
+
+class test_hash_tree(unittest.TestCase):
+
+    def test_equal(self):
+        tree1 = HashTree(copy.deepcopy(INFO))
+        tree2 = HashTree(copy.deepcopy(INFO))
+        self.assertEqual(tree1.digest, tree2.digest)
+
+        info = copy.deepcopy(INFO)
+        info['vrf']['VRF1']['neighbor']['10.1.0.1']['state'] = 'down'
+        tree3 = HashTree(info)
+        self.assertNotEqual(tree1.digest, tree3.digest)
+        self.assertEqual(tree1.children['vrf'].children['default'].digest,
+                         tree3.children['vrf'].children['default'].digest)
+
+    def test_exclude(self):
+        info = copy.deepcopy(INFO)
+        info['vrf']['default']['neighbor']['10.0.0.1']['up_time'] = '5d'
+        self.assertNotEqual(HashTree(INFO).digest, HashTree(info).digest)
+        self.assertEqual(HashTree(INFO, exclude=['up_time']).digest,
+                         HashTree(info, exclude=['up_time']).digest)
+        # Regexes matching the whole key
+        self.assertEqual(HashTree(INFO, exclude=['up_.*']).digest,
+                         HashTree(info, exclude=['up_.*']).digest)
+        self.assertNotEqual(HashTree(INFO, exclude=['up']).digest,
+                            HashTree(info, exclude=['up']).digest)
+
+    def test_cache(self):
+        ops = Ops(copy.deepcopy(INFO))
+        tree = hash_tree(ops, exclude=['up_time'])
+        self.assertIs(hash_tree(ops, exclude=['up_time']), tree)
+        self.assertIsNot(hash_tree(ops), tree)
+        self.assertIsNot(hash_tree(ops, exclude=['up_time'], cache=False),
+                         tree)
+        # Dictionaries cannot be cached
+        info = copy.deepcopy(INFO)
+        self.assertIsNot(hash_tree(info), hash_tree(info))
+
+
+@patch.object(hashdiff, 'Diff', Diff)
+class test_snapshot_diff(unittest.TestCase):
+
+    def test_same(self):
+        diff = snapshot_diff(Ops(copy.deepcopy(INFO)),
+                             Ops(copy.deepcopy(INFO)))
+        self.assertEqual((diff.value1, diff.value2), ({}, {}))
+
+    def test_prune(self):
+        ops1 = Ops(copy.deepcopy(INFO))
+        ops2 = Ops(copy.deepcopy(INFO))
+        ops2.info['vrf']['default']['neighbor']['10.0.0.2']['state'] = 'down'
+        ops2.info['vrf']['VRF2'] = {}
+        diff = snapshot_diff(ops1, ops2, exclude=['up_time'])
+
+        # Only the branches which differ are left to Diff
+        self.assertEqual(diff.value1, {'info': {'vrf': {'default': {
+            'neighbor': {'10.0.0.2': {'state': 'up', 'up_time': '2d'}}}}}})
+        self.assertEqual(diff.value2, {'info': {'vrf': {
+            'default': {'neighbor': {
+                '10.0.0.2': {'state': 'down', 'up_time': '2d'}}},
+            'VRF2': {}}}})
+        self.assertEqual(diff.exclude, ['up_time'])
+
+    def test_excluded_only(self):
+        ops1 = Ops(copy.deepcopy(INFO))
+        ops2 = Ops(copy.deepcopy(INFO))
+        ops2.info['vrf']['VRF1']['neighbor']['10.1.0.1']['up_time'] = '4d'
+        diff = snapshot_diff(ops1, ops2, exclude=['up_time'])
+        self.assertEqual((diff.value1, diff.value2), ({}, {}))
+
+    def test_modified_snapshot(self):
+        ops_compare = Ops(copy.deepcopy(INFO))
+        ops_learn = Ops(copy.deepcopy(INFO))
+        diff = snapshot_diff(ops_compare, ops_learn)
+        self.assertEqual((diff.value1, diff.value2), ({}, {}))
+
+        # Relearnt in place
+        ops_learn.info['vrf']['VRF1']['neighbor']['10.1.0.1']['state'] = \
+            'down'
+        diff = snapshot_diff(ops_compare, ops_learn)
+        self.assertEqual(diff.value2, {'info': {'vrf': {'VRF1': {
+            'neighbor': {'10.1.0.1': {'state': 'down'}}}}}})
+
+        # Back to the compared value
+        ops_learn.info['vrf']['VRF1'] = \
+            ops_compare.info['vrf']['VRF1']
+        diff = snapshot_diff(ops_compare, ops_learn)
+        self.assertEqual((diff.value1, diff.value2), ({}, {}))
+
+    def test_not_dictionary(self):
+        diff = snapshot_diff(1, 2)
+        self.assertEqual((diff.value1, diff.value2), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
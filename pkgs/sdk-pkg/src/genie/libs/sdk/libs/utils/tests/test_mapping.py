@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+
+import time
+import threading
+import unittest
+from collections import OrderedDict
+from unittest.mock import Mock, MagicMock, patch
+
+from genie.ops.base import Base as OpsBase
+from genie.utils.timeout import Timeout
+from genie.libs.sdk.libs.utils.mapping import Mapping, Different
+from genie.libs.sdk.libs.utils.cache import enable_output_cache,\
+                                            disable_output_cache
+
+
+class Bgp(OpsBase):
+    pass
+
+
+class Ospf(OpsBase):
+    pass
+
+
+class Isis(OpsBase):
+    pass
+
+
+def make_device(*aliases):
+    device = Mock()
+    device.name = 'PE1'
+    device.connectionmgr.connections = {alias: Mock() for alias in aliases}
+    return device
+
+
+def make_abstract():
+    abstract = Mock()
+    abstract.ops.bgp.bgp.Bgp = Bgp
+    abstract.ops.ospf.ospf.Ospf = Ospf
+    abstract.ops.isis.isis.Isis = Isis
+    return abstract
+
+
+def make_mapping(*bases):
+    return Mapping(requirements=OrderedDict(
+        (base, {'requirements': [['info', '(?P<key>.*)']]})
+        for base in bases))
+
+
+class test_learn_parallel(unittest.TestCase):
+
+    def test_one_connection_per_worker(self):
+        device = make_device('vty_1', 'vty_2')
+        mapping = make_mapping('ops.bgp.bgp.Bgp', 'ops.ospf.ospf.Ospf')
+        # Both bases are learnt at the same time
+        barrier = threading.Barrier(2, timeout=5)
+
+        def learn_base(device, name, step, abstracted_base, is_ops, base,
+                       req):
+            barrier.wait()
+            device.execute('show ' + name)
+            return Mock()
+
+        with patch.object(Mapping, '_learn_base', side_effect=learn_base):
+            futures = mapping._learn_parallel(device, make_abstract(),
+                                              ['vty_1', 'vty_2'])
+            results = {base: future.result(timeout=5)
+                       for base, future in futures.items()}
+        mapping._stop_parallel(futures)
+
+        self.assertEqual(list(results),
+                         ['ops.bgp.bgp.Bgp', 'ops.ospf.ospf.Ospf'])
+        # Learnt through the connections, the device is kept on the ops
+        for o in results.values():
+            self.assertIs(o.device, device)
+        device.execute.assert_not_called()
+        sent = []
+        for connection in device.connectionmgr.connections.values():
+            self.assertEqual(connection.execute.call_count, 1)
+            sent.append(connection.execute.call_args[0][0])
+        self.assertEqual(sorted(sent), ['show Bgp', 'show Ospf'])
+
+    def test_less_than_two_sessions(self):
+        device = make_device('vty_1')
+        mapping = make_mapping('ops.bgp.bgp.Bgp', 'ops.ospf.ospf.Ospf')
+        with patch.object(Mapping, '_learn_base') as learn_base:
+            futures = mapping._learn_parallel(device, make_abstract(),
+                                              ['vty_1', 'vty_2'])
+        self.assertEqual(futures, {})
+        learn_base.assert_not_called()
+
+    def test_stop_parallel(self):
+        device = make_device('vty_1', 'vty_2')
+        mapping = make_mapping('ops.bgp.bgp.Bgp', 'ops.ospf.ospf.Ospf',
+                               'ops.isis.isis.Isis')
+        release = threading.Event()
+        learnt = []
+
+        def learn_base(device, name, step, abstracted_base, is_ops, base,
+                       req):
+            release.wait(5)
+            learnt.append(name)
+            return Mock()
+
+        with patch.object(Mapping, '_learn_base', side_effect=learn_base):
+            futures = mapping._learn_parallel(device, make_abstract(),
+                                              ['vty_1', 'vty_2'])
+            # Two workers are busy, the third base is waiting
+            timer = threading.Timer(0.1, release.set)
+            timer.start()
+            mapping._stop_parallel(futures)
+            timer.join()
+
+        self.assertTrue(all(future.done() for future in futures.values()))
+        self.assertTrue(futures['ops.isis.isis.Isis'].cancelled())
+        self.assertEqual(sorted(learnt), ['Bgp', 'Ospf'])
+
+    def test_learn_ops_failure(self):
+        device = make_device('vty_1', 'vty_2')
+        mapping = make_mapping('ops.bgp.bgp.Bgp', 'ops.ospf.ospf.Ospf')
+        steps = MagicMock()
+        steps.start.return_value.__exit__.return_value = False
+        running = set()
+        started = threading.Event()
+
+        def learn_base(device, name, step, abstracted_base, is_ops, base,
+                       req):
+            if name == 'Bgp':
+                # Fail while Ospf is being learnt
+                started.wait(5)
+                raise ValueError('Bgp failed')
+            running.add(name)
+            started.set()
+            time.sleep(0.2)
+            running.discard(name)
+            return Mock()
+
+        with patch.object(Mapping, '_learn_base', side_effect=learn_base), \
+                patch.object(Mapping, '_requirements_printer',
+                             return_value=[]):
+            with self.assertRaises(ValueError):
+                mapping.learn_ops(device, make_abstract(), steps,
+                                  timeout=None, parallel=True,
+                                  sessions=['vty_1', 'vty_2'])
+        # No worker is left using the connections
+        self.assertEqual(running, set())
+
+
+class IncrementalDevice(object):
+    '''Return the outputs of the current attempt, record the commands sent'''
+
+    def __init__(self, attempts):
+        self.name = 'PE1'
+        self.attempts = attempts
+        self.sent = []
+
+    def execute(self, command):
+        self.sent[-1].append(command)
+        return self.attempts[len(self.sent) - 1][command]
+
+
+class IncrementalOps(object):
+    '''Ops learning from the outputs of the maker when already there'''
+
+    commands = ('show a', 'show b')
+
+    def __init__(self, device):
+        self.device = device
+        self.maker = Mock(outputs={})
+        self.info = {}
+
+    def learn(self):
+        for command in self.commands:
+            outputs = self.maker.outputs.setdefault(command, {})
+            if '' not in outputs:
+                outputs[''] = self.device.execute(command)
+            self.info[command] = outputs['']
+
+
+def verify_info(o, initial, exclude):
+    def strip(info):
+        return {command: {k: v for k, v in output.items()
+                          if k not in exclude}
+                for command, output in info.items()}
+    if strip(o.info) != strip(initial.info):
+        raise Exception('Not equal to the initial snapshot')
+
+
+class test_learn_poll_incremental(unittest.TestCase):
+
+    initial = {'show a': {'x': 1, 'uptime': 1},
+               'show b': {'y': 1}}
+
+    def learn(self, attempts):
+        device = IncrementalDevice([self.initial] + attempts)
+
+        def ops():
+            device.sent.append([])
+            return IncrementalOps(device)
+
+        initial = ops()
+        initial.learn()
+        o = Mapping()._learn_poll_incremental(
+            ops=ops, initial=initial, verify=verify_info,
+            timeout=Timeout(max_time=30, interval=0), exclude=['uptime'])
+        return o, device.sent[1:]
+
+    def test_stable_commands_not_sent_again(self):
+        o, sent = self.learn([
+            # show a only differs by an excluded key
+            {'show a': {'x': 1, 'uptime': 5}, 'show b': {'y': 2}},
+            {'show a': {'x': 2, 'uptime': 6}, 'show b': {'y': 2}},
+            {'show a': {'x': 1, 'uptime': 7}, 'show b': {'y': 1}},
+            # Full learn confirming it
+            {'show a': {'x': 1, 'uptime': 8}, 'show b': {'y': 1}},
+        ])
+        self.assertEqual(sent, [['show a', 'show b'],
+                                ['show b'],
+                                ['show b'],
+                                ['show a', 'show b']])
+        self.assertEqual(o.info, {'show a': {'x': 1, 'uptime': 8},
+                                  'show b': {'y': 1}})
+
+    def test_equal_on_first_attempt(self):
+        o, sent = self.learn([
+            {'show a': {'x': 1, 'uptime': 5}, 'show b': {'y': 1}},
+        ])
+        self.assertEqual(sent, [['show a', 'show b']])
+
+    def test_reused_outputs_outdated(self):
+        o, sent = self.learn([
+            {'show a': {'x': 1, 'uptime': 5}, 'show b': {'y': 2}},
+            {'show a': {'x': 1, 'uptime': 6}, 'show b': {'y': 1}},
+            # The full learn finds show a changed since it was reused
+            {'show a': {'x': 2, 'uptime': 7}, 'show b': {'y': 1}},
+            {'show a': {'x': 1, 'uptime': 8}, 'show b': {'y': 1}},
+            {'show a': {'x': 1, 'uptime': 9}, 'show b': {'y': 1}},
+        ])
+        self.assertEqual(sent, [['show a', 'show b'],
+                                ['show b'],
+                                ['show a', 'show b'],
+                                ['show a'],
+                                ['show a', 'show b']])
+
+    def test_timeout(self):
+        device = IncrementalDevice(
+            [self.initial] + [{'show a': {'x': 1}, 'show b': {'y': 2}}] * 3)
+
+        def ops():
+            device.sent.append([])
+            return IncrementalOps(device)
+
+        initial = ops()
+        initial.learn()
+        timeout = Mock(max_time=30, interval=0)
+        with patch('genie.libs.sdk.libs.utils.mapping.Timeout') as Timeout_:
+            Timeout_.return_value.iterate.side_effect = [True, False]
+            with self.assertRaises(StopIteration):
+                Mapping()._learn_poll_incremental(
+                    ops=ops, initial=initial, verify=verify_info,
+                    timeout=timeout, exclude=['uptime'])
+        self.assertEqual(device.sent[1:], [['show a', 'show b'],
+                                           ['show b']])
+
+
+class test_learn_ops_keys(unittest.TestCase):
+
+    def test_different_in_second_base(self):
+        mapping = Mapping(requirements=OrderedDict([
+            ('ops.bgp.bgp.Bgp', {'requirements': [
+                ['info', 'vrf', '(?P<vrf>.*)', 'neighbor',
+                 '(?P<neighbor>.*)', 'session_state', 'established']]}),
+            ('ops.ospf.ospf.Ospf', {'requirements': [
+                ['info', 'vrf', Different('(?P<vrf>.*)'), 'interface',
+                 '(?P<interface>.*)', 'state', 'up']]}),
+        ]))
+        searched = []
+
+        def find_requirements(o, reqs, **kwargs):
+            searched.append(reqs)
+            if reqs[0][2] == '(?P<vrf>.*)':
+                return [('established', ['info', 'vrf', 'default',
+                                         'neighbor', '10.0.0.1',
+                                         'session_state'])]
+            return [('up', ['info', 'vrf', 'VRF1', 'interface', 'Gi0/0/0/1',
+                            'state'])]
+
+        steps = MagicMock()
+        with patch.object(Mapping, '_learn_base', return_value=Mock()), \
+                patch.object(Mapping, '_requirements_printer',
+                             return_value=[]), \
+                patch.object(Mapping, 'exclude_management_interface',
+                             side_effect=lambda device, req, item: item), \
+                patch('genie.libs.sdk.libs.utils.mapping.find_requirements',
+                      side_effect=find_requirements):
+            mapping.learn_ops(make_device(), make_abstract(), steps,
+                              timeout=None)
+
+        # The keys of the first base are used by Different, and kept
+        self.assertEqual(searched[1][0][2], '(?P<not_vrf>^(?!default$).*$)')
+        self.assertEqual(mapping.keys, [{'vrf': 'default',
+                                         'neighbor': '10.0.0.1',
+                                         'not_vrf': 'VRF1',
+                                         'interface': 'Gi0/0/0/1'}])
+
+
+class test_verify_ops(unittest.TestCase):
+
+    def test_output_cache_bypassed(self):
+        device = Mock()
+        device.name = 'PE1'
+        device.execute = Mock(return_value='output')
+        execute = device.execute
+        enable_output_cache(device)
+        self.addCleanup(disable_output_cache, device)
+        device.execute('show bgp')
+
+        o = Mock()
+        o.learn_poll.side_effect = lambda **kwargs: device.execute('show bgp')
+        mapping = Mapping()
+        mapping.timeout = None
+        mapping._verify_ops(device, o, {'list': []}, False,
+                            'ops.bgp.bgp.Bgp', {})
+        self.assertEqual(execute.call_count, 2)
+        # Outside of the polling, the output is cached
+        device.execute('show bgp')
+        self.assertEqual(execute.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
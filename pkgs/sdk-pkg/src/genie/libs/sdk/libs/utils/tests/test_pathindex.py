@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+import unittest
+
+from ats.utils.objects import find, R, Not, NotExists
+
+from genie.libs.sdk.libs.utils.pathindex import PathIndex, find_requirements
+
+
+class Ops(object):
+    '''Learnt object, as an Ops object'''
+
+    def __init__(self, info, routes=None):
+        self.info = info
+        self.routes = routes or {}
+
+
+def bgp_ops():
+    return Ops(
+        info={
+            'instance': {
+                'default': {
+                    'bgp_id': 100,
+                    'vrf': {
+                        'default': {
+                            'neighbor': {
+                                '10.0.0.1': {'session_state': 'established',
+                                             'remote_as': 200},
+                                '10.0.0.2': {'session_state': 'idle',
+                                             'remote_as': 300},
+                            },
+                        },
+                        'VRF1': {
+                            'neighbor': {
+                                '10.1.0.1': {'session_state': 'established',
+                                             'remote_as': 400},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+        routes={'10.{}.0.0/16'.format(i): {'next_hop': '10.0.0.1'}
+                for i in range(200)})
+
+
+class test_path_index(unittest.TestCase):
+
+    def test_prune(self):
+        ops = bgp_ops()
+        pruned = PathIndex(ops).prune(
+            [['info', 'instance', '(?P<instance>.*)', 'vrf', 'VRF1',
+              'neighbor', '(?P<neighbor>.*)', 'session_state',
+              'established']])
+
+        # Only the branches the requirements can reach
+        self.assertEqual(pruned, {'info': {'instance': {'default': {
+            'vrf': {'VRF1': {'neighbor': {'10.1.0.1': {
+                'session_state': 'established'}}}}}}}})
+
+    def test_prune_terminal(self):
+        ops = bgp_ops()
+        pruned = PathIndex(ops).prune([['info', 'instance']])
+        # The whole branch is kept below the end of a requirement
+        self.assertIs(pruned['info']['instance'], ops.info['instance'])
+        self.assertNotIn('routes', pruned)
+
+    def test_prune_operators(self):
+        ops = bgp_ops()
+        pruned = PathIndex(ops).prune(
+            [['info', 'instance', 'default', 'vrf', Not('default'),
+              'neighbor']])
+        # Operators accept every key, find decides
+        self.assertEqual(set(pruned['info']['instance']['default']['vrf']),
+                         {'default', 'VRF1'})
+        self.assertNotIn('bgp_id', pruned['info']['instance']['default'])
+
+    def test_prune_missing(self):
+        pruned = PathIndex(bgp_ops()).prune([['info', 'isis']])
+        self.assertEqual(pruned, {'info': {}})
+
+    def test_not_indexed(self):
+        self.assertEqual(PathIndex(5).prune([['info']]), 5)
+        ops = bgp_ops()
+        self.assertIs(PathIndex(ops).prune([]), ops)
+
+
+class test_find_requirements(unittest.TestCase):
+    '''find_requirements returns the same as find on the whole object'''
+
+    REQUIREMENTS = [
+        # Regex keys
+        [['info', 'instance', '(?P<instance>.*)', 'vrf', '(?P<vrf>.*)',
+          'neighbor', '(?P<neighbor>.*)', 'session_state', 'established']],
+        [['info', 'instance', '(?P<instance>.*)', 'vrf', '(?P<vrf>.*)',
+          'neighbor', r'(?P<neighbor>^10\.0.*)', 'remote_as',
+          '(?P<remote_as>.*)']],
+        # Plain keys and values
+        [['info', 'instance', 'default', 'bgp_id', 100]],
+        [['routes', '10.10.0.0/16', 'next_hop', '10.0.0.1']],
+        # Operators
+        [['info', 'instance', 'default', 'vrf', Not('default'),
+          'neighbor', '(?P<neighbor>.*)', 'remote_as', '(?P<as>.*)']],
+        [['info', 'instance', 'default', 'vrf', 'VRF1',
+          NotExists('address_family')]],
+        [[NotExists('device_attr')]],
+        # Several requirements
+        [['info', 'instance', '(?P<instance>.*)', 'bgp_id', '(?P<id>.*)'],
+         ['info', 'instance', '(?P<instance>.*)', 'vrf', '(?P<vrf>.*)',
+          'neighbor', '(?P<neighbor>.*)', 'session_state', 'idle']],
+        # Missing paths
+        [['info', 'instance', 'default', 'vrf', 'VRF2', 'neighbor',
+          '(?P<neighbor>.*)']],
+        [['info', 'instance', 'default', 'vrf', 'default', 'neighbor',
+          '10.0.0.1', 'session_state', 'idle']],
+        [['info', 'instance', 'default', 'bgp_id', 100],
+         ['info', 'isis']],
+    ]
+
+    def test_same_as_find(self):
+        ops = bgp_ops()
+        for requirements in self.REQUIREMENTS:
+            for all_keys in (False, True):
+                rs = [R(requirement) for requirement in requirements]
+                expected = find([ops], *rs, filter_=False, all_keys=all_keys)
+                self.assertEqual(
+                    find_requirements(ops, requirements, filter_=False,
+                                      all_keys=all_keys),
+                    expected, (requirements, all_keys))
+
+    def test_missing(self):
+        self.assertFalse(find_requirements(
+            bgp_ops(), [['info', 'instance', 'default', 'vrf', 'VRF2']],
+            filter_=False))
+
+    def test_dictionary(self):
+        conf = {'device_attr': {'PE1': {'enabled': True}}}
+        requirements = [['device_attr', '(?P<device>.*)', 'enabled', True]]
+        self.assertEqual(
+            find_requirements(conf, requirements, filter_=False),
+            find([conf], *[R(r) for r in requirements], filter_=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
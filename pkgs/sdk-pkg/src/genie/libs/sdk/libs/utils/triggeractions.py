@@ -8,6 +8,9 @@ import time
 # import ats
 from ats.utils.objects import find, R
 
+# Genie Libs
+from genie.libs.sdk.libs.utils.cache import invalidate_output_cache
+
 log = logging.getLogger(__name__)
 
 
@@ -170,6 +173,7 @@ class Configure(object):
                 conf.build_unconfig(attributes=attributes)
             else:
                 conf.build_config()
+            invalidate_output_cache(device)
 
     @classmethod
     def _set_conf_attribute(self, conf, conf_structure, return_attr=False):